@@ -0,0 +1,304 @@
+"""
+Benchmarks for QuizProg-GUI internals.
+Run `python benchmark.py --help` for the list of benchmarks.
+"""
+import os
+import sys
+import time
+import argparse
+
+def make_quiz(n):
+	return {
+		'title': 'Benchmark Quiz',
+		'description': 'Generated by benchmark.py',
+		'lives': 3,
+		'wrongmsg': ['Wrong message 1', 'Wrong message 2'],
+		'questions': [{
+			'question': f'Benchmark question {i + 1}: which answer is the correct one?',
+			'a': f'Answer A of question {i + 1}',
+			'b': f'Answer B of question {i + 1}',
+			'c': f'Answer C of question {i + 1}',
+			'd': f'Answer D of question {i + 1}',
+			'correct': 'abcd'[i % 4],
+			'wrongmsg': {'abcd'[(i + 1) % 4]: 'Not quite.'},
+			'explanation': f'Explanation of question {i + 1}.',
+		} for i in range(n)],
+		'fail': 'Game over.',
+		'finish': 'Well done!',
+	}
+
+def timed(func, repeat = 3):
+	best = None
+	for i in range(repeat):
+		start = time.perf_counter()
+		func()
+		elapsed = time.perf_counter() - start
+		if best is None or elapsed < best: best = elapsed
+	return best
+
+def report(rows):
+	width = max(len(row[0]) for row in rows)
+	for label, value in rows: print(f'{label.ljust(width)}  {value}')
+
+def bench_validate(args):
+	from jsonhandler import JSONHandler, QuizValidator
+
+	quiz = make_quiz(args.questions)
+
+	# the check_json loop before the validator was introduced
+	handler = JSONHandler.__new__(JSONHandler)
+	handler.datafile = quiz
+	def legacy():
+		for i in range(len(handler.datafile['questions'])):
+			for element in ('question', 'a', 'b', 'c', 'd', 'correct'):
+				if not handler.check_question_element(element, i, rel = False): return
+
+	old = timed(legacy, args.repeat)
+	new = timed(lambda: QuizValidator().quiz(quiz), args.repeat)
+	report([
+		(f'check_question_element loop ({args.questions} questions)', f'{old * 1000:.1f} ms'),
+		('QuizValidator', f'{new * 1000:.1f} ms'),
+		('Speedup', f'{old / new:.1f}x'),
+	])
+
+def bench_search(args):
+	from search import SearchIndex
+
+	quiz = make_quiz(args.questions)
+	questions = quiz['questions']
+	index = SearchIndex()
+	build = timed(lambda: list(index.build(questions)), args.repeat)
+	rows = [(f'Index build ({args.questions} questions)', f'{build * 1000:.1f} ms')]
+	for query in ('question 4242', 'explanation of', 'answer c of question 9', 'q', 'no such word'):
+		found = len(index.search(query))
+		rows.append((f'Search {query!r} ({found} found)', f'{timed(lambda: index.search(query), args.repeat) * 1000:.2f} ms'))
+	question = dict(questions[len(questions) // 2], question = 'Edited question')
+	rows.append(('Update one question', f'{timed(lambda: index.set(len(questions) // 2, question), args.repeat) * 1000:.3f} ms'))
+	report(rows)
+
+def bench_journal(args):
+	import tempfile
+	import history
+	import journal
+	import jsonhandler
+
+	quiz = make_quiz(args.questions)
+	with tempfile.TemporaryDirectory() as folder:
+		hist = history.History(quiz)
+		log = journal.Journal.create(folder)
+		log.checkpoint(jsonhandler.snapshot(quiz), savepath = '', format = 'qpg', modified = False)
+		log.checkpoint_thread.join()
+
+		# edit questions round-robin until the journal is about to be compacted
+		edits = 0
+		start = time.perf_counter()
+		while log.size < log.threshold:
+			i = edits % len(quiz['questions'])
+			question = quiz['questions'][i]
+			log.record('do', hist.do('edit', [history.Change('set', ('questions',), i, question, dict(question, question = f'Edited {edits}'))]))
+			edits += 1
+			if not edits % 50: log.flush()
+		log.flush()
+		elapsed = time.perf_counter() - start
+
+		recovery = log.read()
+		def recover():
+			datafile, report = jsonhandler.validate_file(log.path(recovery.generation, 'qpg'))
+			journal.replay(history.History(datafile), recovery.records)
+		report([
+			(f'Journal {edits} edits ({log.size >> 10} KiB, synced every 50)', f'{elapsed / edits * 1e6:.1f} us per edit'),
+			(f'Recover {args.questions} questions + {edits} edits', f'{timed(recover, args.repeat) * 1000:.1f} ms'),
+		])
+		log.close()
+
+# put before the scripts that start the editor and the players, so they exit as soon as their first screen is drawn
+FIRST_FRAME_EXIT = '''\
+import os
+import tkinter
+mainloop = tkinter.Misc.mainloop
+def exit_after_first_frame(self, n = 0):
+	self.after(0, lambda: (self.update_idletasks(), os._exit(0)))
+	mainloop(self, n)
+tkinter.Misc.mainloop = exit_after_first_frame
+'''
+
+def first_frame(path, *args):
+	"""Returns the command that runs the script or Python app path with args until its first screen is drawn."""
+	run = f'import sys, runpy\nsys.argv = {[path, *args]!r}\nsys.path[0] = {os.path.dirname(os.path.abspath(path))!r}\nrunpy.run_path({path!r}, run_name = "__main__")\n'
+	return [sys.executable, '-c', FIRST_FRAME_EXIT + run]
+
+def bench_startup(args):
+	import tempfile
+	import subprocess
+	import compiler
+	import jsonhandler
+
+	quiz = jsonhandler.snapshot(make_quiz(args.questions))
+	with tempfile.TemporaryDirectory() as folder:
+		exe = compiler.exe_path(folder, 'quiz')
+		pyz = os.path.join(folder, 'quiz.pyz')
+		# a runtime of its own, whose player exits as soon as its first screen is drawn
+		print('Building the player runtime')
+		cache = compiler.BuildCache(os.path.join('build', 'build-cache'), os.path.dirname(os.path.abspath(__file__)), sys.executable, compiler.build_env(), FIRST_FRAME_EXIT + compiler.PLAYER_SCRIPT)
+		runtime = cache.runtime()
+		exe_build = timed(lambda: compiler.write_player(runtime, quiz, exe), args.repeat)
+		pyz_build = timed(lambda: compiler.write_pyz(quiz, pyz), args.repeat)
+		exe_start = timed(lambda: subprocess.run([exe], check = True), args.repeat)
+		pyz_start = timed(lambda: subprocess.run(first_frame(pyz), check = True), args.repeat)
+		report([
+			(f'Executable ({args.questions} questions, {os.path.getsize(exe) >> 10} KiB)', f'build {exe_build * 1000:.0f} ms, first frame {exe_start * 1000:.0f} ms'),
+			(f'Python app ({os.path.getsize(pyz) >> 10} KiB)', f'build {pyz_build * 1000:.0f} ms, first frame {pyz_start * 1000:.0f} ms'),
+		])
+
+def bench_engine(args):
+	import random
+	import quizengine
+
+	def simulate(engine, choices):
+		# random answers, a new game whenever one ends
+		answer, next_question, start = engine.answer, engine.next, engine.start
+		QUESTION, CORRECT = quizengine.QUESTION, quizengine.CORRECT
+		state = start()
+		for choice in choices:
+			while state != QUESTION: state = next_question() if state == CORRECT else start()
+			state = answer(choice)
+
+	rng = random.Random(0)
+	choices = rng.choices(range(4), k = 1000000)
+	rows = []
+	for randomize in (False, True):
+		quiz = dict(make_quiz(args.questions), randomize = randomize)
+		elapsed = timed(lambda: simulate(quizengine.QuizEngine(quiz, rng), choices), args.repeat)
+		rows.append((f'{len(choices)} answers ({args.questions} questions, {"random" if randomize else "fixed"} order)', f'{elapsed * 1000:.0f} ms, {len(choices) / elapsed / 1e6:.2f}M answers/s'))
+	report(rows)
+
+def bench_simulate(args):
+	import numpy as np
+	import simulator
+
+	rows = []
+	for label, success, randomize in (('0.9', np.full(args.questions, 0.9), False), ('0.999', np.full(args.questions, 0.999), False),
+			('0.999 to 0.95', np.linspace(0.999, 0.95, args.questions), False), ('0.99, random order', np.full(args.questions, 0.99), True)):
+		elapsed = timed(lambda: simulator.simulate(success, 3, 1000000, randomize, 0), args.repeat)
+		rows.append((f'1000000 sessions ({args.questions} questions, success {label}, 3 lives)', f'{elapsed * 1000:.0f} ms'))
+	report(rows)
+
+def bench_screens(args):
+	import gui
+	import quizengine
+
+	g = gui.GUI('')
+	gui.player.g = g
+	# no lives, so wrong answers can go on forever
+	quiz = make_quiz(args.questions)
+	del quiz['lives']
+	g.datafile = quiz
+	g.history.reset(quiz)
+	g.main()
+	g.window.update()
+
+	def per_screen(steps, rounds = 50, rebuild = False):
+		"""
+		Time of a screen change, each step changes the screen once, and the part of it before the screen can be
+		drawn: the step itself, without the idle work after it like the player's pre-rendering of the next question.
+		"""
+		responses = []
+		def run():
+			response = 0
+			for i in range(rounds):
+				for step in steps:
+					# drawing every screen from scratch, as before screens and menubars were kept
+					if rebuild:
+						g.screens.drop(*list(g.screens.frames))
+						g.screens.menubars.clear()
+					start = time.perf_counter()
+					step()
+					response += time.perf_counter() - start
+					g.window.update()
+			responses.append(response)
+		return timed(run, args.repeat) / (rounds * len(steps)), min(responses) / (rounds * len(steps))
+
+	player = g.quiz_player.question_player
+	def wrong_answer(): player.choose_choice(next(i for i in range(4) if not player.engine.question.correct >> i & 1))
+	def right_answer():
+		if player.engine.state != quizengine.QUESTION: player.main()
+		else: player.choose_choice(next(i for i in range(4) if player.engine.question.correct >> i & 1))
+	def next_question():
+		if player.engine.state == quizengine.CORRECT: player.next_question()
+		else: player.main()
+
+	viewer = g.question_viewer
+	rows = []
+	for label, start, steps in (
+		('Wrong answer', player.main, (wrong_answer,)),
+		('Right answer, then Next', player.main, (right_answer, next_question)),
+		('Editor: main, settings, questions, question editor', g.main, (g.quizconf.main, g.quizconf.end, viewer.main, lambda: viewer.qeditor.main(), viewer.qeditor.end, viewer.end)),
+	):
+		start()
+		kept, response = per_screen(steps)
+		rebuilt, rebuilt_response = per_screen(steps, rebuild = True)
+		rows.append((label, f'kept {kept * 1000:.2f} ms ({response * 1000:.2f} ms to respond), rebuilt {rebuilt * 1000:.2f} ms ({rebuilt_response * 1000:.2f} ms) per screen'))
+	g.window.destroy()
+	report(rows)
+
+def import_times(module):
+	"""
+	Imports module in a new interpreter under -X importtime. Returns its import time and the import times of the
+	modules it imports directly, as (name, seconds) pairs, slowest first.
+	"""
+	import subprocess
+	output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], stderr = subprocess.PIPE, universal_newlines = True, check = True).stderr
+	imports = []
+	# lines are 'import time: self | cumulative | name' in microseconds, written when a module is done importing,
+	# so the modules a module imports come right before it, indented by two more spaces
+	for line in output.splitlines()[1:]:
+		cumulative, name = line.split('|')[1:]
+		depth = (len(name) - len(name.lstrip()) - 1) // 2
+		if depth == 1: imports.append((name.strip(), int(cumulative) / 1e6))
+		elif depth == 0:
+			if name.strip() == module: return int(cumulative) / 1e6, sorted(imports, key = lambda i: -i[1])
+			imports = []
+	raise ValueError(f'{module} was not imported')
+
+def bench_editor(args):
+	import tempfile
+	import subprocess
+	import jsonhandler
+
+	gui_time = min(import_times('gui')[0] for i in range(args.repeat))
+	player_time = min(import_times('player')[0] for i in range(args.repeat))
+	slowest = import_times('gui')[1][:5]
+
+	main = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+	with tempfile.TemporaryDirectory() as folder:
+		quiz = os.path.join(folder, 'quiz.qpg')
+		chunks, encoding = jsonhandler.iter_dump(make_quiz(args.questions), 'qpg')
+		jsonhandler.atomic_write(quiz, chunks, encoding = encoding)
+		empty_start = timed(lambda: subprocess.run(first_frame(main), check = True), args.repeat)
+		quiz_start = timed(lambda: subprocess.run(first_frame(main, quiz), check = True), args.repeat)
+	report([
+		('import gui', f'{gui_time * 1000:.1f} ms'),
+		('import player', f'{player_time * 1000:.1f} ms'),
+		('Slowest imports of gui', ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in slowest)),
+		('Editor first frame', f'{empty_start * 1000:.0f} ms'),
+		(f'Editor first frame with {args.questions} questions', f'{quiz_start * 1000:.0f} ms'),
+	])
+
+benchmarks = {
+	'validate': bench_validate,
+	'search': bench_search,
+	'journal': bench_journal,
+	'startup': bench_startup,
+	'engine': bench_engine,
+	'screens': bench_screens,
+	'simulate': bench_simulate,
+	'editor': bench_editor,
+}
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description = 'QuizProg-GUI benchmarks')
+	parser.add_argument('benchmark', choices = sorted(benchmarks))
+	parser.add_argument('-n', '--questions', type = int, default = 100000, help = 'number of questions in the generated quiz')
+	parser.add_argument('-r', '--repeat', type = int, default = 3, help = 'number of runs, the best one is reported')
+	args = parser.parse_args()
+	benchmarks[args.benchmark](args)
@@ -0,0 +1,392 @@
+"""
+Builds quiz executables.
+
+Everything except the quiz is the same for every executable, so PyInstaller only builds a generic player runtime,
+once per player sources, interpreter and PyInstaller version, in a persistent folder of the build cache. The
+runtime opens the QPG container appended to its own executable, so compiling a quiz is copying the runtime and
+appending the quiz to it. Frozen builds of QuizProg-GUI can ship the runtime and compile without any Python.
+"""
+import io
+import os
+import sys
+import stat
+import json
+import time
+import shutil
+import signal
+import hashlib
+import zipfile
+import tempfile
+import threading
+import subprocess
+import collections
+import concurrent.futures
+
+import qpg
+import journal
+import jsonhandler
+
+# the modules the quiz player runs on
+PLAYER_MODULES = ('player.py', 'quizengine.py', 'jsonhandler.py', 'qpg.py')
+ICONS = ('icon.ico', 'icon.xbm')
+RUNTIME = 'quizprog-player'
+
+PLAYER_SCRIPT = '''\
+import sys
+import tkinter.messagebox
+import player
+g = player.Player(sys.executable)
+player.g = g
+try: g.start_main()
+except Exception: tkinter.messagebox.showerror('Error', player.report_error.__func__(*sys.exc_info(), True))
+'''
+
+# __main__.py of exported Python apps
+PYZ_MAIN = f'''\
+import os
+import sys
+import shutil
+import zipfile
+import tempfile
+import tkinter.messagebox
+import player
+archive = os.path.dirname(os.path.abspath(__file__))
+# Tk can only load the window icon from a file, in a folder of this run only, and only until the window has it
+player.temp_path = tempfile.mkdtemp(prefix = 'quizprog-')
+try:
+	with zipfile.ZipFile(archive) as z:
+		for name in {ICONS!r}: z.extract(name, player.temp_path)
+	g = player.Player(archive, 'quiz.qpg')
+finally: shutil.rmtree(player.temp_path, ignore_errors = True)
+player.g = g
+try: g.start_main()
+except Exception: tkinter.messagebox.showerror('Error', player.report_error.__func__(*sys.exc_info(), True))
+'''
+
+SPEC = f'''\
+# generated by QuizProg-GUI; the player runtime of every compiled quiz
+import os
+import sys
+icon = os.path.join(SPECPATH, 'icon.ico') if sys.platform in ('win32', 'darwin') else None
+a = Analysis([os.path.join(SPECPATH, 'run_quiz.py')], pathex = [SPECPATH], datas = [(os.path.join(SPECPATH, 'icon.ico' if sys.platform == 'win32' else 'icon.xbm'), '.')])
+pyz = PYZ(a.pure)
+exe = EXE(pyz, a.scripts, a.binaries, a.datas, [], name = '{RUNTIME}', console = False, icon = icon)
+'''
+
+# PyInstaller log lines that start a phase of the runtime build, with the share of the build done by then
+BUILD_PHASES = (
+	('Analyzing modules for base_library.zip', 0.02, 'Analyzing the standard library'),
+	('Caching module dependency graph', 0.3, 'Analyzing the player'),
+	('Looking for dynamic libraries', 0.4, 'Collecting libraries'),
+	('Building PYZ', 0.42, 'Compressing modules'),
+	('Building PKG', 0.45, 'Packing the runtime'),
+	('Building EXE', 0.97, 'Writing the runtime'),
+	('Build complete', 1.0, 'Done'),
+)
+
+def build_phase(line):
+	"""Returns (share done, description) if line of the PyInstaller output starts a phase of BUILD_PHASES, else None."""
+	for marker, done, text in BUILD_PHASES:
+		if marker in line: return done, text
+	return None
+
+class BuildCancelled(Exception): pass
+
+class StreamingRun:
+	"""
+	Runs processes like subprocess.run, but passes every line they print (stdout and stderr) to output(line) as
+	soon as it is printed. cancel() kills the running process and everything it started, from any thread, and
+	makes the run raise BuildCancelled.
+	"""
+	def __init__(self, output):
+		self.output = output
+		self.process = None
+		self.cancelled = False
+		self.lock = threading.Lock()
+
+	def __call__(self, args, check = False, env = None):
+		# a process group of its own, so cancel() reaches the whole tree; and no console window on Windows
+		if os.name == 'nt': kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW}
+		else: kwargs = {'start_new_session': True}
+		with self.lock:
+			self.check_cancelled()
+			self.process = subprocess.Popen(args, env = env, stdin = subprocess.DEVNULL, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, universal_newlines = True, errors = 'replace', **kwargs)
+		with self.process:
+			for line in self.process.stdout: self.output(line.rstrip('\n'))
+			returncode = self.process.wait()
+		self.check_cancelled()
+		if check and returncode: raise subprocess.CalledProcessError(returncode, args)
+		return subprocess.CompletedProcess(args, returncode)
+
+	def check_cancelled(self):
+		if self.cancelled: raise BuildCancelled('Compilation cancelled')
+
+	def cancel(self):
+		with self.lock:
+			self.cancelled = True
+			process = self.process
+		if process is None or process.poll() is not None: return
+		try:
+			if os.name == 'nt': subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL, creationflags = subprocess.CREATE_NO_WINDOW)
+			else: os.killpg(process.pid, signal.SIGKILL)
+		except OSError: pass
+
+def build_env(embed = None):
+	"""
+	Returns the environment to run PyInstaller in: without the variables of this (possibly frozen) process, and with
+	Tcl/Tk of the embeddable Python in the folder embed.
+	"""
+	env = os.environ.copy()
+	for key in ('TCL_LIBRARY', 'TK_LIBRARY', '_MEIPASS2', 'PYTHONPATH'): env.pop(key, None)
+	if embed:
+		env['TCL_LIBRARY'] = os.path.join(embed, 'tcl', 'tcl8.6')
+		env['TK_LIBRARY'] = os.path.join(embed, 'tcl', 'tk8.6')
+	return env
+
+def env_manifest(folder):
+	"""Returns the size of every file under folder, by path relative to folder."""
+	manifest = {}
+	for path, dirs, files in os.walk(folder):
+		for name in files:
+			full = os.path.join(path, name)
+			manifest[os.path.relpath(full, folder).replace(os.sep, '/')] = os.path.getsize(full)
+	return manifest
+
+def extract_env(archive, root):
+	"""
+	Returns the folder under root that holds the embeddable Python of archive (compiler_env.zip), extracting it only
+	the first time. The folder is named after a hash of the central directory of archive (the name, size and CRC of
+	every file), so a changed archive gets a new folder and reading the key costs no decompression. Extraction
+	goes to a temporary folder that is renamed into place once its manifest is written; later calls only check the
+	size of every file in the manifest and extract again if any is missing or changed. Files added since, like
+	the __pycache__ of modules the embeddable Python imported, are left alone.
+	"""
+	with zipfile.ZipFile(archive) as z:
+		key = hashlib.sha256()
+		for info in sorted(z.infolist(), key = lambda info: info.filename): key.update(f'{info.filename}\0{info.file_size}\0{info.CRC}\n'.encode('utf-8'))
+		folder = os.path.join(root, key.hexdigest()[:16])
+		manifest_path = os.path.join(folder, '.manifest')
+
+		os.makedirs(root, exist_ok = True)
+		with open(os.path.join(root, 'lock'), 'ab') as lock_file:
+			journal.lock(lock_file, True)
+			try:
+				with open(manifest_path) as f: manifest = json.load(f)
+				if all(os.path.getsize(os.path.join(folder, name)) == size for name, size in manifest.items()): return folder
+			except (OSError, ValueError): pass
+
+			shutil.rmtree(folder, ignore_errors = True)
+			tmp = tempfile.mkdtemp(dir = root)
+			try:
+				z.extractall(tmp)
+				manifest = env_manifest(tmp)
+				with open(os.path.join(tmp, '.manifest'), 'w') as f: json.dump(manifest, f)
+				os.replace(tmp, folder)
+			except BaseException:
+				shutil.rmtree(tmp, ignore_errors = True)
+				raise
+
+			# older archives are not needed anymore
+			for name in os.listdir(root):
+				if name not in ('lock', os.path.basename(folder)): shutil.rmtree(os.path.join(root, name), ignore_errors = True)
+	return folder
+
+toolchains = {}
+
+def toolchain(python, env = None):
+	"""Returns the versions of python and its PyInstaller."""
+	if python not in toolchains:
+		# no console window on Windows, like StreamingRun
+		kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+		result = subprocess.run([python, '-c', 'import sys, PyInstaller; print(sys.version); print(PyInstaller.__version__)'], check = True, env = env, stdout = subprocess.PIPE, universal_newlines = True, **kwargs)
+		toolchains[python] = result.stdout
+	return toolchains[python]
+
+def exe_path(distpath, name): return os.path.join(distpath, name + ('.exe' if os.name == 'nt' else ''))
+
+def write_player(runtime, datafile, path):
+	"""
+	Writes the compiled quiz path: the player runtime at runtime with datafile (a jsonhandler.snapshot() of the
+	quiz) appended as a QPG container.
+	"""
+	def chunks():
+		with open(runtime, 'rb') as f:
+			for chunk in iter(lambda: f.read(1 << 20), b''): yield chunk
+		yield from qpg.iter_payload(jsonhandler.iter_dump(datafile, 'qpg')[0])
+
+	jsonhandler.atomic_write(path, chunks(), encoding = None)
+	shutil.copymode(runtime, path)
+	return path
+
+def write_pyz(datafile, path, interpreter = '/usr/bin/env python3'):
+	"""
+	Writes datafile (a jsonhandler.snapshot() of the quiz) as a Python zip application at path, which runs the player
+	on any system with Python and Tkinter. The quiz is stored uncompressed, so the player maps it in place.
+	"""
+	src = os.path.dirname(os.path.abspath(__file__))
+	quiz = io.BytesIO()
+	for chunk in qpg.iter_payload(jsonhandler.iter_dump(datafile, 'qpg')[0]): quiz.write(chunk)
+
+	archive = io.BytesIO()
+	archive.write(f'#!{interpreter}\n'.encode('utf-8'))
+	with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+		z.writestr('__main__.py', PYZ_MAIN)
+		for name in PLAYER_MODULES + ICONS: z.write(os.path.join(src, name), name)
+		z.writestr('quiz.qpg', quiz.getbuffer(), zipfile.ZIP_STORED)
+	jsonhandler.atomic_write(path, [archive.getbuffer()], encoding = None)
+	os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+	return path
+
+class BuildCache:
+	"""
+	Build folder under root for the player runtime of the sources in the folder src, built by python. script is the
+	script the runtime runs.
+	"""
+	def __init__(self, root, src, python, env = None, script = PLAYER_SCRIPT):
+		self.root = root
+		self.src = src
+		self.python = python
+		self.env = env
+		self.script = script
+
+		key = hashlib.sha256(toolchain(python, env).encode('utf-8'))
+		for name in PLAYER_MODULES + ICONS:
+			with open(os.path.join(src, name), 'rb') as f: key.update(name.encode('utf-8') + b'\0' + hashlib.sha256(f.read()).digest())
+		key.update(script.encode('utf-8') + SPEC.encode('utf-8'))
+		self.folder = os.path.join(root, key.hexdigest()[:16])
+
+	def prepare(self):
+		"""Sets up the build folder, unless an earlier build already did."""
+		complete = os.path.join(self.folder, '.complete')
+		if os.path.exists(complete): return
+		for name in PLAYER_MODULES + ICONS: shutil.copy(os.path.join(self.src, name), self.folder)
+		with open(os.path.join(self.folder, 'run_quiz.py'), 'w') as f: f.write(self.script)
+		with open(os.path.join(self.folder, 'quiz.spec'), 'w') as f: f.write(SPEC)
+		open(complete, 'w').close()
+
+	def runtime(self, run = subprocess.run):
+		"""
+		Returns the path of the player runtime, building it first if this folder has none yet. Builds in the same
+		folder wait for each other. run is called like subprocess.run to invoke PyInstaller.
+		"""
+		path = exe_path(self.folder, RUNTIME)
+		os.makedirs(self.folder, exist_ok = True)
+		with open(os.path.join(self.folder, 'lock'), 'ab') as lock_file:
+			journal.lock(lock_file, True)
+			if os.path.exists(path): return path
+			self.prepare()
+			# an interrupted build must not leave a runtime behind, so it only moves in once finished
+			distpath = os.path.join(self.folder, 'dist')
+			try:
+				run([self.python, '-m', 'PyInstaller', '-y', '--distpath', distpath, '--workpath', os.path.join(self.folder, 'work'), os.path.join(self.folder, 'quiz.spec')], check = True, env = self.env)
+				os.replace(exe_path(distpath, RUNTIME), path)
+			finally: shutil.rmtree(distpath, ignore_errors = True)
+		return path
+
+	def prune(self):
+		"""Removes the build folders of other sources and toolchains, unless a build is running in them."""
+		for name in os.listdir(self.root):
+			folder = os.path.join(self.root, name)
+			if folder == self.folder or not os.path.isdir(folder): continue
+			try: lock_file = open(os.path.join(folder, 'lock'), 'ab')
+			except OSError: continue
+			locked = journal.lock(lock_file)
+			lock_file.close()
+			if locked: shutil.rmtree(folder, ignore_errors = True)
+
+def player_runtime(root, status = None, run = subprocess.run):
+	"""
+	Returns the player runtime: the one shipped with a frozen build, or else the one in the build cache under root,
+	built with this Python or with the embeddable Python shipped with a frozen build. status is called with a
+	description of every step; run is passed on to BuildCache.runtime().
+	"""
+	if status is None: status = lambda text: None
+	frozen = getattr(sys, '_MEIPASS', None)
+	if frozen:
+		runtime = exe_path(frozen, RUNTIME)
+		if os.path.exists(runtime): return runtime
+		status('Setting up environment')
+		embed = extract_env(os.path.join(frozen, 'compiler_env.zip'), os.path.join(root, 'compiler-env'))
+		python = os.path.join(embed, 'python.exe')
+		env = build_env(embed)
+	else:
+		python = sys.executable
+		env = build_env()
+
+	status('Checking build cache')
+	cache = BuildCache(os.path.join(root, 'build-cache'), os.path.dirname(os.path.abspath(__file__)), python, env)
+	status('Building the player runtime\nThis only takes a while on the first compile')
+	runtime = cache.runtime(run)
+	cache.prune()
+	return runtime
+
+def build_runtime(distpath, root = 'build'):
+	"""Copies the player runtime to distpath, building it with this Python if needed."""
+	os.makedirs(distpath, exist_ok = True)
+	return shutil.copy2(player_runtime(root, print), distpath)
+
+def compile_quiz(runtime, path, exe):
+	"""
+	Compiles the quiz file at path into the executable exe. Returns (seconds, size), or (seconds, error message)
+	if the quiz cannot be compiled.
+	"""
+	start = time.perf_counter()
+	try:
+		datafile, report = jsonhandler.validate_file(path, cache_bytes = 64 << 20)
+		if report: result = f'{len(report)} error{"s" if len(report) > 1 else ""}: {report.summary()}'
+		else: result = os.path.getsize(write_player(runtime, datafile, exe))
+	except OSError as exc: result = exc.strerror or str(exc)
+	except (json.decoder.JSONDecodeError, UnicodeDecodeError): result = 'Invalid JSON data!'
+	except qpg.QPGError as exc: result = f'Invalid QPG data! ({exc})'
+	return time.perf_counter() - start, result
+
+def compile_files(paths, outdir, jobs = None, root = 'build'):
+	"""
+	Compiles the quiz files in paths (folders stand for the quizzes in them) into outdir, jobs at a time, and prints
+	the time and size of every executable. Executables are named after their quiz file. Returns 1 if any quiz
+	could not be compiled, else 0.
+	"""
+	if jobs is not None and jobs < 1:
+		print(f'Invalid number of jobs: {jobs}')
+		return 1
+	files = []
+	for path in paths:
+		if os.path.isdir(path): files += sorted(os.path.join(path, name) for name in os.listdir(path) if os.path.splitext(name)[1].casefold() in ('.qpg', '.json'))
+		else: files.append(path)
+	if not files:
+		print('No quiz files to compile')
+		return 1
+	exes = [exe_path(outdir, os.path.splitext(os.path.basename(path))[0]) for path in files]
+	# Quiz.qpg and quiz.json are the same executable on Windows and macOS, whose file names are not case-sensitive
+	keys = [os.path.normcase(exe).casefold() for exe in exes]
+	counts = collections.Counter(keys)
+	if len(counts) < len(keys):
+		print('Quiz files with the same name would overwrite each other:')
+		for path, key in zip(files, keys):
+			if counts[key] > 1: print(f'  {path}')
+		return 1
+
+	start = time.perf_counter()
+	runtime = player_runtime(root, print)
+	os.makedirs(outdir, exist_ok = True)
+
+	compiled = 0
+	total = 0
+	width = max((len(path) for path in files), default = 0)
+	# the runtime is shared, every process only encodes its quiz and copies the runtime
+	with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+		futures = [pool.submit(compile_quiz, runtime, path, exe) for path, exe in zip(files, exes)]
+		for path, exe, future in zip(files, exes, futures):
+			# anything compile_quiz does not turn into a message only fails this quiz
+			try: seconds, result = future.result()
+			except Exception as exc:
+				print(f'{path.ljust(width)}  {"-":>7} ms  {type(exc).__name__}: {exc}')
+				continue
+			if type(result) is int:
+				compiled += 1
+				total += result
+				print(f'{path.ljust(width)}  {seconds * 1000:7.0f} ms  {result / (1 << 20):7.1f} MiB  {exe}')
+			else:
+				print(f'{path.ljust(width)}  {seconds * 1000:7.0f} ms  {result}')
+	print(f'Compiled {compiled} of {len(files)} quiz{"zes" if len(files) != 1 else ""} in {time.perf_counter() - start:.1f} s, {total / (1 << 20):.1f} MiB in total')
+	return 0 if compiled == len(files) else 1
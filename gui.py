@@ -4,9 +4,6 @@ if __name__ == '__main__':
 	sys.exit()
 
 import os
-import shutil
-import platform
-import traceback
 import tkinter as tk
 import tkinter.ttk as ttk
 import tkinter.font
@@ -21,56 +18,46 @@ except AttributeError: temp_path = os.getcwd()
 import re
 import json
 import time
-import random
-import zipfile
-import importlib
+import queue
 import threading
-import subprocess
-import webbrowser
 import configparser
-import urllib.request
+import search
+import history
+import journal
+import player
+import jsonhandler
 from jsonhandler import JSONHandler
+from player import name, username, repo_name, version, internal_version, prerelease
+from player import fmt_oserror, report_error, disable_all_widgets, about_text
+from player import QuizPlayer, VerticalScrolledFrame, Tooltip
 
-name = 'QuizProg-GUI'
+class Deferred:
+	"""Attribute built by factory(instance) when it is first used, for the parts of the editor that start up unused."""
+	def __init__(self, factory): self.factory = factory
 
-username = 'gamingwithevets'
-repo_name = 'quizprog-gui'
+	def __set_name__(self, owner, name): self.name = name
 
-version = '1.2.0_01'
-internal_version = 'v1.2.0_01'
-prerelease = False
+	def __get__(self, instance, owner = None):
+		if instance is None: return self
+		# stored on the instance, which takes precedence over this descriptor from now on
+		value = instance.__dict__[self.name] = self.factory(instance)
+		return value
 
-license = 'Expat (MIT)'
-
-g = None
-
-def fmt_oserror(exc):
-	if os.name == 'nt':
-		if exc.winerror: errno = f'WE{exc.winerror}'
-		else: errno = exc.errno
-	else: errno = exc.errno
-	return f'[{type(exc).__name__}] {exc.filename}{", "+exc.filename2 if exc.filename2 else ""}: {exc.strerror} ({errno})'
-
-@staticmethod
-def report_error(e, val, tb, fatal = False):
-	err_text = '\n'.join(traceback.format_exception(e, val, tb)) + f'\nIf this error persists, please report it here:\nhttps://github.com/{username}/{repo_name}/issues'
-
-	exc = val
-
-	print(f'{"Fatal exception" if fatal else "Exception"} raised:\n\n' + err_text)
-	if issubclass(type(exc), OSError): message = fmt_oserror(exc)
-	else: message = f'[{type(exc).__name__}] {exc}'
-	g.set_message_force(message)
-	g.window.update()
-	return 'Oops! A fatal error has occured.\n\n' + err_text
+class GUI:
+	compile_exe = Deferred(lambda gui: CompileEXE(gui))
+	quiz_player = Deferred(lambda gui: QuizPlayer(gui))
+	quizconf = Deferred(lambda gui: QuizConf(gui))
+	question_viewer = Deferred(lambda gui: QuestionViewer(gui))
+	updater_gui = Deferred(lambda gui: UpdaterGUI(gui))
 
-tk.Tk.report_callback_exception = report_error
+	# compiled quizzes run in player.Player, QuizPlayer tells the two apart by this
+	player_mode = False
 
-class GUI:
-	def __init__(self, savepath, player_mode = False):
+	def __init__(self, savepath):
 		self.version = version
 
 		self.window = tk.Tk()
+		self.screens = player.Screens(self.window)
 
 		self.temp_path = temp_path
 
@@ -93,23 +80,26 @@ class GUI:
 		self.message_force = None
 		self.datafile = {'title': 'My Quiz', 'questions': [{'question': 'Question', 'a': 'Answer A', 'b': 'Answer B', 'c': 'Answer C', 'd': 'Answer D', 'correct': 'a'}]}
 		self.datafile_mode = 'json'
+		self.history = history.History(self.datafile)
+		# crash recovery journal of the edits, editor only
+		self.journal = None
+		self.journal_sync_pending = False
 
 		self.savepath = savepath
 		self.allowsave = True
 
-		self.modified = False
-
-		self.player_mode = player_mode
-
 		self.auto_check_updates = tk.BooleanVar(); self.auto_check_updates.set(True)
 		self.check_prerelease_version = tk.BooleanVar(); self.check_prerelease_version.set(False)
 
-		self.updates_checked = player_mode
+		self.updates_checked = False
 
 		self.debug = False
 
+		# upper bound for decoded questions of QPG quizzes kept in memory
+		self.question_cache_mb = 64
+
 		if os.name == 'nt': self.appdata_folder = f'{os.getenv("LOCALAPPDATA")}\\{name}'
-		elif platform.system() == 'Darwin': self.appdata_folder = os.path.expanduser(f'~/Library/Application Support/{name}')
+		elif sys.platform == 'darwin': self.appdata_folder = os.path.expanduser(f'~/Library/Application Support/{name}')
 		else: self.appdata_folder = os.path.expanduser(f'~/.config/{name}')
 
 		self.save_to_cwd = False
@@ -118,16 +108,14 @@ class GUI:
 
 		self.input_string_text = ''
 		self.input_string_skip = False
+		# message bars of the kept screens
+		self.msg_labels = {}
 
 		self.jsonhandler = JSONHandler(self, report_error, fmt_oserror)
-		self.compile_exe = CompileEXE(self)
-		self.quiz_player = QuizPlayer(self)
-		self.quizconf = QuizConf(self)
-		self.question_viewer = QuestionViewer(self)
-		self.updater_gui = UpdaterGUI(self)
 
 		self.unsupported_tcl = False
 		if sys.version_info < (3, 7, 6):
+			import platform
 			if tk.messagebox.askyesno('Warning', f'It looks like you are running Python {platform.python_version()}, which has a version of Tcl/Tk that doesn\'t support some Unicode characters.\n\nDo you want to continue?', icon = 'warning'): self.unsupported_tcl = True
 			else: self.quit()
 
@@ -135,15 +123,22 @@ class GUI:
 		self.message_force = msg
 		self.config_msg()
 
+	@property
+	def modified(self): return self.history.modified
+
 	def start_main(self):
 		if not self.updates_checked:
-			if self.auto_check_updates.get(): threading.Thread(target = self.auto_update).start()
+			if self.auto_check_updates.get():
+				# built here, not by the update thread
+				self.updater_gui
+				threading.Thread(target = self.auto_update).start()
 			else: self.updates_checked = True
 
-		if self.savepath and not self.savepath.isspace():
+		recovered = self.recover()
+		if not recovered and self.savepath and not self.savepath.isspace():
 			if not self.savepath.endswith('.json') and not self.savepath.endswith('.qpg'): tk.messagebox.showwarning('Warning', f"Your quiz's extension is of a file type unsupported by {name}. You'll still be able to load the file normally, but it is recommended to fix this issue in the future.")
 			self.savepath = os.path.abspath(self.savepath)
-			success, message = self.jsonhandler.check_json(self.savepath)
+			success, message = self.jsonhandler.load(self.savepath)
 			if success:
 				self.message = message
 				self.open_file_ex()
@@ -151,9 +146,73 @@ class GUI:
 				self.message_force = message
 				self.savepath = self.jsonhandler.savepath = ''
 
-		self.window.after(0, self.quiz_player.main if self.player_mode else self.main)
+		if not self.journal:
+			try: self.journal = journal.Journal.create(os.path.join(self.appdata_folder, 'recovery'))
+			except OSError as exc: self.message_force = f'Crash recovery is unavailable: {fmt_oserror(exc)}'
+		self.journal_start()
+
+		self.window.after(0, self.main)
 		self.window.mainloop()
 
+	def recover(self):
+		"""Offers to recover the quizzes of sessions that did not close properly. Returns True if one was recovered."""
+		for old in journal.Journal.orphans(os.path.join(self.appdata_folder, 'recovery')):
+			recovery = old.read()
+			if recovery is None or not (recovery.base.get('modified') or recovery.records):
+				old.close()
+				continue
+
+			savepath = recovery.base['savepath']
+			if not tk.messagebox.askyesno('Recover unsaved changes?', f'{name} was not closed properly while {os.path.basename(savepath) if savepath else "a new quiz"} had unsaved changes.\n\nDo you want to recover them?'):
+				old.close()
+				continue
+
+			success, message = self.jsonhandler.load(old.path(recovery.generation, 'qpg') if recovery.base.get('checkpoint') else savepath)
+			if not success:
+				# keep the journal for another try
+				self.message_force = f'Could not recover unsaved changes: {message}'
+				old.close(False)
+				return False
+			self.jsonhandler.savepath = savepath
+			self.open_file_ex()
+			self.datafile_mode = recovery.base['format']
+			if recovery.base.get('modified'): self.history.mark_unsaved()
+			journal.replay(self.history, recovery.records)
+			# the recovered session continues in the same journal
+			self.journal = old
+			self.message = 'Unsaved changes recovered!'
+			return True
+		return False
+
+	def journal_start(self):
+		"""Starts a new journal generation from the current quiz: its file if saved, otherwise a checkpoint."""
+		if not self.journal: return
+		try:
+			if self.savepath and not self.modified: self.journal.start(journal.file_base(self.savepath, self.datafile_mode))
+			else: self.journal.checkpoint(jsonhandler.snapshot(self.datafile), savepath = self.savepath, format = self.datafile_mode, modified = self.modified)
+		except OSError as exc: self.journal_error(exc)
+
+	def journal_record(self, action, edit = None):
+		if not self.journal: return
+		self.journal.record(action, edit)
+		if not self.journal_sync_pending:
+			self.journal_sync_pending = True
+			self.window.after(self.journal.sync_delay, self.journal_sync)
+
+	def journal_sync(self):
+		self.journal_sync_pending = False
+		if not self.journal: return
+		try:
+			self.journal.flush()
+			if self.journal.needs_checkpoint(): self.journal.checkpoint(jsonhandler.snapshot(self.datafile), savepath = self.savepath, format = self.datafile_mode, modified = True)
+		except OSError as exc: self.journal_error(exc)
+
+	def journal_error(self, exc):
+		try: self.journal.close(False)
+		except OSError: pass
+		self.journal = None
+		self.message_force = f'Crash recovery was turned off: {fmt_oserror(exc)}'
+
 	def auto_update(self):
 		self.update_thread = ThreadWithResult(target = self.updater_gui.updater.check_updates, args = (True,))
 		self.update_thread.start()
@@ -182,6 +241,10 @@ class GUI:
 
 		sects = self.ini.sections()
 		if sects:
+			if 'settings' in sects:
+				try: self.question_cache_mb = max(1, self.ini.getint('settings', 'question_cache_mb'))
+				except: pass
+
 			if 'updater' in sects:
 				try: self.auto_check_updates.set(self.ini.getboolean('updater', 'auto_check_updates'))
 				except: pass
@@ -200,6 +263,7 @@ class GUI:
 		# settings are set individually to retain compatibility between versions
 
 		if 'settings' not in sects: self.ini['settings'] = {}
+		self.ini['settings']['question_cache_mb'] = str(self.question_cache_mb)
 
 		if 'updater' not in sects: self.ini['updater'] = {}
 		self.ini['updater']['auto_check_updates'] = str(self.auto_check_updates.get())
@@ -214,19 +278,55 @@ class GUI:
 		if not os.path.exists(self.appdata_folder): os.makedirs(self.appdata_folder)
 		with open(os.path.join(self.appdata_folder, 'settings.ini'), 'w') as f: self.ini.write(f)
 
+	def open_progress(self, text):
+		self.progress_win = tk.Toplevel(self.window)
+		self.progress_win.title(name)
+		self.progress_win.resizable(False, False)
+		self.progress_win.protocol('WM_DELETE_WINDOW', lambda: None)
+		ttk.Label(self.progress_win, text = text).pack()
+		self.progressbar = ttk.Progressbar(self.progress_win, orient = 'horizontal', length = 300, mode = 'determinate')
+		self.progressbar.pack()
+		self.progress_value = -1
+		self.progress_win.update_idletasks()
+
+	def set_progress(self, done, total):
+		# only redraw when the percentage changes, large files report thousands of chunks
+		value = int(done * 100 / total) if total else 0
+		if value != self.progress_value:
+			self.progress_value = value
+			self.progressbar['value'] = value
+			self.progress_win.update_idletasks()
+
+	def close_progress(self): self.progress_win.destroy()
+
 	def n_a(self): tk.messagebox.showinfo('Not implemented', f'This feature is not yet implemented into {name}.\nSorry!')
 
-	def refresh(self, load_func = False, custom_func = None, menubar = True):
-		for w in self.window.winfo_children(): w.destroy()
+	def refresh(self, load_func = False, custom_func = None, menubar = True, screen = None):
+		self.screens.clear(screen)
 		
 		self.rebind()
 		if menubar: self.menubar()
+		else: self.window.config(menu = '')
 		self.set_title()
 
 		if load_func:
 			if custom_func == None: self.main()
 			else: custom_func()
 
+	def show_screen(self, name, build, menubar = True, message = False):
+		"""
+		Like refresh(), but shows the kept screen name, which build(frame) makes the first time (see player.Screens).
+		With message, the screen starts with its own message bar.
+		"""
+		self.refresh(menubar = menubar, screen = name)
+		def build_screen(frame):
+			if message: self.msg_labels[name] = self.message_bar(frame)
+			build(frame)
+		frame = self.screens.show(name, build_screen)
+		if message:
+			self.msg_label = self.msg_labels[name]
+			self.config_msg()
+		return frame
 
 	def quit(self):
 		cancel = self.prompt_save_changes()
@@ -234,7 +334,10 @@ class GUI:
 
 		if not any([
 			self.updater_win_open,
-			]): sys.exit()
+			]):
+			self.compile_exe.cancel()
+			if self.journal: self.journal.close()
+			sys.exit()
 
 	def set_title(self):
 		try:
@@ -244,20 +347,6 @@ class GUI:
 			self.window.title(title)
 		except: self.window.title(f'{name} {version}')
 
-	# no tab! (sorry keyboard users...)
-	@staticmethod
-	def disable_all_widgets():
-		def set_takefocus_false(widget_class):
-			orig_init = widget_class.__init__
-			def new_init(self, *args, **kwargs):
-				orig_init(self, *args, **kwargs)
-				try: self.config(takefocus = False)
-				except: pass
-			widget_class.__init__ = new_init
-
-		set_takefocus_false(tk.Widget)
-		set_takefocus_false(ttk.Widget)
-
 	def main_focus(self, event):
 		if event.widget == self.window: self.window.focus()
 
@@ -268,12 +357,15 @@ class GUI:
 		self.window.option_add('*tearOff', False)
 		self.window.protocol('WM_DELETE_WINDOW', self.quit)
 		
-		self.disable_all_widgets()
+		disable_all_widgets()
 
 		self.set_title()
 		icon = 'ico' if os.name == 'nt' else 'xbm'
-		try: self.window.iconbitmap(f'{self.temp_path}\\icon.{icon}')
+		# X11 takes bitmap files as @path
+		icon_path = os.path.join(self.temp_path, f'icon.{icon}')
+		try: self.window.iconbitmap(icon_path if os.name == 'nt' else '@' + icon_path)
 		except tk.TclError:
+			import traceback
 			err_text = f'Whoops! The icon file "icon.{icon}" is required.\nCan you make sure the file is in "{self.temp_path}"?\n\n{traceback.format_exc()}\nIf this problem persists, please report it here:\nhttps://github.com/{username}/{repo_name}/issues'
 			print(err_text)
 			tk.messagebox.showerror('Hmmm?', err_text)
@@ -299,7 +391,8 @@ class GUI:
 		self.jsonhandler.new_quiz()
 		self.datafile = self.jsonhandler.datafile
 		self.savepath = self.jsonhandler.savepath
-		self.modified = False
+		self.history.reset(self.datafile)
+		self.journal_start()
 		self.message = 'New quiz created!'
 		self.config_msg()
 
@@ -314,17 +407,20 @@ class GUI:
 
 	def open_file_ex(self):
 		self.savepath = self.jsonhandler.savepath
-		if os.path.splitext(self.savepath)[1].casefold() == '.json': self.datafile_mode = 'json'
-		#else: self.datafile_mode = 'qpg'
-		else: self.datafile_mode = 'json'
+		self.datafile_mode = jsonhandler.file_format(self.savepath)
 		self.datafile = self.jsonhandler.datafile
-		self.modified = False
+		self.history.reset(self.datafile)
+		self.journal_start()
 
 	def save_file(self):
 		if self.savepath:
-			with open(self.savepath, 'w', encoding = 'utf-8') as f: f.write(json.dumps(self.datafile, ensure_ascii = False, indent = 4))
-			self.message = 'Quiz saved!'
-			self.modified = False
+			try: written = self.jsonhandler.write_file(self.savepath)
+			except OSError:
+				self.window.report_callback_exception(*sys.exc_info())
+				return False
+			self.message = 'Quiz saved!' if written else 'No changes since the last save.'
+			self.history.mark_saved()
+			self.journal_start()
 			self.config_msg()
 			return True
 		else:
@@ -335,53 +431,97 @@ class GUI:
 		ok = self.jsonhandler.save_file(self.datafile_mode == 'json')
 		if ok:
 			self.savepath = self.jsonhandler.savepath
-			self.modified = False
+			self.datafile_mode = jsonhandler.file_format(self.savepath)
+			self.history.mark_saved()
+			self.journal_start()
 		
 		self.config_msg()
 		return ok
 
+	def export_json(self):
+		path = tk.filedialog.asksaveasfilename(title = 'Export as JSON', initialdir = os.path.dirname(self.savepath) if self.savepath else os.getcwd(), initialfile = f'{self.datafile["title"]}.json', filetypes = [('QuizProg Quiz Projects', '*.json'), ('All Files', '*.*')], defaultextension = '.json')
+		if not path: return
+		try: self.jsonhandler.write_file(path, 'json')
+		except OSError:
+			self.window.report_callback_exception(*sys.exc_info())
+			return
+		self.message = f'Quiz exported as: {path}'
+		self.config_msg()
+
+	def export_pyz(self):
+		path = tk.filedialog.asksaveasfilename(title = 'Export as Python app', initialdir = os.path.dirname(self.savepath) if self.savepath else os.getcwd(), initialfile = f'{self.datafile["title"]}.pyz', filetypes = [('Python Zip Applications', '*.pyz'), ('All Files', '*.*')], defaultextension = '.pyz')
+		if not path: return
+		import compiler
+		try: compiler.write_pyz(jsonhandler.snapshot(self.datafile), path)
+		except OSError:
+			self.window.report_callback_exception(*sys.exc_info())
+			return
+		self.message = f'Quiz exported as: {path}'
+		self.config_msg()
+
+	def export_html(self):
+		path = tk.filedialog.asksaveasfilename(title = 'Export as web page', initialdir = os.path.dirname(self.savepath) if self.savepath else os.getcwd(), initialfile = f'{self.datafile["title"]}.html', filetypes = [('Web Pages', '*.html *.htm'), ('All Files', '*.*')], defaultextension = '.html')
+		if not path: return
+		import htmlexport
+		try: htmlexport.write_html(jsonhandler.snapshot(self.datafile), path)
+		except OSError:
+			self.window.report_callback_exception(*sys.exc_info())
+			return
+		self.message = f'Quiz exported as: {path}'
+		self.config_msg()
+
 	def reload(self):
 		if self.modified:
 			confirm = tk.messagebox.askyesno('Reload changes?', 'Are you sure you want to reload this quiz and lose the changes you made in QuizProg-GUI?\n\nThis will take you back to the menu.', icon = 'warning')
 			if confirm and self.savepath:
 					self.jsonhandler.reload()
-					self.modified = False
+					self.history.reset(self.datafile)
+					self.journal_start()
 					self.message = 'Quiz reloaded.'
 					self.config_msg()
 					self.refresh(True)
 			else: return
 
-	def about_menu(self):
-		nl = '\n' # workaround for prohibition of backslashes in f-string expression
-		tk.messagebox.showinfo(f'About {name}', f'''\
-{name} - {version} ({'64' if sys.maxsize > 2**31-1 else '32'}-bit) - Running on {platform.system()} x{'64' if platform.machine().endswith('64') else '86'}
-Project page: https://github.com/{username}/{repo_name}
-{nl+'WARNING: This is a pre-release version, therefore it may have bugs and/or glitches.'+nl if prerelease else ''}
-Licensed under the {license} license
-
-Copyright (c) 2022-2026 GamingWithEvets Inc.
-
-Permission is hereby granted, free of charge, to any person obtaining a copy \
-of this software and associated documentation files (the "Software"), to deal \
-in the Software without restriction, including without limitation the rights \
-to use, copy, modify, merge, publish, distribute, sublicense, and/or sell \
-copies of the Software, and to permit persons to whom the Software is \
-furnished to do so, subject to the following conditions:
-
-The above copyright notice and this permission notice shall be included in all \
-copies or substantial portions of the Software.
-
-THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR \
-IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, \
-FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE \
-AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER \
-LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, \
-OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE \
-SOFTWARE.\
-''')
+	def commit(self, label, changes):
+		"""Applies changes to the quiz as one edit that can be undone."""
+		edit = self.history.do(label, changes)
+		if edit: self.journal_record('do', edit)
+		self.set_title()
+		return edit
+
+	def undo(self):
+		edit = self.history.undo()
+		if edit:
+			self.journal_record('undo')
+			self.show_edit(edit, f'Undone: {edit.label}')
+
+	def redo(self):
+		edit = self.history.redo()
+		if edit:
+			self.journal_record('redo')
+			self.show_edit(edit, f'Redone: {edit.label}')
+
+	def show_edit(self, edit, message):
+		"""Goes to the screen where the changes of edit can be seen."""
+		self.message = message
+		change = edit.changes[0]
+		section = change.path[0] if change.path else change.key
+		if section == 'questions': self.question_viewer.main(min(change.key, len(self.datafile['questions']) - 1))
+		elif section == 'wrongmsg': self.quizconf.wrongmsg_editor.main(change.key if change.path else 0)
+		elif section in QuizConf.defaults: self.quizconf.main()
+		else: self.main()
+
+	def update_edit_menu(self, edit_menu):
+		undo = self.history.top()
+		redo = self.history.redo_stack[-1] if self.history.redo_stack else None
+		edit_menu.entryconfig(0, label = f'Undo {undo.label}' if undo else 'Undo', state = 'normal' if undo else 'disabled')
+		edit_menu.entryconfig(1, label = f'Redo {redo.label}' if redo else 'Redo', state = 'normal' if redo else 'disabled')
+
+	def about_menu(self): tk.messagebox.showinfo(f'About {name}', about_text())
 
 	def version_details(self, event = None):
 		if self.debug:
+			import platform
 			dnl = '\n\n'
 			tk.messagebox.showinfo(f'{name} version details', f'''\
 {name} {version}{" (prerelease)" if prerelease else ""}
@@ -405,58 +545,65 @@ Architecture: {platform.machine()}{dnl+"Settings file is saved to working direct
 
 
 	def menubar(self):
+		# the menubar only depends on debug mode, so each one is built once
+		self.screens.menubar(self.debug, self.build_menubar)
+
+		self.window.bind('<Control-n>', lambda x: self.new_quiz())
+		self.window.bind('<Control-o>', lambda x: self.open_file())
+		self.window.bind('<Control-s>', lambda x: self.save_file())
+		self.window.bind('<Control-Shift-S>', lambda x: self.save_file_as())
+		self.window.bind('<Control-z>', lambda x: self.undo())
+		self.window.bind('<Control-y>', lambda x: self.redo())
+		self.window.bind('<Control-Shift-Z>', lambda x: self.redo())
+
+	def build_menubar(self):
 		menubar = tk.Menu(self.window)
 
 		file_menu = tk.Menu(menubar)
-		if not self.player_mode:
-			file_menu.add_command(label = 'New quiz', command = self.new_quiz, accelerator = 'Ctrl+N')
-			file_menu.add_command(label = 'Open...', command = self.open_file, accelerator = 'Ctrl+O')
-			file_menu.add_command(label = 'Save', command = self.save_file, accelerator = 'Ctrl+S')
-			self.window.bind('<Control-n>', lambda x: self.new_quiz())
-			self.window.bind('<Control-o>', lambda x: self.open_file())
-			self.window.bind('<Control-s>', lambda x: self.save_file())
-		if (self.player_mode and self.debug) or not self.player_mode:
-			file_menu.add_command(label = 'Save as...', command = self.save_file_as, accelerator = 'Ctrl+Shift+S')
-			file_menu.add_separator()
-			self.window.bind('<Control-Shift-S>', lambda x: self.save_file_as())
-		if not self.player_mode:
-			file_menu.add_command(label = 'Compile executable file', command = self.compile_exe.main)
-			file_menu.add_separator()
+		file_menu.add_command(label = 'New quiz', command = self.new_quiz, accelerator = 'Ctrl+N')
+		file_menu.add_command(label = 'Open...', command = self.open_file, accelerator = 'Ctrl+O')
+		file_menu.add_command(label = 'Save', command = self.save_file, accelerator = 'Ctrl+S')
+		file_menu.add_command(label = 'Save as...', command = self.save_file_as, accelerator = 'Ctrl+Shift+S')
+		file_menu.add_command(label = 'Export as JSON...', command = self.export_json)
+		file_menu.add_separator()
+		file_menu.add_command(label = 'Compile executable file', command = lambda: self.compile_exe.main())
+		file_menu.add_command(label = 'Export as Python app...', command = self.export_pyz)
+		file_menu.add_command(label = 'Export as web page...', command = self.export_html)
+		file_menu.add_separator()
 		file_menu.add_command(label = 'Exit', command = self.quit)
 		menubar.add_cascade(label = 'File', menu = file_menu)
 
-		if not self.player_mode:
-			edit_menu = tk.Menu(menubar)
-			edit_menu.add_command(label = 'Reload', command = self.reload)
-			menubar.add_cascade(label = 'Edit', menu = edit_menu)
+		edit_menu = tk.Menu(menubar, postcommand = lambda: self.update_edit_menu(edit_menu))
+		edit_menu.add_command(label = 'Undo', command = self.undo, accelerator = 'Ctrl+Z')
+		edit_menu.add_command(label = 'Redo', command = self.redo, accelerator = 'Ctrl+Y')
+		edit_menu.add_separator()
+		edit_menu.add_command(label = 'Reload', command = self.reload)
+		menubar.add_cascade(label = 'Edit', menu = edit_menu)
 
-		if not self.player_mode:
-			settings_menu = tk.Menu(menubar)
-			updater_settings_menu = tk.Menu(settings_menu)
-			updater_settings_menu.add_checkbutton(label = 'Check for updates on startup', variable = self.auto_check_updates, command = self.save_settings)
-			updater_settings_menu.add_checkbutton(label = 'Check for pre-release versions', variable = self.check_prerelease_version, command = self.save_settings)
-			settings_menu.add_cascade(label = 'Updates', menu = updater_settings_menu)
+		settings_menu = tk.Menu(menubar)
+		updater_settings_menu = tk.Menu(settings_menu)
+		updater_settings_menu.add_checkbutton(label = 'Check for updates on startup', variable = self.auto_check_updates, command = self.save_settings)
+		updater_settings_menu.add_checkbutton(label = 'Check for pre-release versions', variable = self.check_prerelease_version, command = self.save_settings)
+		settings_menu.add_cascade(label = 'Updates', menu = updater_settings_menu)
 
 		if self.debug:
-			debug_menu = tk.Menu(None if self.player_mode else settings_menu)
+			debug_menu = tk.Menu(settings_menu)
 			debug_menu.add_command(label = 'Version details', command = self.version_details, accelerator = 'F12')
 			debug_menu.add_separator()
 			debug_menu.add_command(label = 'Updater test', command = lambda: self.updater_gui.init_window(debug = True))
 			debug_menu.add_separator()
 			debug_menu.add_command(label = 'Disable debug mode', command = self.disable_debug)
-			if self.player_mode: menubar.add_cascade(label = 'Debug', menu = debug_menu)
-			else:
-				settings_menu.add_separator()
-				settings_menu.add_cascade(label = 'Debug', menu = debug_menu)
+			settings_menu.add_separator()
+			settings_menu.add_cascade(label = 'Debug', menu = debug_menu)
 
-		if not self.player_mode: menubar.add_cascade(label = 'Settings', menu = settings_menu)
+		menubar.add_cascade(label = 'Settings', menu = settings_menu)
 
 		help_menu = tk.Menu(menubar)
-		if not self.player_mode: help_menu.add_command(label = 'Check for updates', command = self.updater_gui.init_window)
-		help_menu.add_command(label = f'{"Powered by" if self.player_mode else "About"} {name}', command = self.about_menu)
+		help_menu.add_command(label = 'Check for updates', command = lambda: self.updater_gui.init_window())
+		help_menu.add_command(label = f'About {name}', command = self.about_menu)
 		menubar.add_cascade(label = 'Help', menu = help_menu)
 
-		self.window.config(menu = menubar)
+		return menubar
 		
 	def config_msg(self):
 		if self.msg_label.winfo_exists():
@@ -466,9 +613,13 @@ Architecture: {platform.machine()}{dnl+"Settings file is saved to working direct
 			self.message = self.message_force = None
 			Tooltip(self.msg_label, self.msg_label['text'])
 
+	def message_bar(self, master = None):
+		label = ttk.Label(master, foreground = 'white', anchor = 'center', width = self.display_w)
+		label.pack()
+		return label
+
 	def print_msg(self):
-		self.msg_label = ttk.Label(foreground = 'white', anchor = 'center', width = self.display_w)
-		self.msg_label.pack()
+		self.msg_label = self.message_bar()
 		self.config_msg()
 
 	"""--------- BEGIN MENUS ---------"""
@@ -476,25 +627,30 @@ Architecture: {platform.machine()}{dnl+"Settings file is saved to working direct
 	def main(self):
 		self.set_title()
 
-		self.refresh()
-		self.print_msg()
+		self.show_screen('main', self.build_main, message = True)
 
-		ttk.Label(text = self.datafile['title'], font = self.bold_font).pack()
-		ttk.Label(text = f'--- {len(self.datafile["questions"])} question(s) ---', font = self.bold_font).pack()
-		ttk.Label(text = f'Quiz format: {self.datafile_mode.upper()}').pack()
+		self.title_label.config(text = self.datafile['title'])
+		self.qcount_label.config(text = f'--- {len(self.datafile["questions"])} question(s) ---')
+		self.format_label.config(text = f'Quiz format: {self.datafile_mode.upper()}')
 		if self.jsonhandler.check_element('description', rel = False):
 			if self.datafile['description']: desc = self.datafile['description']
 			else: desc = '(no description)'
 		else: desc = '(no description)'
-		ttk.Label(text = desc, justify = 'center', font = self.italic_font).pack()
-
-		ttk.Button(text = 'Quiz settings', command = self.quizconf.main).pack(side = 'bottom')
-		ttk.Button(text = 'Quiz questions', command = self.question_viewer.main).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-		ttk.Button(text = 'Edit quiz description', command = self.quiz_desc).pack(side = 'bottom')
-		ttk.Button(text = 'Rename quiz', command = self.quiz_name).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-		ttk.Button(text = 'Preview quiz', command = self.quiz_player.main).pack(side = 'bottom')
+		self.desc_label.config(text = desc)
+
+	def build_main(self, frame):
+		self.title_label = ttk.Label(frame, font = self.bold_font); self.title_label.pack()
+		self.qcount_label = ttk.Label(frame, font = self.bold_font); self.qcount_label.pack()
+		self.format_label = ttk.Label(frame); self.format_label.pack()
+		self.desc_label = ttk.Label(frame, justify = 'center', font = self.italic_font); self.desc_label.pack()
+
+		ttk.Button(frame, text = 'Quiz settings', command = lambda: self.quizconf.main()).pack(side = 'bottom')
+		ttk.Button(frame, text = 'Quiz questions', command = lambda: self.question_viewer.main()).pack(side = 'bottom')
+		ttk.Label(frame).pack(side = 'bottom')
+		ttk.Button(frame, text = 'Edit quiz description', command = self.quiz_desc).pack(side = 'bottom')
+		ttk.Button(frame, text = 'Rename quiz', command = self.quiz_name).pack(side = 'bottom')
+		ttk.Label(frame).pack(side = 'bottom')
+		ttk.Button(frame, text = 'Preview quiz', command = lambda: self.quiz_player.main()).pack(side = 'bottom')
 
 	def format_text(self, text):
 		if len(text) > 0:
@@ -508,16 +664,12 @@ Architecture: {platform.machine()}{dnl+"Settings file is saved to working direct
 			if multiline: text = self.format_text(entry.get('1.0', 'end-1c'))
 			else: text = entry.get()
 			if text and not text.isspace():
-				if text != og:
-					self.modified = True
-					self.input_string_text = text
+				if text != og: self.input_string_text = text
 				else: self.input_string_skip = True
 				post_func()
 			else:
 				if allow_blank:
-					if text != og:
-						self.modified = True
-						self.input_string_text = text
+					if text != og: self.input_string_text = text
 					else: self.input_string_skip = True
 					post_func()
 				else: tk.messagebox.showerror('Error', f'{name} cannot be blank!')
@@ -556,31 +708,31 @@ Architecture: {platform.machine()}{dnl+"Settings file is saved to working direct
 
 	def quiz_name(self):
 		def post():
-			self.datafile['title'] = self.input_string_text
-			if not self.input_string_skip: self.message = 'Quiz name saved!'
+			if not self.input_string_skip:
+				self.commit('rename quiz', [history.Change('set', (), 'title', self.datafile['title'], self.input_string_text)])
+				self.message = 'Quiz name saved!'
 			self.main()
 
 		self.input_string('Quiz name', post, self.datafile['title'], False, multiline = False)
 
 	def quiz_desc(self):
-		if not self.jsonhandler.check_element('description'): self.datafile['description'] = ''
-	
 		def post():
-			self.datafile['description'] = self.input_string_text
-			if not self.input_string_skip: self.message = 'Quiz description saved!'
+			if not self.input_string_skip:
+				self.commit('edit quiz description', [history.Change('set', (), 'description', self.datafile.get('description', history.MISSING), self.input_string_text)])
+				self.message = 'Quiz description saved!'
 			self.main()
 
-		self.input_string('Quiz description', post, self.datafile['description'])
+		self.input_string('Quiz description', post, self.datafile['description'] if self.jsonhandler.check_element('description') else '')
 
 	"""----------- END MENUS ---------"""
 
 class CompileEXE:
 	def __init__(self, gui):
 		self.gui = gui
-		self.text = ''
+		self.runner = None
 
-	def compile_exe_head(self):
-		self.gui.refresh()
+	def compile_exe_head(self, menubar = True):
+		self.gui.refresh(menubar = menubar)
 		self.gui.print_msg()
 
 		ttk.Label(text = 'Compile executable file', font = self.gui.bold_font).pack()
@@ -593,13 +745,17 @@ We apologize for any inconvenience caused by this issue.
 ''', justify = 'center').pack()
 
 	def main(self):
-		if hasattr(sys, '_MEIPASS') and not os.path.exists(f'{self.gui.temp_path}/compiler_env.zip'):
-			if os.name != 'nt': tk.messagebox.showerror('Not supported', 'This feature does not work on non-Windows compiled executables. Please use this feature on the source version!')
+		# the compiler is only imported by the first compile
+		import compiler
+		if hasattr(sys, '_MEIPASS') and not os.path.exists(compiler.exe_path(self.gui.temp_path, compiler.RUNTIME)) and not os.path.exists(f'{self.gui.temp_path}/compiler_env.zip'):
+			if os.name != 'nt': tk.messagebox.showerror('Not supported', 'This feature does not work on non-Windows compiled executables. Please use this feature on the source version, or use File > Export as Python app instead!')
 			else: tk.messagebox.showerror('Not supported', 'This executable file does not include an embeddable Python! Follow the instructions in the README to add an embeddable Python.')
 			return
 
 		if self.gui.prompt_save_changes(): return
+		self.draw()
 
+	def draw(self):
 		self.compile_exe_head()
 		self.compile_button = ttk.Button(text = 'Compile', command = self.compile)
 		self.compile_button.pack()
@@ -607,360 +763,190 @@ We apologize for any inconvenience caused by this issue.
 		self.quit_button.pack(side = 'bottom')
 
 	def compile(self):
+		import compiler
 		savefilename = tk.filedialog.askdirectory(title = 'Select output executable location', initialdir = os.getcwd())
 		if not savefilename: return
 
-		self.compile_button['state'] = 'disabled'
-		self.quit_button['state'] = 'disabled'
+		# no menus while compiling, so the screen stays until the compile ends
+		self.compile_exe_head(False)
+		self.progressbar = ttk.Progressbar(orient = 'horizontal', length = 300, mode = 'determinate', maximum = 1)
+		self.progressbar.pack()
+		self.label = ttk.Label(justify = 'center')
+		self.label.pack()
+		self.cancel_button = ttk.Button(text = 'Cancel', command = self.cancel)
+		self.cancel_button.pack(side = 'bottom')
+		scroll = ttk.Scrollbar(orient = 'vertical')
+		self.log = tk.Text(width = self.gui.display_w, height = 10, yscrollcommand = scroll.set, wrap = 'none', state = 'disabled')
+		scroll.config(command = self.log.yview)
+		scroll.pack(side = 'right', fill = 'y')
+		self.log.pack(side = 'left')
+		self.output = []
+
+		# the compile thread only talks to the window through this queue
+		self.queue = queue.Queue()
+		self.runner = compiler.StreamingRun(lambda line: self.queue.put(('line', line)))
+		self.thread = ThreadWithResult(target = self.compile_thread, args = (savefilename, jsonhandler.snapshot(self.gui.datafile)), daemon = True)
+		self.thread.start()
+		self.poll()
+
+	def poll(self):
+		import compiler
+		lines = []
+		while True:
+			try: kind, value = self.queue.get_nowait()
+			except queue.Empty: break
+			if kind == 'status': self.label['text'] = value
+			else:
+				lines.append(value)
+				phase = compiler.build_phase(value)
+				if phase: self.progressbar['value'], self.label['text'] = phase
+		if lines:
+			self.output += lines
+			self.log.config(state = 'normal')
+			self.log.insert('end', '\n'.join(lines) + '\n')
+			self.log.see('end')
+			self.log.config(state = 'disabled')
+
+		if self.thread.is_alive(): self.gui.window.after(50, self.poll)
+		else: self.finish()
+
+	def cancel(self):
+		if not self.runner: return
+		self.runner.cancel()
+		if self.cancel_button.winfo_exists():
+			self.cancel_button['state'] = 'disabled'
+			self.label['text'] = 'Cancelling...'
 
-		progressbar = ttk.Progressbar(mode = 'indeterminate')
-		progressbar.pack()
-		label = ttk.Label(justify = 'center')
-		label.pack()
-		
-		thread = ThreadWithResult(target = self.compile_thread, args = (savefilename,))
-		thread.start()
-		while thread.is_alive():
-			self.gui.window.update_idletasks()
-			label['text'] = self.text
-		thread.join()
-
-		progressbar.destroy()
-		label.destroy()
-		self.compile_button['state'] = 'normal'
-		self.quit_button['state'] = 'normal'
-
-		if hasattr(thread, 'result'):
-			fname = thread.result
-			if type(fname) == tuple: self.gui.window.report_callback_exception(*fname)
-			elif fname is not None:
-				bs = '\\'
-				self.gui.message = f'Compile successful! Executable saved to {fname}'
-				self.gui.config_msg()
-			else: self.gui.set_message_force('Compilation failed!')
+	def finish(self):
+		import compiler
+		import subprocess
+		self.runner = None
+		self.draw()
+
+		fname = getattr(self.thread, 'result', None)
+		if type(fname) == tuple:
+			if issubclass(fname[0], compiler.BuildCancelled): self.gui.set_message_force('Compilation cancelled.')
+			elif issubclass(fname[0], subprocess.CalledProcessError):
+				self.gui.set_message_force(f'Compilation failed! PyInstaller exited with code {fname[1].returncode}.')
+				tk.messagebox.showerror('Compilation failed', 'PyInstaller could not build the player runtime:\n\n' + '\n'.join(self.output[-15:]))
+			else: self.gui.window.report_callback_exception(*fname)
+		elif fname is not None:
+			self.gui.message = f'Compile successful! Executable saved to {fname}'
+			self.gui.config_msg()
 		else: self.gui.set_message_force('Compilation failed!')
 
-	def compile_thread(self, dname):
-		pyi_mode = hasattr(sys, '_MEIPASS')
-		fname = dname
-		exe_name = f'{self.gui.datafile["title"]}{".exe" if os.name == "nt" else ""}'
-		fname += os.sep + exe_name
-		tmpdir = f'{self.gui.appdata_folder}/tmp{random.randint(0, 99999):05}'
-		qfile = f'quiz.{self.gui.datafile_mode}'
-
+	def compile_thread(self, dname, datafile):
+		import compiler
 		try:
-			self.text = 'Setting up environment'
-			os.makedirs(tmpdir)
-			if pyi_mode:
-				with zipfile.ZipFile(f'{self.gui.temp_path}/compiler_env.zip', 'r') as z: z.extractall(f'{tmpdir}/python-embed')
-				python = f'{tmpdir}/python-embed/python.exe'
-			else: python = sys.executable
-			self.text = 'Copying necessary files'
-			shutil.copy(f'{self.gui.temp_path}/gui.py', tmpdir)
-			shutil.copy(f'{self.gui.temp_path}/jsonhandler.py', tmpdir)
-			with open(f'{tmpdir}/{qfile}', 'w', encoding = 'utf-8') as f:
-				f.write(json.dumps(self.gui.datafile, ensure_ascii = False, indent = 4))
-				f.close()
-			with open(f'{tmpdir}/main.py', 'w') as f:
-				f.write(f'''\
-import sys
-import tkinter.messagebox
-import gui
-g = gui.GUI(sys._MEIPASS + '/{qfile}', True)
-gui.g = g
-try: g.start_main()
-except Exception: tk.messagebox.showerror('Error', gui.report_error(*sys.exc_info(), True))
-''')
-				f.close()
-
-			env = os.environ.copy()
-			env.pop('TCL_LIBRARY', None)
-			env.pop('TK_LIBRARY', None)
-			env.pop('_MEIPASS2', None)
-			env.pop('PYTHONPATH', None)
-			env['TCL_LIBRARY'] = f'{tmpdir}/python-embed/tcl/tcl8.6'
-			env['TK_LIBRARY'] = f'{tmpdir}/python-embed/tcl/tk8.6'
-
-			self.text = 'Invoking PyInstaller\nThis may take a while'
-			params = [
-				python, '-m', 'PyInstaller',
-				f'{tmpdir}/main.py',
-				'-ywFn', self.gui.datafile['title'],
-				'--distpath', dname,
-				'--workpath', tmpdir,
-				'--specpath', tmpdir,
-				'--add-data', f'{tmpdir}/{qfile}{";" if os.name == "nt" else ":"}.',
-				'--add-data', f'{self.gui.temp_path}/icon{".ico;" if os.name == "nt" else ".xbm:"}.',
-			]
-			if os.name == 'nt' or platform.system == 'Darwin': params.extend(['-i', f'{self.gui.temp_path}/icon.ico'])
-			subprocess.run(params, check = True, env = env)
-			self.text = 'Cleaning up'
-			shutil.rmtree(tmpdir)
+			runtime = compiler.player_runtime(self.gui.appdata_folder, lambda text: self.queue.put(('status', text)), self.runner)
+			self.runner.check_cancelled()
+			self.queue.put(('status', 'Writing executable'))
+			fname = compiler.write_player(runtime, datafile, compiler.exe_path(dname, datafile['title']))
 			if os.path.exists(fname): return fname
 
-		except Exception:
-			self.text = 'Cleaning up'
-			shutil.rmtree(tmpdir)
-			return sys.exc_info()
-
-class QuizPlayer:
-	def __init__(self, gui):
-		self.gui = gui
-		self.question_player = QuestionPlayer(self)
-
-	def main(self):
-		if not self.gui.player_mode and self.gui.prompt_save_changes(): return
-		self.datafile = self.gui.datafile
-		self.menu()
-
-	def menu(self):
-		self.gui.refresh()
-		self.gui.window.title(self.gui.datafile['title'])
-
-		ttk.Label(text = 'Welcome to').pack()
-		ttk.Label(text = self.datafile['title'], font = self.gui.bold_font).pack()
-		if self.gui.jsonhandler.check_element('description', rel = False) and self.datafile['description']: ttk.Label(text = self.datafile['description'], justify = 'center').pack()
-		
-		ttk.Label(text = f'\nPowered by {name} {version}', font = self.gui.italic_font).pack(side = 'bottom')
-		ttk.Button(text = 'Quit', command = self.end).pack(side = 'bottom')
-		ttk.Button(text = 'Start quiz', command = self.question_player.main).pack(side = 'bottom')
-
-	def end(self):
-		if self.gui.player_mode: sys.exit()
-		else: self.gui.refresh(True)
-
-class QuestionPlayer:
-	def __init__(self, quiz_player):
-		self.quiz_player = quiz_player
-		self.gui = quiz_player.gui
-
-	def main(self):
-		self.datafile = self.gui.datafile
-		self.qnum = -1
-		self.lives = self.datafile['lives'] if self.gui.jsonhandler.check_element('lives', int) else None
-		self.questions = self.datafile['questions'].copy()
-		if self.gui.jsonhandler.check_element('randomize', bool) and self.datafile['randomize']: random.shuffle(self.questions)
-
-		self.next_question()
-
-	def next_question(self):
-		self.qnum += 1
-		if self.qnum == len(self.questions): self.finish()
-		else:
-			self.question = self.questions[self.qnum]
-			self.wrongmsg = ''
-			self.display_question()
-
-	def display_question_head(self):
-		showcount = self.gui.jsonhandler.check_element('showcount', bool) and self.datafile['showcount']
-
-		self.gui.window.title(f"{self.gui.datafile['title']} - Question {self.qnum+1}{' / '+len(self.questions) if showcount else ''}")
-		ttk.Label(text = f'Question {self.qnum + 1}{" / "+len(self.questions) if showcount else ""}', font = self.gui.bold_font).pack()
-		if self.lives is not None: ttk.Label(text = f'{self.lives} lives left').pack()
-
-	def display_question(self):
-		self.gui.refresh()
-		self.display_question_head()
-
-		ttk.Button(text = 'Quit', command = self.end).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-
-		cd_frame = tk.Frame()
-		TooltipButton(cd_frame, text = self.question['c'], width = 41, command = lambda: self.choose_choice('c')).pack(side = 'left')
-		TooltipButton(cd_frame, text = self.question['d'], width = 41, command = lambda: self.choose_choice('d')).pack(side = 'right')
-		cd_frame.pack(side = 'bottom', fill = 'x')
-		ttk.Label(text = 'Hover over a button for full answer', font = self.gui.italic_font).pack(side = 'bottom')
-
-		ab_frame = tk.Frame()
-		TooltipButton(ab_frame, text = self.question['a'], width = 41, command = lambda: self.choose_choice('a')).pack(side = 'left')
-		TooltipButton(ab_frame, text = self.question['b'], width = 41, command = lambda: self.choose_choice('b')).pack(side = 'right')
-		ab_frame.pack(side = 'bottom', fill = 'x')
-		ttk.Label().pack(side = 'bottom')
-		ttk.Label(text = self.wrongmsg).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-
-		frame = VerticalScrolledFrame(self.gui.window)
-		frame.canvas.config(bg = 'white')
-		frame.interior.config(bg = 'white')
-		frame.pack(fill = 'both', expand = True)
-
-		question = ttk.Label(frame.interior, text = self.question['question'], background = 'white', justify = 'center')
-		question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
-		question.pack()
-		ttk.Label(frame.interior, background = 'white').pack()
-
-	def choice_correct(self, choice):
-		if self.question['correct'] == 'all': return True
-		else: return self.question['correct'] == choice
-
-	def choose_choice(self, choice):
-		if self.choice_correct(choice): self.correct()
-		else:
-			if self.gui.jsonhandler.check_question_element('wrongmsg', self.qnum, dict) and choice in self.question['wrongmsg']: self.wrongmsg = self.question['wrongmsg'][choice]
-			elif self.gui.jsonhandler.check_element('wrongmsg', list): self.wrongmsg = random.choice(self.datafile['wrongmsg'])
-			else: self.wrongmsg = f'Choice {choice.upper()} is incorrect!{" You lost a life!" if self.lives is not None else ""}'
-			if self.lives is not None:
-				self.lives -= 1
-				if not self.lives: self.fail()
-				else: self.display_question()
-			else: self.display_question()
-
-	def correct(self):
-		if self.gui.jsonhandler.check_question_element('explanation', self.qnum, str):
-			self.gui.refresh()
-			self.display_question_head()
-
-			ttk.Button(text = 'Next', command = self.next_question).pack(side = 'bottom')
-			ttk.Label().pack(side = 'bottom')
-
-			ttk.Label(text = '\nCorrect!', justify = 'center', font = self.gui.italic_font).pack()
-
-			frame = VerticalScrolledFrame(self.gui.window)
-			frame.canvas.config(bg = 'white')
-			frame.interior.config(bg = 'white')
-			frame.pack(fill = 'both', expand = True)
-
-			question = ttk.Label(frame.interior, text = self.question['explanation'], background = 'white', justify = 'center')
-			question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
-			question.pack()
-			ttk.Label(frame.interior, background = 'white').pack()
-		else: self.next_question()
-
-	def finish(self):
-		self.gui.refresh()
-		self.gui.window.title(self.gui.datafile['title'])
-
-		ttk.Button(text = 'Return to menu', command = self.quiz_player.menu).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-
-		ttk.Label(text = 'Quiz completed!', justify = 'center', font = self.gui.bold_font).pack()
-
-		if self.gui.jsonhandler.check_element('finish', str):
-			frame = VerticalScrolledFrame(self.gui.window)
-			frame.canvas.config(bg = 'white')
-			frame.interior.config(bg = 'white')
-			frame.pack(fill = 'both', expand = True)
-
-			question = ttk.Label(frame.interior, text = self.datafile['finish'], background = 'white', justify = 'center')
-			question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
-			question.pack()
-			ttk.Label(frame.interior, background = 'white').pack()
-
-	def fail(self):
-		self.gui.refresh()
-
-		ttk.Button(text = 'Return to menu', command = self.quiz_player.menu).pack(side = 'bottom')
-		ttk.Button(text = 'Try again!', command = self.main).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-
-		ttk.Label(text = 'Game Over', justify = 'center', font = self.gui.bold_font).pack()
-
-		if self.gui.jsonhandler.check_element('fail', str):
-			frame = VerticalScrolledFrame(self.gui.window)
-			frame.canvas.config(bg = 'white')
-			frame.interior.config(bg = 'white')
-			frame.pack(fill = 'both', expand = True)
-
-			question = ttk.Label(frame.interior, text = self.datafile['fail'], background = 'white', justify = 'center')
-			question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
-			question.pack()
-			ttk.Label(frame.interior, background = 'white').pack()
-
-	def end(self):
-		if tk.messagebox.askyesno('Quit the quiz?', 'Are you sure you want to quit this quiz?', icon = 'warning'): self.quiz_player.menu()
+		except Exception: return sys.exc_info()
 
 class QuizConf:
+	# settings are left out of the quiz while they have these values
+	defaults = {'lives': 0, 'randomize': False, 'showcount': True, 'wrongmsg': [], 'fail': '', 'finish': ''}
+
 	def __init__(self, gui):
 		self.gui = gui
 		self.wrongmsg_editor = WrongMsgEditor(self)
 
 		self.is_editing = False
 
-	def main(self):
-		self.datafile = self.gui.datafile
+	@property
+	def datafile(self): return self.gui.datafile
 
-		if not self.gui.jsonhandler.check_element('lives', int): self.datafile['lives'] = 0
-		if not self.gui.jsonhandler.check_element('randomize', bool): self.datafile['randomize'] = False
-		if not self.gui.jsonhandler.check_element('showcount', bool): self.datafile['showcount'] = True
-		if not self.gui.jsonhandler.check_element('wrongmsg', list): self.datafile['wrongmsg'] = []
-		if not self.gui.jsonhandler.check_element('fail'): self.datafile['fail'] = ''
-		if not self.gui.jsonhandler.check_element('finish'): self.datafile['finish'] = ''
+	def main(self): self.menu()
 
-		self.wrongmsg_list = self.datafile['wrongmsg']
-		self.fail_text = self.datafile['fail']
-		self.finish_text = self.datafile['finish']
+	def setting(self, key):
+		default = self.defaults[key]
+		return self.datafile[key] if self.gui.jsonhandler.check_element(key, type(default)) else default
 
-		self.menu()
+	def change(self, key, value):
+		"""Returns the change that sets key to value."""
+		return history.Change('set', (), key, self.datafile.get(key, history.MISSING), history.MISSING if value == self.defaults[key] else value)
 
 	def menu(self):
 		self.is_editing = False
 		
-		self.gui.refresh()
-		self.gui.print_msg()
+		self.gui.show_screen('settings', self.build, message = True)
+
+		# focusing out of an empty entry fills it in from its validatecommand, which turns validation off
+		self.life_entry.config(validate = 'all')
+		self.life_entry.delete(0, 'end')
+		self.life_entry.insert(0, str(self.setting('lives')))
+		self.rand_value.set(self.setting('randomize'))
+		self.showcount_value.set(self.setting('showcount'))
+		wrongmsg = self.setting('wrongmsg')
+		if len(wrongmsg) == 0: self.wrongmsg_label.config(text = 'None  ')
+		else: self.wrongmsg_label.config(text = f'{len(wrongmsg)} comment{"s" if len(wrongmsg) > 1 else ""}  ')
+
+		self.is_editing = True
 
-		ttk.Label(text = 'Quiz settings', font = self.gui.bold_font).pack()
-		ttk.Button(text = 'OK', command = self.end).pack(side = 'bottom')
-		ttk.Button(text = 'Reset to defaults', command = self.reset).pack(side = 'bottom')
+	def build(self, frame):
+		ttk.Label(frame, text = 'Quiz settings', font = self.gui.bold_font).pack()
+		ttk.Button(frame, text = 'OK', command = self.end).pack(side = 'bottom')
+		ttk.Button(frame, text = 'Reset to defaults', command = self.reset).pack(side = 'bottom')
 
 		life_check = self.gui.window.register(self.check_lives)
 
-		life_frame = FocusFrame()
+		life_frame = FocusFrame(frame)
 		ttk.Label(life_frame, text = f'Lives (0 = disabled)').pack(side = 'left')
 		self.life_entry = ttk.Entry(life_frame, width = 10, justify = 'right', validate = 'all', validatecommand = (life_check, '%s', '%P', '%V'))
-		self.life_entry.insert(0, str(self.datafile['lives']))
 		self.life_entry.pack(side = 'right')
 		life_frame.pack(fill = 'x')
 
-		rand_frame = FocusFrame()
+		rand_frame = FocusFrame(frame)
 		ttk.Label(rand_frame, text = f'Randomize question order').pack(side = 'left')
 		self.rand_value = tk.BooleanVar()
-		self.rand_value.set(self.datafile['randomize'])
 		rand_checkbox = ttk.Checkbutton(rand_frame, variable = self.rand_value, command = self.autosave)
 		rand_checkbox.pack(side = 'right')
 		rand_frame.pack(fill = 'x')
 
-		showcount_frame = FocusFrame()
+		showcount_frame = FocusFrame(frame)
 		ttk.Label(showcount_frame, text = f'Show question count').pack(side = 'left')
 		self.showcount_value = tk.BooleanVar()
-		self.showcount_value.set(self.datafile['showcount'])
 		showcount_checkbox = ttk.Checkbutton(showcount_frame, variable = self.showcount_value, command = self.autosave)
 		showcount_checkbox.pack(side = 'right')
 		showcount_frame.pack(fill = 'x')
 
-		wrongmsg_frame = FocusFrame()
+		wrongmsg_frame = FocusFrame(frame)
 		ttk.Label(wrongmsg_frame, text = f'Global wrong answer comments').pack(side = 'left')
 		ttk.Button(wrongmsg_frame, text = 'Edit', command = self.wrongmsg_editor.main).pack(side = 'right')
-		if len(self.datafile['wrongmsg']) == 0: ttk.Label(text = 'None  ', master = wrongmsg_frame).pack(side = 'right')
-		else: ttk.Label(text = f'{len(self.datafile["wrongmsg"])} comment{"s" if len(self.datafile["wrongmsg"]) > 1 else ""}  ', master = wrongmsg_frame).pack(side = 'right')
+		self.wrongmsg_label = ttk.Label(wrongmsg_frame)
+		self.wrongmsg_label.pack(side = 'right')
 		wrongmsg_frame.pack(fill = 'x')
 
-		fail_frame = FocusFrame()
+		fail_frame = FocusFrame(frame)
 		ttk.Label(fail_frame, text = f'Game over comment (requires lives enabled)').pack(side = 'left')
 		ttk.Button(fail_frame, text = 'Edit', command = self.fail_edit).pack(side = 'right')
 		fail_frame.pack(fill = 'x')
 
-		win_frame = FocusFrame()
+		win_frame = FocusFrame(frame)
 		ttk.Label(win_frame, text = f'Quiz completion comment').pack(side = 'left')
 		ttk.Button(win_frame, text = 'Edit', command = self.finish_edit).pack(side = 'right')
 		win_frame.pack(fill = 'x')
 
-		self.is_editing = True
-
 	def fail_edit(self):
 		def post():
-			self.fail_text = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Game over comment saved!'
+			if not self.gui.input_string_skip:
+				self.gui.commit('edit game over comment', [self.change('fail', self.gui.input_string_text)])
+				self.gui.message = 'Game over comment saved!'
 			self.menu()
 
-		self.gui.input_string('quiz game over comment', post, self.fail_text)
+		self.gui.input_string('quiz game over comment', post, self.setting('fail'))
 
 	def finish_edit(self):
 		def post():
-			self.finish_text = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Completion comment saved!'
+			if not self.gui.input_string_skip:
+				self.gui.commit('edit completion comment', [self.change('finish', self.gui.input_string_text)])
+				self.gui.message = 'Completion comment saved!'
 			self.menu()
 
-		self.gui.input_string('quiz completion comment', post, self.finish_text)
+		self.gui.input_string('quiz completion comment', post, self.setting('finish'))
 
 	def check_lives(self, old_input, new_input, validate_type):
 		if validate_type == 'key':
@@ -970,54 +956,32 @@ class QuizConf:
 				else: return False
 		elif validate_type == 'focusout':
 			if not old_input: self.life_entry.insert(0, '0')
-			if self.is_editing: self.autosave()
+			# the screen is kept when left, and the quiz may have changed by then
+			if self.is_editing and self.gui.screens.showing('settings'): self.autosave()
 			return True
 		else: return True
 
 	def autosave(self):
-		self.datafile['lives'] = int(self.life_entry.get())
-		self.gui.modified = True
-
-		randval = self.rand_value.get()
-		if randval != self.datafile['randomize']:
-			self.datafile['randomize'] = randval
-			self.gui.modified = True
-
-		scval = self.showcount_value.get()
-		if scval != self.datafile['showcount']:
-			self.datafile['showcount'] = scval
-			self.gui.modified = True
-		
-		self.gui.set_title()
+		self.gui.commit('change quiz settings', [
+			self.change('lives', int(self.life_entry.get() or 0)),
+			self.change('randomize', self.rand_value.get()),
+			self.change('showcount', self.showcount_value.get()),
+		])
 
 	def reset(self):
-		del self.datafile['lives']
-		del self.datafile['randomize']
-		del self.datafile['showcount']
-		del self.datafile['wrongmsg']
-		del self.datafile['fail']
-		del self.datafile['finish']
+		self.gui.commit('reset quiz settings', [self.change(key, default) for key, default in self.defaults.items()])
 		self.main()
 
-	def end(self):
-		if self.datafile['lives'] == 0: del self.datafile['lives']
-		if not self.datafile['randomize']: del self.datafile['randomize']
-		if self.datafile['showcount']: del self.datafile['showcount']
-		if self.datafile['wrongmsg'] == []: del self.datafile['wrongmsg']
-		if self.datafile['fail'] == '': del self.datafile['fail']
-		if self.datafile['finish'] == '': del self.datafile['finish']
-
-		self.gui.datafile = self.datafile
-		self.gui.refresh(True)
+	def end(self): self.gui.refresh(True)
 
 class WrongMsgEditor:
 	def __init__(self, quizconf):
 		self.quizconf = quizconf
 		self.gui = quizconf.gui
 
-	def main(self):
-		self.wrongmsg = self.quizconf.wrongmsg_list
-		self.index = 0
+	def main(self, index = 0):
+		self.wrongmsg = self.quizconf.setting('wrongmsg')
+		self.index = min(index, max(len(self.wrongmsg) - 1, 0))
 
 		self.menu()
 
@@ -1091,11 +1055,19 @@ class WrongMsgEditor:
 		tk.messagebox.showinfo('Text read-only', 'To edit this text, click "Edit comment".\nThank you!')
 		return 'break'
 
+	def commit(self, label, action, value = None):
+		"""Inserts, sets or deletes the comment at self.index."""
+		if action == 'delete' and len(self.wrongmsg) == 1: change = self.quizconf.change('wrongmsg', [])
+		elif not self.wrongmsg: change = self.quizconf.change('wrongmsg', [value])
+		else: change = history.Change(action, ('wrongmsg',), self.index, None if action == 'insert' else self.wrongmsg[self.index], None if action == 'delete' else value)
+		self.gui.commit(label, [change])
+		self.wrongmsg = self.quizconf.setting('wrongmsg')
+
 	def new(self):
 		def post():
 			if not self.gui.input_string_skip: 
-				self.wrongmsg.append(self.gui.input_string_text)
-				self.index = len(self.wrongmsg) - 1
+				self.index = len(self.wrongmsg)
+				self.commit('create global wrong answer comment', 'insert', self.gui.input_string_text)
 				self.gui.message = 'Global wrong answer comment created!'
 			self.menu()
 
@@ -1104,7 +1076,7 @@ class WrongMsgEditor:
 	def edit(self):
 		def post():
 			if not self.gui.input_string_skip: 
-				self.wrongmsg[self.index] = self.gui.input_string_text
+				self.commit('edit global wrong answer comment', 'set', self.gui.input_string_text)
 				self.gui.message = 'Global wrong answer comment saved!'
 			self.menu()
 
@@ -1112,124 +1084,225 @@ class WrongMsgEditor:
 
 	def delete(self):
 		if tk.messagebox.askyesno('Delete this comment?', 'Are you sure you want to delete this comment?', icon = 'warning'):
-			del self.wrongmsg[self.index]
+			self.commit('delete global wrong answer comment', 'delete')
 			if len(self.wrongmsg) > 0:
 				if self.index > 0: self.index -= 1
 			else: self.index = 0
-			self.gui.modified = True
 			self.gui.message = 'Global wrong answer comment deleted.'
 			self.menu()
 
-	def end(self):
-		self.quizconf.wrongmsg_list = self.wrongmsg
-		self.quizconf.menu()
+	def end(self): self.quizconf.main()
 
 class QuestionViewer:
 	def __init__(self, gui):
 		self.gui = gui
 		self.qeditor = QuestionEditor(self)
 
-	def main(self):
-		self.gui.refresh()
-		self.gui.print_msg()
-		ttk.Label(text = 'Questions', font = self.gui.bold_font).pack()
-		ttk.Label(text = 'Please wait... this may take a while for large quizzes.').pack()
-		self.gui.window.update()
+		# the search index is kept between visits, for as long as the quiz keeps the same question list
+		self.search_index = None
+		self.indexed = None
+		self.indexer = None
+		self.gui.history.listeners.append(self.history_change)
 
+	def main(self, index = 0):
 		self.questions = self.gui.datafile['questions']
-		self.index = 0
-		
+		self.index = index
+		self.query = ''
+		self.results = None
+		if self.indexed is not self.questions: self.search_index = self.indexer = None
+
 		self.menu()
 
-	def navigation_prev(self, e = None):
-		if self.index > 0:
-			self.index -= 1
-			self.menu()
-	def navigation_next(self, e = None):
-		if self.index < len(self.questions) - 1: 
-			self.index += 1
-			self.menu()
+	def navigation_prev(self, e = None): self.question_list.move(-1)
+	def navigation_next(self, e = None): self.question_list.move(1)
+
+	def navigation_prev_jmp(self): self.question_list.select(0)
+	def navigation_next_jmp(self): self.question_list.select(self.list_count() - 1)
+
+	def jump(self, event = None):
+		try: qno = int(self.jump_entry.get())
+		except ValueError: return
+		self.jump_entry.delete(0, 'end')
+		# question numbers refer to the whole list
+		if self.results is not None: self.search_var.set('')
+		self.question_list.select(min(max(qno, 1), len(self.questions)) - 1)
+
+	def check_jump(self, new_input): return new_input.isdigit() or not new_input
+
+	def row(self, i):
+		question = self.questions[i]
+		text = ' '.join(question['question'].split())
+		if question['correct'] == 'all': answer = 'All answers'
+		else: answer = f'[{question["correct"].upper()}] {" ".join(question.get(question["correct"], "").split())}'
+		return (i + 1, text[:100], answer[:50])
+
+	# while searching, the list shows the matching questions only; k is a position in the list
+	def list_count(self): return len(self.questions) if self.results is None else len(self.results)
+	def list_index(self, k): return k if self.results is None else self.results[k]
+
+	def search(self, *args):
+		self.query = self.search_var.get()
+		if not search.words(self.query): self.results = None
+		elif self.search_index is None:
+			if self.indexer is None: self.build_index()
+			return
+		else: self.results = self.search_index.search(self.query)
 
-	def navigation_prev_jmp(self):
-		self.index = 0
-		self.menu()
-	def navigation_next_jmp(self):
-		self.index = len(self.questions) - 1
-		self.menu()
+		if self.results is None: k = self.index
+		else: k = next((k for k, i in enumerate(self.results) if i >= self.index), 0)
+		self.question_list.first = 0
+		if self.list_count(): self.question_list.select(k)
+		else:
+			self.question_list.selected = None
+			self.question_list.redraw()
+			self.update_nav()
+
+	def build_index(self):
+		index = search.SearchIndex()
+		self.indexed = self.questions
+		self.indexer = index.build(self.questions)
+		self.index_step(index, self.indexer)
+
+	def index_step(self, index, indexer):
+		# indexing runs in chunks between events; an edit in the meantime cancels it by dropping self.indexer
+		if self.indexer is not indexer: return
+		shown = self.gui.screens.showing('viewer')
+		try: done = next(indexer)
+		except StopIteration:
+			self.search_index, self.indexer = index, None
+			if shown: self.search()
+			return
+		if shown: self.count_label.config(text = f'Indexing questions... {done * 100 // max(len(self.questions), 1)}%')
+		self.gui.window.after(1, self.index_step, index, indexer)
+
+	def update_index(self, action, *args):
+		if self.search_index is not None: getattr(self.search_index, action)(*args)
+		else: self.indexer = None
+
+	def history_change(self, change):
+		if change.path != ('questions',) or self.indexed is not self.gui.history.datafile['questions']: return
+		if change.action == 'delete': self.update_index('delete', change.key)
+		else: self.update_index(change.action, change.key, change.new)
 
 	def menu(self):
-		self.gui.refresh()
-		self.gui.print_msg()
+		self.gui.show_screen('viewer', self.build, message = True)
 
 		self.gui.window.bind('<Left>', self.navigation_prev)
 		self.gui.window.bind('<Right>', self.navigation_next)
 
-		ttk.Label(text = 'Questions', font = self.gui.bold_font).pack()
-		ttk.Button(text = 'Back', command = self.end).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-
-		ttk.Label(text = f'{self.index + 1} / {len(self.questions)}').pack()
-		ttk.Button(text = 'Delete question', command = self.delete, state = 'normal' if len(self.questions) > 1 else 'disabled').pack(side = 'bottom')
-		ttk.Button(text = 'Edit question', command = self.qeditor.main).pack(side = 'bottom')
-		ttk.Button(text = 'Create new question', command = self.new).pack(side = 'bottom')
-		ttk.Label().pack(side = 'bottom')
-		nav_frame = FocusFrame()
+		self.jump_entry.delete(0, 'end')
+		self.question_list.first = 0
+		self.show_question(self.index)
+		# the search box is kept with the screen, setting it searches
+		if self.search_var.get() != self.query: self.search_var.set(self.query)
+		elif self.query: self.search()
+		else: self.question_list.select(self.index)
+
+	def build(self, frame):
+		ttk.Label(frame, text = 'Questions', font = self.gui.bold_font).pack()
+		ttk.Button(frame, text = 'Back', command = self.end).pack(side = 'bottom')
+
+		action_frame = FocusFrame(frame)
+		action_frame.pack(side = 'bottom')
+		ttk.Button(action_frame, text = 'Create new question', command = self.new).pack(side = 'left')
+		self.edit_bt = ttk.Button(action_frame, text = 'Edit question', command = self.qeditor.main)
+		self.edit_bt.pack(side = 'left')
+		self.delete_bt = ttk.Button(action_frame, text = 'Delete question', command = self.delete)
+		self.delete_bt.pack(side = 'left')
+
+		nav_frame = FocusFrame(frame)
 		nav_frame.pack(side = 'bottom', fill = 'x')
-		prev_jmp_bt = ttk.Button(nav_frame, text = '<<', width = 3, command = self.navigation_prev_jmp)
-		prev_bt = ttk.Button(nav_frame, text = '< Previous', command = self.navigation_prev)
-		next_bt = ttk.Button(nav_frame, text = 'Next >', command = self.navigation_next)
-		next_jmp_bt = ttk.Button(nav_frame, text = '>>', width = 3, command = self.navigation_next_jmp)
-		if len(self.questions) > 1:
-			if self.index == 0:
-				prev_bt.config(state = 'disabled')
-				prev_jmp_bt.config(state = 'disabled')
-			elif self.index == len(self.questions) - 1:
-				next_bt.config(state = 'disabled')
-				next_jmp_bt.config(state = 'disabled')
-		else:
-			prev_jmp_bt.config(state = 'disabled')
-			prev_bt.config(state = 'disabled')
-			next_bt.config(state = 'disabled')
-			next_jmp_bt.config(state = 'disabled')
-		prev_jmp_bt.pack(side = 'left'); prev_bt.pack(side = 'left')
-		next_jmp_bt.pack(side = 'right'); next_bt.pack(side = 'right')
-
-
-		frame = VerticalScrolledFrame(self.gui.window)
-		frame.canvas.config(bg = 'white')
-		frame.interior.config(bg = 'white')
-		frame.pack(fill = 'both', expand = True)
-
-		question = ttk.Label(frame.interior, text = self.questions[self.index]['question'], background = 'white', justify = 'center')
-		question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
-		question.pack()
-		ttk.Label(frame.interior, background = 'white').pack()
+		self.prev_jmp_bt = ttk.Button(nav_frame, text = '<<', width = 3, command = self.navigation_prev_jmp)
+		self.prev_bt = ttk.Button(nav_frame, text = '< Previous', command = self.navigation_prev)
+		self.next_bt = ttk.Button(nav_frame, text = 'Next >', command = self.navigation_next)
+		self.next_jmp_bt = ttk.Button(nav_frame, text = '>>', width = 3, command = self.navigation_next_jmp)
+		self.prev_jmp_bt.pack(side = 'left'); self.prev_bt.pack(side = 'left')
+		self.next_jmp_bt.pack(side = 'right'); self.next_bt.pack(side = 'right')
+		jump_frame = FocusFrame(nav_frame)
+		ttk.Label(jump_frame, text = 'Go to').pack(side = 'left')
+		self.jump_entry = ttk.Entry(jump_frame, width = 8, justify = 'right', validate = 'key', validatecommand = (self.gui.window.register(self.check_jump), '%P'))
+		self.jump_entry.bind('<Return>', self.jump)
+		self.jump_entry.pack(side = 'left')
+		jump_frame.pack()
+
+		search_frame = FocusFrame(frame)
+		ttk.Label(search_frame, text = 'Search').pack(side = 'left')
+		self.search_var = tk.StringVar(value = self.query)
+		search_entry = ttk.Entry(search_frame, textvariable = self.search_var)
+		search_entry.pack(side = 'left', fill = 'x', expand = True)
+		search_frame.pack(fill = 'x')
+
+		self.count_label = ttk.Label(frame)
+		self.count_label.pack()
+
+		self.question_list = VirtualList(frame, (('no', 'No.', 60, False), ('question', 'Question', 280, True), ('answer', 'Correct answer', 140, False)), 6, self.list_count, lambda k: self.row(self.list_index(k)), lambda k: self.show_question(self.list_index(k)))
+		self.question_list.pack(fill = 'x')
+
+		box = VerticalScrolledFrame(frame)
+		box.canvas.config(bg = 'white')
+		box.interior.config(bg = 'white')
+		box.pack(fill = 'both', expand = True)
+
+		self.question_label = ttk.Label(box.interior, background = 'white', justify = 'center')
+		self.question_label.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
+		self.question_label.pack()
+		ttk.Label(box.interior, background = 'white').pack()
+		self.opt_labels = {}
 		for opt in ('a', 'b', 'c', 'd'):
-			opt_frame = FocusFrame(frame.interior, bg = 'white'); opt_frame.pack()
-			ttk.Label(opt_frame, text = f'[{opt.upper()}]', font = self.gui.bold_font if self.questions[self.index]['correct'] in [opt, 'all'] else None, background = 'white').pack(side = 'left')
-			opt_txt = ttk.Label(opt_frame, text = self.questions[self.index][opt], background = 'white')
+			opt_frame = FocusFrame(box.interior, bg = 'white'); opt_frame.pack()
+			letter = ttk.Label(opt_frame, text = f'[{opt.upper()}]', background = 'white')
+			letter.pack(side = 'left')
+			opt_txt = ttk.Label(opt_frame, background = 'white')
 			opt_txt.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
 			opt_txt.pack(side = 'right')
+			self.opt_labels[opt] = (letter, opt_txt)
+
+		self.search_var.trace_add('write', self.search)
+
+	def update_nav(self):
+		k, count = self.question_list.selected, self.list_count()
+		if self.results is None: self.count_label.config(text = f'{self.index + 1} / {count}')
+		elif not count: self.count_label.config(text = 'No matches')
+		else: self.count_label.config(text = f'Match {k + 1} / {count} (question {self.index + 1})')
+		shown = 'normal' if k is not None else 'disabled'
+		self.edit_bt.config(state = shown)
+		self.delete_bt.config(state = shown if len(self.questions) > 1 else 'disabled')
+		prev_state = 'normal' if k else 'disabled'
+		next_state = 'normal' if k is not None and k < count - 1 else 'disabled'
+		self.prev_bt.config(state = prev_state); self.prev_jmp_bt.config(state = prev_state)
+		self.next_bt.config(state = next_state); self.next_jmp_bt.config(state = next_state)
+
+	def show_question(self, index):
+		"""Updates everything that depends on the selected question, without rebuilding the screen."""
+		self.index = index
+		question = self.questions[index]
+		self.update_nav()
+
+		self.question_label.config(text = question['question'])
+		for opt, (letter, opt_txt) in self.opt_labels.items():
+			letter.config(font = self.gui.bold_font if question['correct'] in [opt, 'all'] else '')
+			opt_txt.config(text = question[opt])
 
 	def new(self):
-		self.questions.append({'question': 'Question', 'a': 'Answer A', 'b': 'Answer B', 'c': 'Answer C', 'd': 'Answer D', 'correct': 'a'})
-		self.gui.modified = True
-		self.index = len(self.questions) - 1
+		question = {'question': 'Question', 'a': 'Answer A', 'b': 'Answer B', 'c': 'Answer C', 'd': 'Answer D', 'correct': 'a'}
+		self.gui.commit('create question', [history.Change('insert', ('questions',), len(self.questions), None, question)])
 		self.gui.message = 'Question created!'
-		self.menu()
+		self.gui.config_msg()
+		# a new question would not match the search, show it in the whole list
+		if self.results is not None: self.search_var.set('')
+		self.question_list.select(len(self.questions) - 1)
 
 	def delete(self):
 		if tk.messagebox.askyesno('Delete this question?', 'Are you sure you want to delete this question?', icon = 'warning'):
-			del self.questions[self.index]
-			if len(self.questions) > 0:
-				if self.index > 0: self.index -= 1
-			else: self.index = 0
-			self.gui.modified = True
+			self.gui.commit(f'delete question {self.index + 1}', [history.Change('delete', ('questions',), self.index, self.questions[self.index], None)])
 			self.gui.message = 'Question deleted.'
-			self.menu()
+			self.gui.config_msg()
+			if self.results is not None:
+				self.index = max(self.index - 1, 0)
+				self.search()
+			else: self.question_list.select(max(self.index - 1, 0))
 
 	def end(self):
-		self.gui.datafile['questions'] = self.questions
 		self.gui.refresh(True)
 
 class QuestionEditor:
@@ -1243,129 +1316,137 @@ class QuestionEditor:
 		self.question = self.qviewer.questions[self.qno]
 		self.qlen = len(self.qviewer.questions)
 
-		self.correct_svar = tk.StringVar(); self.correct_svar.set(self.question['correct'].upper())
-		if self.correct_svar.get() == 'ALL': self.correct_svar.set('All answers')
-
-		if not self.gui.jsonhandler.check_question_element('wrongmsg', self.qno, dict): self.question['wrongmsg'] = {}
-		if not self.gui.jsonhandler.check_question_element('explanation', self.qno): self.question['explanation'] = ''
-
 		self.menu()
 
+	def update(self, label, **fields):
+		"""
+		Replaces the question with a copy that has fields changed, as question dicts are shared with snapshots and the
+		edit history. Empty fields are left out of the question.
+		"""
+		question = dict(self.question)
+		for key, value in fields.items():
+			if value: question[key] = value
+			else: question.pop(key, None)
+		self.gui.commit(f'{label} of question {self.qno + 1}', [history.Change('set', ('questions',), self.qno, self.question, question)])
+		self.question = question
+
 	def menu(self):
-		self.gui.refresh()
-		self.gui.print_msg()
+		self.gui.show_screen('editor', self.build, message = True)
 
-		editing_text = FocusFrame(); editing_text.pack()
+		self.qno_label.config(text = f'Question {self.qno + 1}/{self.qlen}')
+		self.correct_svar.set(self.question['correct'].upper())
+		if self.correct_svar.get() == 'ALL': self.correct_svar.set('All answers')
+
+	def build(self, frame):
+		editing_text = FocusFrame(frame); editing_text.pack()
 		ttk.Label(editing_text, text = f'Editing', font = self.gui.bold_font).pack(side = 'left')
-		ttk.Label(editing_text, text = f'Question {self.qno + 1}/{self.qlen}').pack(side = 'right')
-		ttk.Button(text = 'OK', command = self.end).pack(side = 'bottom')
+		self.qno_label = ttk.Label(editing_text)
+		self.qno_label.pack(side = 'right')
+		ttk.Button(frame, text = 'OK', command = self.end).pack(side = 'bottom')
 
-		question_frame = FocusFrame()
+		question_frame = FocusFrame(frame)
 		ttk.Label(question_frame, text = 'Question').pack(side = 'left')
 		test = ttk.Button(question_frame, text = 'Edit', command = self.ques).pack(side = 'right')
 		question_frame.pack(fill = 'x')
 
-		a_frame = FocusFrame()
+		a_frame = FocusFrame(frame)
 		ttk.Label(a_frame, text = 'Answer A').pack(side = 'left')
 		ttk.Button(a_frame, text = 'Edit', command = self.ans_a).pack(side = 'right')
 		a_frame.pack(fill = 'x')
 
-		b_frame = FocusFrame()
+		b_frame = FocusFrame(frame)
 		ttk.Label(b_frame, text = 'Answer B').pack(side = 'left')
 		ttk.Button(b_frame, text = 'Edit', command = self.ans_b).pack(side = 'right')
 		b_frame.pack(fill = 'x')
 
-		c_frame = FocusFrame()
+		c_frame = FocusFrame(frame)
 		ttk.Label(c_frame, text = 'Answer C').pack(side = 'left')
 		ttk.Button(c_frame, text = 'Edit', command = self.ans_c).pack(side = 'right')
 		c_frame.pack(fill = 'x')
 
-		d_frame = FocusFrame()
+		d_frame = FocusFrame(frame)
 		ttk.Label(d_frame, text = 'Answer D').pack(side = 'left')
 		ttk.Button(d_frame, text = 'Edit', command = self.ans_d).pack(side = 'right')
 		d_frame.pack(fill = 'x')
 
-		correct_frame = FocusFrame()
+		correct_frame = FocusFrame(frame)
 		ttk.Label(correct_frame, text = 'Correct answer').pack(side = 'left')
+		self.correct_svar = tk.StringVar()
 		correct_cbox = ttk.Combobox(correct_frame, textvariable = self.correct_svar, values = ('A', 'B', 'C', 'D', 'All answers'))
 		correct_cbox.bind('<<ComboboxSelected>>', self.process_correct)
 		correct_cbox.pack(side = 'right')
 		correct_frame.pack(fill = 'x')
 
-		wrongmsg_frame = FocusFrame()
+		wrongmsg_frame = FocusFrame(frame)
 		ttk.Label(wrongmsg_frame, text = 'Wrong answer comments').pack(side = 'left')
 		ttk.Button(wrongmsg_frame, text = 'Edit', command = self.qwrongmsg_editor.main).pack(side = 'right')
 		wrongmsg_frame.pack(fill = 'x')
 
-		explanation_frame = FocusFrame()
+		explanation_frame = FocusFrame(frame)
 		ttk.Label(explanation_frame, text = 'Explanation').pack(side = 'left')
 		ttk.Button(explanation_frame, text = 'Edit', command = self.explanation).pack(side = 'right')
 		explanation_frame.pack(fill = 'x')
 	
 	def ques(self):
 		def post():
-			self.question['question'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Question saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit text', question = self.gui.input_string_text)
+				self.gui.message = 'Question saved!'
 			self.menu()
 
 		self.gui.input_string('question', post, self.question['question'], False)
 
 	def ans_a(self):
 		def post():
-			self.question['a'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Answer A saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit answer A', a = self.gui.input_string_text)
+				self.gui.message = 'Answer A saved!'
 			self.menu()
 
 		self.gui.input_string('answer to choice A', post, self.question['a'], False)
 
 	def ans_b(self):
 		def post():
-			self.question['b'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Answer B saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit answer B', b = self.gui.input_string_text)
+				self.gui.message = 'Answer B saved!'
 			self.menu()
 
 		self.gui.input_string('answer to choice B', post, self.question['b'], False)
 
 	def ans_c(self):
 		def post():
-			self.question['c'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Answer C saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit answer C', c = self.gui.input_string_text)
+				self.gui.message = 'Answer C saved!'
 			self.menu()
 
 		self.gui.input_string('answer to choice C', post, self.question['c'], False)
 
 	def ans_d(self):
 		def post():
-			self.question['d'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Answer D saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit answer D', d = self.gui.input_string_text)
+				self.gui.message = 'Answer D saved!'
 			self.menu()
 
 		self.gui.input_string('answer to choice D', post, self.question['d'], False)
 
 	def process_correct(self, event = None):
-		correct_old = self.question['correct']
-
-		if self.correct_svar.get() == 'All answers': self.question['correct'] = 'all'
-		else: self.question['correct'] = self.correct_svar.get().lower()
-
-		if self.question['correct'] != correct_old:
-			self.gui.modified = True
-			self.gui.set_title()
+		if self.correct_svar.get() == 'All answers': correct = 'all'
+		else: correct = self.correct_svar.get().lower()
+		self.update('change correct answer', correct = correct)
 
 	def explanation(self):
 		def post():
-			self.question['explanation'] = self.gui.input_string_text
-			if not self.gui.input_string_skip: self.gui.message = 'Explanation saved!'
+			if not self.gui.input_string_skip:
+				self.update('edit explanation', explanation = self.gui.input_string_text)
+				self.gui.message = 'Explanation saved!'
 			self.menu()
 
-		self.gui.input_string('question explanation', post, self.question['explanation'])
-
-	def end(self):
-		if not self.question['wrongmsg']: del self.question['wrongmsg']
-		if not self.question['explanation']: del self.question['explanation']
+		self.gui.input_string('question explanation', post, self.question['explanation'] if self.gui.jsonhandler.check_question_element('explanation', self.qno) else '')
 
-		self.qviewer.questions[self.qviewer.index] = self.question
-		self.qviewer.menu()
+	def end(self): self.qviewer.menu()
 
 class QWrongMsgEditor:
 	def __init__(self, qeditor):
@@ -1375,7 +1456,7 @@ class QWrongMsgEditor:
 		self.index_letters = ('a', 'b', 'c', 'd')
 
 	def main(self):
-		self.wrongmsg = self.qeditor.question['wrongmsg']
+		self.wrongmsg = self.qeditor.question['wrongmsg'] if self.gui.jsonhandler.check_question_element('wrongmsg', self.qeditor.qno, dict) else {}
 		self.index = 0
 
 		self.menu()
@@ -1442,12 +1523,20 @@ class QWrongMsgEditor:
 		tk.messagebox.showinfo('Text read-only', 'To edit this text, click "Edit comment".\nThank you!')
 		return 'break'
 
+	def commit(self, label, choice, text = None):
+		"""Sets the comment for choice to text, or deletes it if text is None."""
+		wrongmsg = dict(self.wrongmsg)
+		if text is None: del wrongmsg[choice]
+		else: wrongmsg[choice] = text
+		self.qeditor.update(f'{label} wrong answer comment {choice.upper()}', wrongmsg = wrongmsg)
+		self.wrongmsg = wrongmsg
+
 	def new(self):
 		c = ''
 
 		def post():
 			if not self.gui.input_string_skip: 
-				self.wrongmsg[c] = self.gui.input_string_text
+				self.commit('create', c, self.gui.input_string_text)
 				self.index = self.index_letters.index(c)
 				self.gui.message = f'Choice {c.upper()} wrong answer comment created!'
 			self.menu()
@@ -1474,7 +1563,7 @@ class QWrongMsgEditor:
 	def edit(self):
 		def post():
 			if not self.gui.input_string_skip: 
-				self.wrongmsg[self.choice_letter] = self.gui.input_string_text
+				self.commit('edit', self.choice_letter, self.gui.input_string_text)
 				self.gui.message = f'Choice {self.choice_letter.upper()} wrong answer comment saved!'
 			self.menu()
 
@@ -1483,20 +1572,17 @@ class QWrongMsgEditor:
 
 	def delete(self):
 		if tk.messagebox.askyesno('Delete this comment?', 'Are you sure you want to delete this comment?', icon = 'warning'):
-			del self.wrongmsg[self.choice_letter]
+			self.commit('delete', self.choice_letter)
 			if len(self.wrongmsg) > 0:
 				if self.index > self.index_letters.index(tuple(self.wrongmsg.keys())[0]):
 					while True:
 						self.index -= 1
 						if self.index_letters[self.index] in self.wrongmsg: break
 			else: self.index = 0
-			self.gui.modified = True
 			self.gui.message = 'Wrong answer comment deleted.'
 			self.menu()
 
-	def end(self):
-		self.qeditor.question['wrongmsg'] = self.wrongmsg
-		self.qeditor.menu()
+	def end(self): self.qeditor.menu()
 
 class UpdaterGUI:
 	def __init__(self, gui):
@@ -1522,8 +1608,10 @@ class UpdaterGUI:
 			self.win.title('Updater')
 
 			icon = 'ico' if os.name == 'nt' else 'xbm'
-			try: self.win.iconbitmap(f'{self.gui.temp_path}\\icon.{icon}')
+			icon_path = os.path.join(self.gui.temp_path, f'icon.{icon}')
+			try: self.win.iconbitmap(icon_path if os.name == 'nt' else '@' + icon_path)
 			except tk.TclError:
+				import traceback
 				err_text = f'Whoops! The icon file "icon.{icon}" is required.\nCan you make sure the file is in "{self.gui.temp_path}"?\n\n{traceback.format_exc()}\nIf this problem persists, please report it here:\nhttps://github.com/{username}/{repo_name}/issues'
 				print(err_text)
 				tk.messagebox.showerror('Hmmm?', err_text)
@@ -1599,6 +1687,7 @@ While you\'re here, why don\'t you check out my [Discord server](//gamingwitheve
 
 	@staticmethod
 	def package_installed(package):
+		import importlib.util
 		return importlib.util.find_spec(package) is not None
 
 	def draw_download_msg(self, title, tag, prever, body):
@@ -1624,6 +1713,7 @@ New version: {title}{' (prerelease)' if prerelease else ''}\
 		else:
 			import markdown
 			import mdformat
+			import webbrowser
 			import tkinterweb
 
 			html = tkinterweb.HtmlFrame(self.win, messages_enabled = False, on_link_click = webbrowser.open_new_tab)
@@ -1638,6 +1728,7 @@ New version: {title}{' (prerelease)' if prerelease else ''}\
 		if self.auto: self.win.deiconify()
 
 	def open_download(self, tag):
+		import webbrowser
 		webbrowser.open_new_tab(f'https://github.com/{username}/{repo_name}/releases/tag/{tag}')
 		self.quit()
 
@@ -1650,12 +1741,14 @@ class Updater:
 		self.progress_inc = 25
 
 	def check_internet(self):
+		import urllib.request
 		try:
 			urllib.request.urlopen('https://github.com')
 			return True
 		except: return False
 
 	def request(self, url):
+		import urllib.request
 		success = False
 		for i in range(self.request_limit):
 			try:
@@ -1799,93 +1892,81 @@ class FocusFrame(tk.Frame):
 		tk.Frame.__init__(self, *args, **kwargs)
 		self.bind('<1>', lambda event: self.focus_set())
 
-# https://stackoverflow.com/a/16198198 (modified)
-class VerticalScrolledFrame(tk.Frame):
-	def __init__(self, parent, *args, **kw):
-		tk.Frame.__init__(self, parent, *args, **kw)
-
-		vscrollbar = tk.Scrollbar(self, orient = 'vertical')
-		vscrollbar.pack(fill = 'y', side = 'right')
-		self.canvas = tk.Canvas(self, bd = 0, highlightthickness = 0, yscrollcommand = vscrollbar.set)
-		self.canvas.pack(side = 'left', fill = 'both', expand = True)
-		vscrollbar.config(command = self.canvas.yview)
-
-		self.canvas.xview_moveto(0)
-		self.canvas.yview_moveto(0)
-
-		self.interior = interior = tk.Frame(self.canvas)
-		interior_id = self.canvas.create_window(0, 0, window = interior, anchor = 'nw')
-
-		def _configure_interior(event):
-			size = (interior.winfo_reqwidth(), interior.winfo_reqheight())
-			self.canvas.config(scrollregion = '0 0 %s %s' % size)
-			if interior.winfo_reqwidth() != self.canvas.winfo_width():
-				self.canvas.config(width=interior.winfo_reqwidth())
-		interior.bind('<Configure>', _configure_interior)
-
-		def _configure_canvas(event):
-			if interior.winfo_reqwidth() != self.canvas.winfo_width():
-				self.canvas.itemconfigure(interior_id, width=self.canvas.winfo_width())
-		self.canvas.bind('<Configure>', _configure_canvas)
-
-# https://stackoverflow.com/a/36221216
-class Tooltip:
+class VirtualList(tk.Frame):
 	"""
-	create a tooltip for a given widget
+	Treeview list of count() items that only holds the rows currently visible.
+	A fixed pool of rows is reused and filled with row(i) for the visible window, and the scrollbar is driven
+	by hand, so scrolling, selecting and jumping cost the same on any list length. columns is a sequence of
+	(id, heading, width, stretch); select(i) is called when item i becomes the selected item.
 	"""
-	def __init__(self, widget, text='widget info'):
-		self.waittime = 500     #miliseconds
-		self.wraplength = 180   #pixels
-		self.widget = widget
-		self.text = text
-		self.widget.bind("<Enter>", self.enter)
-		self.widget.bind("<Leave>", self.leave)
-		self.widget.bind("<ButtonPress>", self.leave)
-		self.id = None
-		self.tw = None
-
-	def enter(self, event=None):
-		self.schedule()
-
-	def leave(self, event=None):
-		self.unschedule()
-		self.hidetip()
-
-	def schedule(self):
-		self.unschedule()
-		self.id = self.widget.after(self.waittime, self.showtip)
-
-	def unschedule(self):
-		id = self.id
-		self.id = None
-		if id:
-			self.widget.after_cancel(id)
-
-	def showtip(self, event=None):
-		x = y = 0
-		x, y, cx, cy = self.widget.bbox("insert")
-		x += self.widget.winfo_rootx() + 25
-		y += self.widget.winfo_rooty() + 20
-		# creates a toplevel window
-		self.tw = tk.Toplevel(self.widget)
-		# Leaves only the label and removes the app window
-		self.tw.wm_overrideredirect(True)
-		self.tw.wm_geometry("+%d+%d" % (x, y))
-		label = tk.Label(self.tw, text=self.text, justify='left',
-					   background="#ffffff", relief='solid', borderwidth=1,
-					   wraplength = self.wraplength)
-		label.pack(ipadx=1)
-
-	def hidetip(self):
-		tw = self.tw
-		self.tw= None
-		if tw:
-			tw.destroy()
-
-class TooltipButton(ttk.Button):
-	def __init__(self, *args, **kwargs):
-		super().__init__(*args, **kwargs)
-		self.tooltip = Tooltip(self, self['text'])
+	def __init__(self, parent, columns, rows, count, row, select, **kwargs):
+		tk.Frame.__init__(self, parent, **kwargs)
+		self.count = count
+		self.row = row
+		self.on_select = select
+		self.rows = rows
+		self.first = 0
+		self.selected = None
+
+		self.tree = ttk.Treeview(self, columns = [c[0] for c in columns], show = 'headings', height = rows, selectmode = 'browse')
+		for cid, heading, width, stretch in columns:
+			self.tree.heading(cid, text = heading, anchor = 'w')
+			self.tree.column(cid, width = width, minwidth = 20, stretch = stretch)
+		self.scroll = ttk.Scrollbar(self, orient = 'vertical', command = self.yview)
+		self.scroll.pack(side = 'right', fill = 'y')
+		self.tree.pack(side = 'left', fill = 'both', expand = True)
+		self.items = [self.tree.insert('', 'end') for i in range(rows)]
+
+		self.tree.bind('<<TreeviewSelect>>', self.tree_select)
+		self.tree.bind('<MouseWheel>', lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+		self.tree.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+		self.tree.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+		self.tree.bind('<Up>', lambda e: self.move(-1))
+		self.tree.bind('<Down>', lambda e: self.move(1))
+		self.tree.bind('<Prior>', lambda e: self.move(-self.rows))
+		self.tree.bind('<Next>', lambda e: self.move(self.rows))
+
+	def yview(self, *args):
+		n = self.count()
+		if args[0] == 'moveto': first = int(float(args[1]) * n)
+		elif args[2] == 'pages': first = self.first + int(args[1]) * self.rows
+		else: first = self.first + int(args[1])
+		self.set_first(first)
+
+	def set_first(self, first):
+		self.first = max(0, min(first, self.count() - self.rows))
+		self.redraw()
+
+	def redraw(self):
+		n = self.count()
+		for k, iid in enumerate(self.items):
+			i = self.first + k
+			self.tree.item(iid, values = self.row(i) if i < n else ())
+		if self.selected is not None and self.first <= self.selected < self.first + self.rows: self.tree.selection_set(self.items[self.selected - self.first])
+		elif self.tree.selection(): self.tree.selection_remove(self.tree.selection())
+		if n: self.scroll.set(self.first / n, min(1, (self.first + self.rows) / n))
+		else: self.scroll.set(0, 1)
+
+	def select(self, i):
+		"""Selects item i and scrolls it into view."""
+		self.selected = i
+		if not self.first <= i < self.first + self.rows: self.first = max(0, min(i - self.rows // 2, self.count() - self.rows))
+		self.redraw()
+		self.on_select(i)
+
+	def move(self, delta):
+		if self.selected is not None: self.select(max(0, min(self.selected + delta, self.count() - 1)))
+		return 'break'
+
+	def tree_select(self, event = None):
+		# also fired (later) for selections made by redraw(); those match self.selected
+		selection = self.tree.selection()
+		if not selection: return
+		i = self.first + self.items.index(selection[0])
+		if i >= self.count(): self.redraw()
+		elif i != self.selected:
+			self.selected = i
+			self.on_select(i)
 
 # https://stackoverflow.com/a/65447493
 class ThreadWithResult(threading.Thread):
@@ -0,0 +1,93 @@
+"""
+Undo/redo history of quiz edits.
+"""
+import collections
+
+class Missing:
+	def __repr__(self): return 'MISSING'
+
+# value of a dictionary key that is not there
+MISSING = Missing()
+
+# A single change to the container at path (a sequence of keys from the quiz root):
+#	'set'     container[key] goes from old to new; either may be MISSING for dictionary keys
+#	'insert'  new is inserted into the list at key
+#	'delete'  old is deleted from the list at key
+Change = collections.namedtuple('Change', ('action', 'path', 'key', 'old', 'new'))
+
+# the changes made by one user action, undone and redone together
+Edit = collections.namedtuple('Edit', ('label', 'changes'))
+
+def invert(change):
+	if change.action == 'insert': return change._replace(action = 'delete', old = change.new, new = None)
+	if change.action == 'delete': return change._replace(action = 'insert', old = None, new = change.old)
+	return change._replace(old = change.new, new = change.old)
+
+def apply(datafile, change):
+	target = datafile
+	for key in change.path: target = target[key]
+	if change.action == 'insert': target.insert(change.key, change.new)
+	elif change.action == 'delete' or change.new is MISSING: del target[change.key]
+	else: target[change.key] = change.new
+
+class History:
+	"""
+	Undo and redo stacks of the edits made to a quiz. Each change keeps the value it replaced instead of a copy of
+	the quiz, so the history grows with the edits and not with the quiz. Values in the history are the same
+	objects as in the quiz, which is safe as long as every edit goes through do() and questions are replaced,
+	never changed in place. listeners are called with every change applied, including undos and redos.
+	"""
+	def __init__(self, datafile, limit = 1000):
+		self.limit = limit
+		self.listeners = []
+		self.reset(datafile)
+
+	def reset(self, datafile):
+		self.datafile = datafile
+		self.undo_stack = []
+		self.redo_stack = []
+		self.saved = None
+
+	def top(self): return self.undo_stack[-1] if self.undo_stack else None
+
+	@property
+	def modified(self): return self.top() is not self.saved
+
+	def mark_saved(self): self.saved = self.top()
+
+	# for quizzes that differ from their file before any edit, like recovered ones
+	def mark_unsaved(self): self.saved = Edit(None, ())
+
+	def apply(self, changes):
+		for change in changes:
+			apply(self.datafile, change)
+			for listener in self.listeners: listener(change)
+
+	def do(self, label, changes):
+		"""Applies changes as one edit. Changes that do nothing are left out."""
+		changes = [c for c in changes if c.action != 'set' or c.old is not c.new and c.old != c.new]
+		if not changes: return None
+		edit = Edit(label, changes)
+		self.apply(changes)
+		self.undo_stack.append(edit)
+		dropped = self.undo_stack[:-self.limit]
+		del self.undo_stack[:-self.limit]
+		# the saved state can no longer be reached by undoing or redoing
+		if dropped and (self.saved is None or any(done is self.saved for done in dropped)): self.mark_unsaved()
+		if any(undone is self.saved for undone in self.redo_stack): self.mark_unsaved()
+		self.redo_stack.clear()
+		return edit
+
+	def undo(self):
+		if not self.undo_stack: return None
+		edit = self.undo_stack.pop()
+		self.apply([invert(change) for change in reversed(edit.changes)])
+		self.redo_stack.append(edit)
+		return edit
+
+	def redo(self):
+		if not self.redo_stack: return None
+		edit = self.redo_stack.pop()
+		self.apply(edit.changes)
+		self.undo_stack.append(edit)
+		return edit
@@ -0,0 +1,219 @@
+"""
+Exports quizzes as a single HTML file that plays them in any browser, by the same rules as QuestionPlayer.
+
+The player script and the quiz settings come first, so the menu shows before the rest of the file is parsed.
+The questions follow in chunks, each a JSON script element that is only parsed when one of its questions is
+asked, and only the last few parsed chunks are kept. The file is written as it is encoded, so exporting never
+holds more than one chunk of questions.
+"""
+import html
+import json
+
+import jsonhandler
+import quizengine
+
+# questions per chunk
+CHUNK = 500
+
+# the question fields the player reads, other fields are left out
+QUESTION_FIELDS = ('question', 'a', 'b', 'c', 'd', 'correct')
+
+PAGE = '''\
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="generator" content="QuizProg-GUI">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 0; background: #f0f0f0; }}
+main {{ max-width: 48em; margin: 0 auto; padding: 1em; text-align: center; }}
+h1, h2 {{ margin: .5em 0; }}
+button {{ font: inherit; padding: .5em 1em; margin: .25em; }}
+.text {{ background: white; padding: 1em; margin: 1em 0; white-space: pre-wrap; overflow-wrap: anywhere; }}
+.note {{ font-style: italic; }}
+.choices {{ display: grid; grid-template-columns: 1fr 1fr; gap: .5em; margin: 1em 0; }}
+.choices button {{ margin: 0; white-space: pre-wrap; overflow-wrap: anywhere; }}
+</style>
+</head>
+<body>
+<main id="screen"></main>
+<script type="application/json" id="quiz">{quiz}</script>
+<script>
+{player}
+</script>
+'''
+
+PLAYER = '''\
+'use strict';
+var quiz = JSON.parse(document.getElementById('quiz').textContent);
+var screen = document.getElementById('screen');
+var chunks = new Map();
+var state;
+
+function el(tag, text, className) {
+	var e = document.createElement(tag);
+	if (text !== undefined) e.textContent = text;
+	if (className) e.className = className;
+	return e;
+}
+
+function button(text, action) {
+	var b = el('button', text);
+	b.onclick = action;
+	return b;
+}
+
+function show(parts) {
+	screen.textContent = '';
+	parts.forEach(function (part) { screen.appendChild(part); });
+	window.scrollTo(0, 0);
+}
+
+// chunks are parsed when first needed, and only the last few are kept
+function question(i) {
+	var k = Math.floor(i / quiz.chunk);
+	var questions = chunks.get(k);
+	if (questions) chunks.delete(k);
+	else {
+		var script = document.getElementById('q' + k);
+		if (!script) {
+			if (document.readyState != 'loading') throw new Error('Question ' + (i + 1) + ' is missing');
+			return new Promise(function (resolve) {
+				document.addEventListener('DOMContentLoaded', function () { resolve(question(i)); });
+			});
+		}
+		questions = JSON.parse(script.textContent);
+		if (chunks.size >= 8) chunks.delete(chunks.keys().next().value);
+	}
+	chunks.set(k, questions);
+	return Promise.resolve(questions[i % quiz.chunk]);
+}
+
+function menu() {
+	document.title = quiz.title;
+	var parts = [el('p', 'Welcome to'), el('h1', quiz.title)];
+	if (quiz.description) parts.push(el('div', quiz.description, 'text'));
+	parts.push(button('Start quiz', start), el('p', 'Powered by QuizProg-GUI', 'note'));
+	show(parts);
+}
+
+function start() {
+	state = {qnum: -1, lives: quiz.lives, order: new Array(quiz.count)};
+	for (var i = 0; i < quiz.count; i++) state.order[i] = i;
+	if (quiz.randomize) {
+		for (var i = quiz.count - 1; i > 0; i--) {
+			var j = Math.floor(Math.random() * (i + 1));
+			var t = state.order[i]; state.order[i] = state.order[j]; state.order[j] = t;
+		}
+	}
+	next();
+}
+
+function next() {
+	state.qnum++;
+	if (state.qnum == quiz.count) return finish();
+	question(state.order[state.qnum]).then(function (q) {
+		state.question = q;
+		state.wrongmsg = '';
+		display();
+	});
+}
+
+function head() {
+	var count = 'Question ' + (state.qnum + 1) + (quiz.showcount ? ' / ' + quiz.count : '');
+	document.title = quiz.title + ' - ' + count;
+	var parts = [el('h2', count)];
+	if (state.lives !== null) parts.push(el('p', state.lives + ' lives left'));
+	return parts;
+}
+
+function display() {
+	var q = state.question;
+	var choices = el('div', undefined, 'choices');
+	['a', 'b', 'c', 'd'].forEach(function (choice) {
+		choices.appendChild(button(q[choice], function () { choose(choice); }));
+	});
+	show(head().concat([el('div', q.question, 'text'), el('p', state.wrongmsg), choices, button('Quit', quit)]));
+}
+
+function choose(choice) {
+	var q = state.question;
+	if (q.correct == 'all' || q.correct == choice) return correct();
+	// like quizengine.Question, a null message is a missing one
+	if (q.wrongmsg && Object.prototype.hasOwnProperty.call(q.wrongmsg, choice) && q.wrongmsg[choice] != null) state.wrongmsg = String(q.wrongmsg[choice]);
+	else if (quiz.wrongmsg) state.wrongmsg = String(quiz.wrongmsg[Math.floor(Math.random() * quiz.wrongmsg.length)]);
+	else state.wrongmsg = 'Choice ' + choice.toUpperCase() + ' is incorrect!' + (state.lives !== null ? ' You lost a life!' : '');
+	if (state.lives !== null) {
+		state.lives--;
+		if (!state.lives) return fail();
+	}
+	display();
+}
+
+function correct() {
+	if (!state.question.explanation) return next();
+	show(head().concat([el('p', 'Correct!', 'note'), el('div', state.question.explanation, 'text'), button('Next', next)]));
+}
+
+function finish() {
+	document.title = quiz.title;
+	var parts = [el('h1', 'Quiz completed!')];
+	if (quiz.finish) parts.push(el('div', quiz.finish, 'text'));
+	parts.push(button('Return to menu', menu));
+	show(parts);
+}
+
+function fail() {
+	var parts = [el('h1', 'Game Over')];
+	if (quiz.fail) parts.push(el('div', quiz.fail, 'text'));
+	parts.push(button('Try again!', start), button('Return to menu', menu));
+	show(parts);
+}
+
+function quit() {
+	if (confirm('Are you sure you want to quit this quiz?')) menu();
+}
+
+menu();'''
+
+def script_json(obj):
+	# '<' only occurs in strings, where \u003c keeps '</script>' and '<!--' from ending the script element
+	return json.dumps(obj, ensure_ascii = False, separators = (',', ':')).replace('<', '\\u003c')
+
+def player_question(question):
+	entry = {field: question[field] for field in QUESTION_FIELDS}
+	if type(question.get('wrongmsg')) is dict: entry['wrongmsg'] = question['wrongmsg']
+	if type(question.get('explanation')) is str and question['explanation']: entry['explanation'] = question['explanation']
+	return entry
+
+def iter_html(datafile, chunk = CHUNK):
+	"""Yields the HTML player of the quiz piece by piece, for jsonhandler.atomic_write()."""
+	questions = datafile['questions']
+	quiz = {
+		'title': datafile['title'],
+		'description': quizengine.setting(datafile, 'description', str),
+		'lives': quizengine.setting(datafile, 'lives', int),
+		'randomize': bool(quizengine.setting(datafile, 'randomize', bool)),
+		'showcount': bool(quizengine.setting(datafile, 'showcount', bool)),
+		'wrongmsg': quizengine.setting(datafile, 'wrongmsg', list),
+		'fail': quizengine.setting(datafile, 'fail', str),
+		'finish': quizengine.setting(datafile, 'finish', str),
+		'count': len(questions),
+		'chunk': chunk,
+	}
+	yield PAGE.format(title = html.escape(datafile['title']), quiz = script_json(quiz), player = PLAYER)
+
+	entries = []
+	for i, question in enumerate(questions):
+		entries.append(player_question(question))
+		if len(entries) == chunk or i == len(questions) - 1:
+			yield f'<script type="application/json" id="q{i // chunk}">{script_json(entries)}</script>\n'
+			entries = []
+	yield '</body>\n</html>\n'
+
+def write_html(datafile, path):
+	"""Writes the HTML player of datafile (a jsonhandler.snapshot() of the quiz) to path."""
+	jsonhandler.atomic_write(path, iter_html(datafile), encoding = 'utf-8')
+	return path
@@ -0,0 +1,230 @@
+"""
+Crash recovery journal of quiz edits.
+
+Every editor session gets a folder under the recovery folder, locked for as long as the session runs. The folder
+holds numbered generations: N.journal starts with a line describing its base, either the quiz file as it was
+opened or saved, or the checkpoint N.qpg, followed by one line per edit, undo and redo made since. A new
+generation is started whenever the quiz is opened or saved, and when the journal grows past threshold, in which
+case the quiz is checkpointed in the background so recovery never has to replay more than threshold bytes.
+Generation N continues where N - 1 ended, so recovery replays from the newest generation whose base can still
+be loaded, through all the later ones.
+"""
+import os
+import json
+import time
+import errno
+import contextlib
+import shutil
+import threading
+import collections
+
+import qpg
+import history
+import jsonhandler
+
+if os.name == 'nt': import msvcrt
+else: import fcntl
+
+def lock(f, wait = False):
+	"""Locks the open file f for this process. Unless wait is set, returns False if another process holds the lock."""
+	try:
+		if os.name != 'nt': fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+		else:
+			f.seek(0)
+			while True:
+				try:
+					msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+					break
+				except OSError:
+					if not wait: raise
+					time.sleep(0.1)
+		return True
+	except OSError: return False
+
+def unlock(f):
+	if os.name != 'nt': fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+	else:
+		f.seek(0)
+		msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextlib.contextmanager
+def root_lock(root):
+	"""
+	Holds the lock of the recovery folder root. Sessions hold it while they create and lock their folder, and
+	while they check whether another session's folder is locked, so no folder is ever seen before it is locked.
+	"""
+	with open(os.path.join(root, 'sessions.lock'), 'ab') as f:
+		lock(f, True)
+		try: yield
+		finally: unlock(f)
+
+def file_base(path, fmt):
+	"""Returns the base of a generation that starts from the quiz file at path."""
+	stat = os.stat(path)
+	return {'savepath': path, 'format': fmt, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+def encode_change(change):
+	record = {'action': change.action, 'path': change.path, 'key': change.key}
+	if change.action != 'insert' and change.old is not history.MISSING: record['old'] = change.old
+	if change.action != 'delete' and change.new is not history.MISSING: record['new'] = change.new
+	return record
+
+def decode_change(record):
+	default = history.MISSING if record['action'] == 'set' else None
+	return history.Change(record['action'], tuple(record['path']), record['key'], record.get('old', default), record.get('new', default))
+
+def replay(hist, records):
+	"""Repeats the edits, undos and redos of records on hist."""
+	for record in records:
+		if 'do' in record: hist.do(record['do'], [decode_change(change) for change in record['changes']])
+		elif 'undo' in record: hist.undo()
+		elif 'redo' in record: hist.redo()
+
+# what read() found: the base to load, its generation and the records to replay after loading it
+Recovery = collections.namedtuple('Recovery', ('base', 'generation', 'records'))
+
+class Journal:
+	# bytes of edits after which the quiz is checkpointed and a new generation is started
+	threshold = 4 << 20
+	# milliseconds to wait before syncing, edits made in the meantime are synced together
+	sync_delay = 500
+
+	def __init__(self, folder, lock_file):
+		self.folder = folder
+		self.lock_file = lock_file
+		self.generation = max(self.generations(), default = 0)
+		self.file = None
+		self.pending = []
+		self.size = 0
+		self.checkpoint_thread = None
+
+	@classmethod
+	def create(cls, root):
+		"""Starts the journal of a new session in a new folder under root. Raises OSError if it cannot be locked."""
+		folder = os.path.join(root, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}')
+		os.makedirs(root, exist_ok = True)
+		with root_lock(root):
+			os.makedirs(folder)
+			lock_file = open(os.path.join(folder, 'lock'), 'wb')
+			if not lock(lock_file):
+				lock_file.close()
+				raise OSError(errno.EBUSY, 'Recovery folder is in use by another session', folder)
+		return cls(folder, lock_file)
+
+	@classmethod
+	def orphans(cls, root):
+		"""Yields the journals of sessions under root that are no longer running, newest first."""
+		try: names = sorted(os.listdir(root), reverse = True)
+		except OSError: return
+		for name in names:
+			folder = os.path.join(root, name)
+			try:
+				with root_lock(root):
+					# a folder without a lock file is not a session, opening it must not create one
+					try: lock_file = open(os.path.join(folder, 'lock'), 'r+b')
+					except OSError: continue
+					locked = lock(lock_file)
+			except OSError: return
+			if locked: yield cls(folder, lock_file)
+			else: lock_file.close()
+
+	def path(self, generation, ext): return os.path.join(self.folder, f'{generation}.{ext}')
+
+	def generations(self):
+		try: names = os.listdir(self.folder)
+		except OSError: return []
+		return [int(name[:-8]) for name in names if name.endswith('.journal') and name[:-8].isdigit()]
+
+	def write(self, record):
+		line = qpg.encode(record) + b'\n'
+		self.pending.append(line)
+		self.size += len(line)
+
+	def record(self, action, edit = None):
+		"""Adds an edit ('do') or an undo or redo to the journal. It is only written by the next flush()."""
+		if edit is None: self.write({action: True})
+		else: self.write({action: edit.label, 'changes': [encode_change(change) for change in edit.changes]})
+
+	def flush(self):
+		"""Writes the pending records and waits until they are on disk."""
+		if not self.pending or not self.file: return
+		self.file.write(b''.join(self.pending))
+		self.pending.clear()
+		self.file.flush()
+		os.fsync(self.file.fileno())
+
+	def start(self, base):
+		"""Starts a new generation from base, the quiz the following edits apply to."""
+		self.flush()
+		if self.file: self.file.close()
+		self.generation += 1
+		self.file = open(self.path(self.generation, 'journal'), 'wb')
+		self.size = 0
+		self.write({'base': base})
+		self.flush()
+		# a quiz file makes all the older generations obsolete
+		if not base.get('checkpoint'): self.prune(self.generation)
+
+	def prune(self, generation):
+		"""Removes the generations older than generation."""
+		for old in self.generations():
+			if old >= generation: continue
+			for ext in ('journal', 'qpg'):
+				try: os.remove(self.path(old, ext))
+				except OSError: pass
+
+	def checkpointing(self): return self.checkpoint_thread is not None and self.checkpoint_thread.is_alive()
+
+	def needs_checkpoint(self): return self.size > self.threshold and not self.checkpointing()
+
+	def checkpoint(self, snap, **base):
+		"""
+		Starts a new generation from a checkpoint of snap (a jsonhandler.snapshot() of the quiz), which is written in
+		a background thread. Until it is written, the older generations still recover the same quiz.
+		"""
+		self.start(dict(base, checkpoint = True))
+		self.checkpoint_thread = threading.Thread(target = self.write_checkpoint, args = (self.generation, snap), daemon = True)
+		self.checkpoint_thread.start()
+
+	def write_checkpoint(self, generation, snap):
+		chunks, encoding = jsonhandler.iter_dump(snap, 'qpg')
+		try: jsonhandler.atomic_write(self.path(generation, 'qpg'), chunks, encoding = encoding)
+		except OSError: return
+		self.prune(generation)
+
+	def read_generation(self, generation):
+		records = []
+		try:
+			with open(self.path(generation, 'journal'), 'rb') as f:
+				for line in f:
+					# a torn line from a crash ends the journal
+					try: records.append(json.loads(line))
+					except ValueError: break
+		except OSError: pass
+		return records
+
+	def base_valid(self, generation, base):
+		if base.get('checkpoint'): return os.path.exists(self.path(generation, 'qpg'))
+		try: stat = os.stat(base['savepath'])
+		except OSError: return False
+		return stat.st_size == base['size'] and stat.st_mtime_ns == base['mtime']
+
+	def read(self):
+		"""Returns the Recovery of the quiz this journal ended with, or None if it cannot be recovered."""
+		generations = sorted(self.generations())
+		for k in range(len(generations) - 1, -1, -1):
+			records = self.read_generation(generations[k])
+			if not records or 'base' not in records[0] or not self.base_valid(generations[k], records[0]['base']): continue
+			base = records.pop(0)['base']
+			for later in generations[k + 1:]: records += self.read_generation(later)[1:]
+			return Recovery(base, generations[k], records)
+		return None
+
+	def close(self, remove = True):
+		"""Ends the session, removing the journal unless remove is False."""
+		if self.file:
+			self.flush()
+			self.file.close()
+			self.file = None
+		self.lock_file.close()
+		if remove: shutil.rmtree(self.folder, ignore_errors = True)
@@ -1,8 +1,317 @@
 import os
-import copy
+import re
+import sys
 import json
+import types
+import codecs
+import shutil
+import hashlib
+import tempfile
+import collections
 import tkinter as tk
 import tkinter.filedialog
+import tkinter.messagebox
+
+import qpg
+
+# question is None for quiz-level errors
+ValidationError = collections.namedtuple('ValidationError', ('question', 'field', 'message'))
+
+class ValidationReport(list):
+	def summary(self):
+		if not self: return ''
+		return self[0].message + (f' ({len(self) - 1} more error{"s" if len(self) > 2 else ""})' if len(self) > 1 else '')
+
+	def text(self, limit = 20):
+		lines = [e.message for e in self[:limit]]
+		if len(self) > limit: lines.append(f'...and {len(self) - limit} more')
+		return '\n'.join(lines)
+
+class QuizValidator:
+	"""
+	Validates a quiz in a single pass, collecting every error instead of stopping at the first one.
+	The field tables are resolved once up front so each question costs one dict lookup per field.
+	"""
+	quiz_fields = (('title', str, 'String'), ('questions', (list, tuple, qpg.QuestionStore), 'List'))
+	question_fields = (('question', str), ('a', str), ('b', str), ('c', str), ('d', str), ('correct', str))
+
+	def __init__(self):
+		self.report = ValidationReport()
+
+	def question(self, i, question):
+		if type(question) is not dict:
+			self.report.append(ValidationError(i, None, f'Question {i+1} is not an object!'))
+			return
+		get = question.get
+		for field, valtype in self.question_fields:
+			value = get(field)
+			if type(value) is not valtype or not value: self.report.append(ValidationError(i, field, f'String variable \'{field}\' not found or empty in question {i+1}!'))
+
+	def quiz(self, datafile, questions = True):
+		"""Checks the quiz-level fields, and every question unless they were already checked while loading."""
+		for field, valtype, typename in self.quiz_fields:
+			value = datafile.get(field)
+			if not isinstance(value, valtype) or not value: self.report.append(ValidationError(None, field, f'{typename} variable \'{field}\' not found or empty!'))
+		if questions and isinstance(datafile.get('questions'), self.quiz_fields[1][1]):
+			for i, question in enumerate(datafile['questions']): self.question(i, question)
+		# quiz-level errors first, then questions in order
+		self.report.sort(key = lambda e: -1 if e.question is None else e.question)
+		return self.report
+
+def file_format(path): return 'json' if os.path.splitext(path)[1].casefold() == '.json' else 'qpg'
+
+def validate_file(path, progress = None, cache_bytes = None, embedded = False, trust_validated = False):
+	"""
+	Loads and validates a quiz file (JSON, or a QPG container) without any GUI. Returns (datafile, report).
+	If cache_bytes is given, the questions of a QPG container are not loaded but kept in a QuestionStore
+	with that much cache; containers saved as validated are then opened without decoding any question, if
+	they are still intact. Questions that cannot be decoded are reported like invalid ones.
+	If embedded is set, path is a compiled quiz and the container appended to it is loaded; if embedded is a
+	string, path is an exported Python app and the container is its ZIP member of that name. trust_validated
+	is passed on to qpg.QPGFile.open_payload().
+	Raises OSError, json.JSONDecodeError, UnicodeDecodeError or qpg.QPGError if the file cannot be parsed.
+	"""
+	validator = QuizValidator()
+	if embedded: qfile = qpg.QPGFile.open_payload(path, None if embedded is True else embedded, trust_validated)
+	else:
+		with open(path, 'rb') as f:
+			if not qpg.is_qpg(f):
+				datafile = QuizReader(f, progress).load(validator.question)
+				return datafile, validator.quiz(datafile, False)
+		qfile = qpg.QPGFile.open(path)
+
+	if cache_bytes is None: datafile = qfile.load(validator.question, progress)
+	else:
+		# the SHA-256 of payloads was checked when they were opened, or is checked by the player
+		if not (qfile.flags & qpg.FLAG_VALIDATED and (embedded or qfile.check_crc())): check_records(qfile, validator, progress)
+		datafile = qfile.open_lazy(cache_bytes)
+	return datafile, validator.quiz(datafile, False)
+
+def check_records(qfile, validator, progress = None):
+	"""Decodes and validates every question of the QPG container qfile, reporting the records that are not valid JSON."""
+	offsets = qfile.offsets()
+	for i in range(qfile.count):
+		try: question = json.loads(qfile.read(offsets[i], offsets[i + 1] - offsets[i]))
+		except ValueError: validator.report.append(ValidationError(i, None, f'Question {i+1} is corrupt!'))
+		else: validator.question(i, question)
+		if progress and not i % 4096: progress(i, qfile.count)
+
+def iter_dump(datafile, fmt):
+	"""Returns (chunks, encoding) of the quiz encoded in fmt ('json' or 'qpg'), for atomic_write()."""
+	if fmt == 'qpg': return qpg.iter_encode(datafile, QuizValidator()), None
+	else: return iter_json(datafile), 'utf-8'
+
+class QuizReader:
+	"""
+	Incremental reader for quiz files.
+	The top-level object is parsed key by key and the 'questions' array element by element, so only one
+	chunk of the file is held as text at a time. Each question is handed to question_hook as soon as it
+	is parsed, and progress(bytes_read, file_size) is called after every chunk.
+	"""
+	chunk_size = 1 << 16
+	whitespace = re.compile(r'[ \t\n\r]*')
+
+	def __init__(self, f, progress = None):
+		self.f = f
+		self.decoder = codecs.getincrementaldecoder('utf-8')()
+		self.json_decoder = json.JSONDecoder()
+		self.progress = progress
+
+		try: self.size = os.fstat(f.fileno()).st_size
+		except (AttributeError, OSError): self.size = 0
+		self.bytes_read = 0
+
+		self.buf = ''
+		self.pos = 0
+		self.eof = False
+
+	def fill(self, size = None):
+		if self.eof: return False
+		data = self.f.read(size or self.chunk_size)
+		self.bytes_read += len(data)
+		if data: text = self.decoder.decode(data)
+		else:
+			text = self.decoder.decode(b'', True)
+			self.eof = True
+		self.buf = self.buf[self.pos:] + text
+		self.pos = 0
+		if self.progress: self.progress(self.bytes_read, self.size)
+		return not self.eof
+
+	def peek(self):
+		while True:
+			self.pos = self.whitespace.match(self.buf, self.pos).end()
+			if self.pos < len(self.buf): return self.buf[self.pos]
+			if not self.fill(): return ''
+
+	def expect(self, chars):
+		c = self.peek()
+		if not c or c not in chars: raise json.JSONDecodeError(f'Expecting one of {chars!r}', self.buf, self.pos)
+		self.pos += 1
+		return c
+
+	def value(self):
+		self.peek()
+		scan_once = self.json_decoder.scan_once
+		while True:
+			try:
+				obj, end = scan_once(self.buf, self.pos)
+				# a value touching the end of the buffer may continue in the next chunk (e.g. numbers)
+				if end < len(self.buf) or self.eof:
+					self.pos = end
+					return obj
+			except StopIteration as exc:
+				if self.eof: raise json.JSONDecodeError('Expecting value', self.buf, exc.value) from None
+			except json.JSONDecodeError:
+				if self.eof: raise
+			# grow the read size with the pending value so huge strings are not re-parsed once per chunk
+			self.fill(max(self.chunk_size, len(self.buf) - self.pos))
+
+	def array(self, hook = None):
+		self.expect('[')
+		items = []
+		if self.peek() == ']':
+			self.pos += 1
+			return items
+		skip = self.whitespace.match
+		while True:
+			item = self.value()
+			if hook: hook(len(items), item)
+			items.append(item)
+			# fast path for the separator, expect() handles chunk boundaries
+			pos = skip(self.buf, self.pos).end()
+			if pos < len(self.buf) and self.buf[pos] in ',]':
+				self.pos = pos + 1
+				if self.buf[pos] == ']': return items
+			elif self.expect(',]') == ']': return items
+
+	def load(self, question_hook = None):
+		datafile = {}
+		self.expect('{')
+		if self.peek() == '}': self.pos += 1
+		else:
+			while True:
+				if self.peek() != '"': raise json.JSONDecodeError('Expecting property name enclosed in double quotes', self.buf, self.pos)
+				key = self.value()
+				self.expect(':')
+				if key == 'questions' and self.peek() == '[': datafile[key] = self.array(question_hook)
+				else: datafile[key] = self.value()
+				if self.expect(',}') == '}': break
+		if self.peek(): raise json.JSONDecodeError('Extra data', self.buf, self.pos)
+		return datafile
+
+def check_files(paths):
+	"""Prints the validation report of every file in paths. Returns 1 if any of them is invalid, else 0."""
+	status = 0
+	for path in paths:
+		try: datafile, report = validate_file(path)
+		except OSError as exc: print(f'{path}: {exc.strerror}'); status = 1; continue
+		except (json.decoder.JSONDecodeError, UnicodeDecodeError): print(f'{path}: Invalid JSON data!'); status = 1; continue
+		except qpg.QPGError as exc: print(f'{path}: Invalid QPG data! ({exc})'); status = 1; continue
+		if report:
+			print(f'{path}: {len(report)} error{"s" if len(report) > 1 else ""}')
+			for e in report: print(f'  {e.message}')
+			status = 1
+		else: print(f'{path}: OK ({len(datafile["questions"])} question(s))')
+	return status
+
+def snapshot(datafile):
+	"""
+	Returns an immutable copy of the quiz that shares its question dicts with datafile.
+	Only the top level and the lists of references are copied (lists are frozen into tuples, question stores
+	into read-only stores over the same container), so taking a snapshot does not copy any question. This relies on question dicts never being changed in place:
+	editors work on a copy of a question and replace it in the questions list when done.
+	"""
+	return types.MappingProxyType({key: freeze(value) for key, value in datafile.items()})
+
+def freeze(value):
+	if type(value) is list: return tuple(value)
+	if isinstance(value, qpg.QuestionStore): return value.snapshot()
+	return value
+
+def thaw(snap):
+	"""Returns an editable quiz from a snapshot. Question dicts are still shared with the snapshot."""
+	return {key: list(value) if type(value) is tuple else value.copy() if isinstance(value, qpg.QuestionStore) else value for key, value in snap.items()}
+
+def iter_json(datafile, indent = 4):
+	"""
+	Encodes the quiz as JSON text piece by piece, one question at a time, so the whole file is never built
+	in memory. The output is identical to json.dumps(datafile, ensure_ascii = False, indent = indent).
+	"""
+	encoder = json.JSONEncoder(ensure_ascii = False, indent = indent)
+	nl1 = '\n' + ' ' * indent
+	nl2 = nl1 + ' ' * indent
+	if not datafile:
+		yield '{}'
+		return
+
+	sep = '{'
+	for key, value in datafile.items():
+		yield f'{sep}{nl1}{encoder.encode(key)}: '
+		sep = ','
+		if key == 'questions' and len(value):
+			qsep = '['
+			for question in value:
+				# JSON strings never contain raw newlines, so re-indenting is a plain replace
+				yield qsep + nl2 + encoder.encode(question).replace('\n', nl2)
+				qsep = ','
+			yield nl1 + ']'
+		else: yield encoder.encode(value).replace('\n', nl1)
+	yield '\n}'
+
+def atomic_write(path, chunks, last_hash = None, encoding = 'utf-8'):
+	"""
+	Writes chunks (str, or bytes if encoding is None) to path through a temporary file in the same directory,
+	which is fsynced and then renamed over path, so a crash never leaves a half-written file behind.
+	Returns the SHA-256 of the content. If it equals last_hash and path still exists, the temporary file is
+	dropped before syncing and path is left untouched.
+	"""
+	directory = os.path.dirname(os.path.abspath(path))
+	fd, tmp = tempfile.mkstemp(prefix = f'.{os.path.basename(path)}.', suffix = '.tmp', dir = directory)
+	digest = hashlib.sha256()
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			buf = []
+			size = 0
+			for chunk in chunks:
+				buf.append(chunk)
+				size += len(chunk)
+				if size >= 1 << 16:
+					data = ''.join(buf).encode(encoding) if encoding else b''.join(buf)
+					digest.update(data)
+					f.write(data)
+					buf = []
+					size = 0
+			data = ''.join(buf).encode(encoding) if encoding else b''.join(buf)
+			digest.update(data)
+			f.write(data)
+
+			content_hash = digest.hexdigest()
+			if content_hash == last_hash and os.path.exists(path):
+				f.close()
+				os.remove(tmp)
+				return content_hash
+			f.flush()
+			os.fsync(f.fileno())
+
+		# mkstemp creates the file as 0600, keep the permissions of the file being replaced
+		try: shutil.copymode(path, tmp)
+		except OSError:
+			umask = os.umask(0)
+			os.umask(umask)
+			os.chmod(tmp, 0o666 & ~umask)
+		os.replace(tmp, path)
+	except BaseException:
+		try: os.remove(tmp)
+		except OSError: pass
+		raise
+
+	# make the rename itself durable
+	if os.name != 'nt':
+		dfd = os.open(directory, os.O_RDONLY)
+		try: os.fsync(dfd)
+		finally: os.close(dfd)
+	return content_hash
 
 class JSONHandler:
 	def __init__(self, gui, report_error, fmt_oserror):
@@ -10,24 +319,25 @@ class JSONHandler:
 		self.report_error = report_error
 		self.fmt_oserror = fmt_oserror
 
-		self.datafile_new = copy.deepcopy(self.gui.datafile)
+		self.datafile_new = snapshot(self.gui.datafile)
 		self.new_quiz()
 
 		self.savepath = ''
 		self.savepath_tmp = ''
 		self.message = None
 
+		self.save_hash_path = None
+		self.save_hash = None
+
 	def reload_dtfile(self): self.datafile = self.gui.datafile
 
 	def reload(self):
-		self.reload_dtfile()
-		self.datafile = copy.deepcopy(self.datafile_bak)
-		self.gui.datafile = copy.deepcopy(self.datafile)
+		self.datafile = self.gui.datafile = thaw(self.datafile_bak)
 
-	def create_backup(self): self.datafile_bak = copy.deepcopy(self.datafile)
+	def create_backup(self): self.datafile_bak = snapshot(self.datafile)
 
 	def new_quiz(self):
-		self.datafile = copy.deepcopy(self.datafile_new)
+		self.datafile = thaw(self.datafile_new)
 		self.create_backup()
 
 	def open_file(self):
@@ -39,41 +349,42 @@ class JSONHandler:
 		if self.savepath_tmp:
 			if os.path.splitext(self.savepath_tmp)[1].casefold() == '.json':
 				pass#if not tk.messagebox.askyesno('Note for JSON files', 'The file you are trying to open is a (console) QuizProg quiz project. However, these quiz projects are limited to the features in (console) QuizProg.\nRight now you are not required to save this file as a QuizProg-GUI quiz project until you want to use new features present in QuizProg-GUI.\nDo you want to continue?'): return False
-			success, message = self.check_json(self.savepath_tmp)
+			success, message = self.load(self.savepath_tmp)
 			if success: self.gui.message = message
 			else: self.gui.message_force = message
 			return success
 		else: return False
 
-	def check_json(self, path):
+	def load(self, path):
+		self.gui.open_progress(f'Loading {os.path.basename(path)}...')
+		try: result = self.check_json(path, self.gui.set_progress)
+		finally: self.gui.close_progress()
+		if len(self.report) > 1: tk.messagebox.showerror('Invalid quiz', f'{os.path.basename(path)} has {len(self.report)} errors:\n\n{self.report.text()}')
+		return result
+
+	def check_json(self, path, progress = None):
 		old_path = self.savepath
 		self.savepath = path
 		if os.name == 'nt': self.savepath = self.savepath.replace('/', '\\')
+
+		success = False
+		self.report = ValidationReport()
 		try:
-			success = False
-			for i in range(1):
-				try: self.datafile = json.load(open(self.savepath, encoding = 'utf-8'))
-				except OSError as exc: message = self.fmt_oserror(exc); self.savepath = old_path; break
-				except (json.decoder.JSONDecodeError, UnicodeDecodeError): message = 'Invalid JSON data!'; self.savepath = old_path; break
-				gerror_msg = lambda a: f'String variable \'{a}\' not found or empty!'
-				if not self.check_element('title', rel = False): message = gerror_msg('title'); self.savepath = old_path; break
-				if not self.check_element('questions', list, rel = False): gerror_msg('questions'); self.savepath = old_path; break
-				for i in range(len(self.datafile['questions'])):
-					qerror_msg = lambda a: f'String variable \'{a}\' not found or empty in question {i+1}!'
-					if not self.check_question_element('question', i, rel = False): message = qerror_msg('question'); success = False; self.savepath = old_path; break
-					if not self.check_question_element('a', i, rel = False): message = qerror_msg('a'); success = False; self.savepath = old_path; break
-					if not self.check_question_element('b', i, rel = False): message = qerror_msg('b'); success = False; self.savepath = old_path; break
-					if not self.check_question_element('c', i, rel = False): message = qerror_msg('c'); success = False; self.savepath = old_path; break
-					if not self.check_question_element('d', i, rel = False): message = qerror_msg('d'); success = False; self.savepath = old_path; break
-					if not self.check_question_element('correct', i, rel = False): message = qerror_msg('correct'); success = False; self.savepath = old_path; break
-					success = True
-				if not success: break
+			datafile, self.report = validate_file(self.savepath, progress, self.gui.question_cache_mb << 20)
+			if self.report: message = self.report.summary()
+			else:
+				self.datafile = datafile
 				self.create_backup()
 				message = f'Loaded quiz: {self.savepath}'
-			if not success:
-				self.reload_dtfile()
-				self.create_backup()
-		except OSError: report_error(*sys.exc_info())
+				success = True
+		except OSError as exc: message = self.fmt_oserror(exc)
+		except (json.decoder.JSONDecodeError, UnicodeDecodeError): message = 'Invalid JSON data!'
+		except qpg.QPGError as exc: message = f'Invalid QPG data! ({exc})'
+
+		if not success:
+			self.savepath = old_path
+			self.reload_dtfile()
+			self.create_backup()
 
 		return success, message
 
@@ -84,17 +395,17 @@ class JSONHandler:
 		self.savepath_tmp = tk.filedialog.asksaveasfilename(initialdir = os.path.dirname(self.savepath) if self.savepath else os.getcwd(), initialfile = f'{self.datafile["title"]}.qpg', filetypes = [('QuizProg-GUI Quiz Projects', '*.qpg'), ('QuizProg Quiz Projects', '*.json'), ('All Files', '*.*')], defaultextension = '.qpg')
 		if self.savepath_tmp:
 			if os.path.splitext(self.savepath_tmp)[1].casefold() == '.json' and not allow_json:
-				tk.messagebox.showerror('Cannot save as JSON', 'To use new features present in QuizProg-GUI, you must save this file as a QuizProg-GUI quiz project.')
+				tk.messagebox.showerror('Cannot save as JSON', 'To use new features present in QuizProg-GUI, you must save this file as a QuizProg-GUI quiz project.\nTo get a copy for console QuizProg, use File > Export as JSON.')
 				return False
 			self.savepath = self.savepath_tmp
 			if os.name == 'nt': self.savepath = self.savepath.replace('/', '\\')
 			success = False
 			try:
-				with open(self.savepath, 'w', encoding = 'utf-8') as f: f.write(json.dumps(self.datafile, ensure_ascii = False, indent = 4))
+				self.write_file(self.savepath)
 				message = f'Quiz saved as: {self.savepath}'
 				success = True
 			except OSError:
-				report_error(*sys.exc_info())
+				self.report_error(*sys.exc_info())
 				return False
 
 			if success: self.gui.message = message
@@ -102,6 +413,22 @@ class JSONHandler:
 			return success
 		else: return False
 
+	def write_file(self, path, fmt = None):
+		"""
+		Saves the current quiz to path, as JSON for .json files and as a QPG container otherwise.
+		This is the only way quizzes are written: the encoding is streamed to a temporary file that atomically
+		replaces path, and nothing is replaced if the content is the same as the last save to path.
+		Returns False if the save was skipped.
+		"""
+		self.reload_dtfile()
+		key = os.path.normcase(os.path.abspath(path))
+		last_hash = self.save_hash if key == self.save_hash_path else None
+		chunks, encoding = iter_dump(self.datafile, fmt or file_format(path))
+		qpg.release(path)
+		self.save_hash = atomic_write(path, chunks, last_hash, encoding)
+		self.save_hash_path = key
+		return self.save_hash != last_hash
+
 	def check_element(self, element, valtype = str, rel = True):
 		if rel: self.reload_dtfile()
 
@@ -25,6 +25,49 @@ import traceback
 import tkinter.messagebox
 
 if __name__ == '__main__':
+	# compiling runs in worker processes, which frozen builds start as this executable
+	import multiprocessing
+	multiprocessing.freeze_support()
+
+	import argparse
+	parser = argparse.ArgumentParser(description = 'QuizProg-GUI')
+	parser.add_argument('path', nargs = '?', default = '', help = 'quiz file to open')
+	parser.add_argument('--check', nargs = '+', metavar = 'FILE', help = 'validate quiz files and print every error without opening the GUI')
+	parser.add_argument('--build-runtime', metavar = 'DIR', help = 'build the player runtime of compiled quizzes into DIR, for bundling with a frozen build')
+	parser.add_argument('--compile', nargs = '+', metavar = 'PATH', help = 'compile quiz files, or all quizzes in folders, into executables without opening the GUI')
+	parser.add_argument('--out', default = 'dist', metavar = 'DIR', help = 'folder for the executables of --compile (default: dist)')
+	parser.add_argument('-j', '--jobs', type = int, metavar = 'N', help = 'quizzes to compile at once (default: number of CPUs)')
+	parser.add_argument('--simulate', metavar = 'FILE', help = 'simulate playthroughs of a quiz file and print how many pass and where they fail (needs NumPy)')
+	parser.add_argument('--sessions', type = int, default = 100000, metavar = 'N', help = 'playthroughs to simulate (default: 100000)')
+	parser.add_argument('--success', default = '0.9', metavar = 'P', help = 'chance of answering a question right, or FIRST:LAST for questions getting harder or easier (default: 0.9)')
+	parser.add_argument('--lives', type = int, nargs = '+', metavar = 'N', help = 'lives to simulate, several to compare them (default: the lives of the quiz)')
+	parser.add_argument('--seed', type = int, help = 'random seed of --simulate, for repeatable results')
+	args = parser.parse_args()
+
+	if args.check:
+		import jsonhandler
+		sys.exit(jsonhandler.check_files(args.check))
+
+	if args.build_runtime:
+		import compiler
+		print(compiler.build_runtime(args.build_runtime))
+		sys.exit()
+
+	if args.compile:
+		import compiler
+		sys.exit(compiler.compile_files(args.compile, args.out, args.jobs))
+
+	if args.simulate:
+		# frozen builds leave the simulator and NumPy out
+		if getattr(sys, 'frozen', False):
+			print('Simulating is not part of this build, run main.py with Python and NumPy instead')
+			sys.exit(1)
+		try: import simulator
+		except ImportError:
+			print('Simulating needs NumPy (pip install numpy)')
+			sys.exit(1)
+		sys.exit(simulator.simulate_file(args.simulate, args.sessions, args.success, args.lives, args.seed))
+
 	try: import gui
 	except ImportError:
 		err_text = f'Whoops! An error occured when attempting to import "gui.py".'
@@ -32,7 +75,7 @@ if __name__ == '__main__':
 		tk.messagebox.showerror('Hmmm?', err_text)
 		sys.exit()
 
-	g = gui.GUI(sys.argv[1] if len(sys.argv) > 1 else '')
-	gui.g = g
+	g = gui.GUI(args.path)
+	gui.player.g = g
 	try: g.start_main()
 	except Exception: tk.messagebox.showerror('Error', gui.report_error.__func__(*sys.exc_info(), True))
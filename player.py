@@ -0,0 +1,600 @@
+"""
+The quiz player, and the window compiled quizzes play in.
+
+gui.py builds the editor on top of this module. Compiled quizzes and exported Python apps run Player, which only
+needs this module, quizengine, jsonhandler and qpg, so they neither ship nor import the editor, the updater and
+the compiler.
+"""
+import sys
+if __name__ == '__main__':
+	print('Please run main.py to start the program!')
+	sys.exit()
+
+import os
+import threading
+import tkinter as tk
+import tkinter.ttk as ttk
+import tkinter.font
+import tkinter.messagebox
+
+try: temp_path = sys._MEIPASS
+
+except AttributeError: temp_path = os.getcwd()
+
+import qpg
+import jsonhandler
+import quizengine
+
+name = 'QuizProg-GUI'
+
+username = 'gamingwithevets'
+repo_name = 'quizprog-gui'
+
+version = '1.2.0_01'
+internal_version = 'v1.2.0_01'
+prerelease = False
+
+license = 'Expat (MIT)'
+
+g = None
+
+def fmt_oserror(exc):
+	if os.name == 'nt':
+		if exc.winerror: errno = f'WE{exc.winerror}'
+		else: errno = exc.errno
+	else: errno = exc.errno
+	return f'[{type(exc).__name__}] {exc.filename}{", "+exc.filename2 if exc.filename2 else ""}: {exc.strerror} ({errno})'
+
+@staticmethod
+def report_error(e, val, tb, fatal = False):
+	import traceback
+	err_text = '\n'.join(traceback.format_exception(e, val, tb)) + f'\nIf this error persists, please report it here:\nhttps://github.com/{username}/{repo_name}/issues'
+
+	exc = val
+
+	print(f'{"Fatal exception" if fatal else "Exception"} raised:\n\n' + err_text)
+	if issubclass(type(exc), OSError): message = fmt_oserror(exc)
+	else: message = f'[{type(exc).__name__}] {exc}'
+	g.set_message_force(message)
+	g.window.update()
+	return 'Oops! A fatal error has occured.\n\n' + err_text
+
+tk.Tk.report_callback_exception = report_error
+
+# no tab! (sorry keyboard users...)
+def disable_all_widgets():
+	def set_takefocus_false(widget_class):
+		orig_init = widget_class.__init__
+		def new_init(self, *args, **kwargs):
+			orig_init(self, *args, **kwargs)
+			try: self.config(takefocus = False)
+			except: pass
+		widget_class.__init__ = new_init
+
+	set_takefocus_false(tk.Widget)
+	set_takefocus_false(ttk.Widget)
+
+def about_text():
+	import platform
+	nl = '\n' # workaround for prohibition of backslashes in f-string expression
+	return f'''\
+{name} - {version} ({'64' if sys.maxsize > 2**31-1 else '32'}-bit) - Running on {platform.system()} x{'64' if platform.machine().endswith('64') else '86'}
+Project page: https://github.com/{username}/{repo_name}
+{nl+'WARNING: This is a pre-release version, therefore it may have bugs and/or glitches.'+nl if prerelease else ''}
+Licensed under the {license} license
+
+Copyright (c) 2022-2026 GamingWithEvets Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy \
+of this software and associated documentation files (the "Software"), to deal \
+in the Software without restriction, including without limitation the rights \
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell \
+copies of the Software, and to permit persons to whom the Software is \
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all \
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR \
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, \
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE \
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER \
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, \
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE \
+SOFTWARE.\
+'''
+
+class Player:
+	"""Window of a compiled quiz: plays the quiz at savepath and nothing else."""
+	def __init__(self, savepath, embedded = True):
+		self.version = version
+
+		self.window = tk.Tk()
+
+		self.temp_path = temp_path
+
+		self.display_w = 500
+		self.display_h = 500
+
+		tk_font = tk.font.nametofont('TkDefaultFont')
+
+		self.bold_font = tk_font.copy()
+		self.bold_font.config(weight = 'bold')
+		self.italic_font = tk_font.copy()
+		self.italic_font.config(slant = 'italic')
+
+		self.message_force = None
+		self.datafile = None
+
+		self.savepath = savepath
+		self.player_mode = True
+		# savepath is a compiled quiz, see jsonhandler.validate_file()
+		self.embedded = embedded
+
+		# upper bound for decoded questions kept in memory
+		self.question_cache_mb = 64
+
+		self.screens = Screens(self.window)
+		self.quiz_player = QuizPlayer(self)
+
+		self.init_window()
+
+	# errors of a running quiz are only printed, there is no message bar to show them in
+	def set_message_force(self, msg): self.message_force = msg
+
+	def start_main(self):
+		message = None
+		try:
+			# the quiz was validated when it was compiled, only check that it arrived intact, once the player runs
+			self.datafile, report = jsonhandler.validate_file(self.savepath, None, self.question_cache_mb << 20, self.embedded, True)
+			if report: message = report.summary()
+		except OSError as exc: message = fmt_oserror(exc)
+		except qpg.QPGError as exc: message = f'Invalid QPG data! ({exc})'
+		except ValueError: message = 'Invalid quiz data!'
+		if message:
+			tk.messagebox.showerror('Cannot open quiz', message)
+			sys.exit()
+
+		self.window.after(0, self.quiz_player.main)
+		if not self.datafile['questions'].qfile.verified: self.window.after(0, self.check_payload)
+		self.window.mainloop()
+
+	def check_payload(self):
+		"""Checks the SHA-256 of the quiz in the background, hashing large quizzes would delay the welcome screen."""
+		qfile = self.datafile['questions'].qfile
+		result = []
+		thread = threading.Thread(target = lambda: result.append(qfile.check_payload()), daemon = True)
+		thread.start()
+		def poll():
+			if thread.is_alive(): self.window.after(100, poll)
+			elif result != [True]:
+				tk.messagebox.showerror('Cannot open quiz', 'Invalid QPG data! (The quiz in this file is corrupt)')
+				sys.exit()
+		poll()
+
+	def init_window(self):
+		self.window.geometry(f'{self.display_w}x{self.display_h}')
+		self.window.resizable(False, False)
+		self.rebind()
+		self.window.option_add('*tearOff', False)
+		self.window.protocol('WM_DELETE_WINDOW', self.quit)
+
+		disable_all_widgets()
+
+		self.window.title(name)
+		icon = 'ico' if os.name == 'nt' else 'xbm'
+		# X11 takes bitmap files as @path
+		icon_path = os.path.join(self.temp_path, f'icon.{icon}')
+		try: self.window.iconbitmap(icon_path if os.name == 'nt' else '@' + icon_path)
+		except tk.TclError:
+			import traceback
+			err_text = f'Whoops! The icon file "icon.{icon}" is required.\nCan you make sure the file is in "{self.temp_path}"?\n\n{traceback.format_exc()}\nIf this problem persists, please report it here:\nhttps://github.com/{username}/{repo_name}/issues'
+			print(err_text)
+			tk.messagebox.showerror('Hmmm?', err_text)
+			sys.exit()
+
+	def rebind(self):
+		for e in self.window.bind(): self.window.unbind(e)
+		self.window.bind('<1>', self.main_focus)
+
+	def main_focus(self, event):
+		if event.widget == self.window: self.window.focus()
+
+	def refresh(self, screen = None):
+		self.screens.clear(screen)
+
+		self.rebind()
+		self.screens.menubar('player', self.build_menubar)
+
+	def show_screen(self, name, build):
+		"""Like refresh(), but shows the kept screen name, which build(frame) makes the first time (see Screens)."""
+		self.refresh(name)
+		return self.screens.show(name, build)
+
+	def build_menubar(self):
+		menubar = tk.Menu(self.window)
+
+		file_menu = tk.Menu(menubar)
+		file_menu.add_command(label = 'Exit', command = self.quit)
+		menubar.add_cascade(label = 'File', menu = file_menu)
+
+		help_menu = tk.Menu(menubar)
+		help_menu.add_command(label = f'Powered by {name}', command = self.about_menu)
+		menubar.add_cascade(label = 'Help', menu = help_menu)
+
+		return menubar
+
+	def about_menu(self): tk.messagebox.showinfo(f'About {name}', about_text())
+
+	def quit(self): sys.exit()
+
+class Screens:
+	"""
+	The screens of a window that are built once and kept. A kept screen is a frame filling the window: show()
+	builds it the first time and after that only packs it, and its owner updates its widgets with config().
+	Screens that are built every time are packed straight into the window, and clear() destroys them.
+	Menubars are kept the same way, one for each mode of the window.
+	"""
+	def __init__(self, window):
+		self.window = window
+		self.frames = {}
+		self.menubars = {}
+		self.current = None
+
+	def clear(self, keep = None):
+		"""
+		Makes room for the next screen: destroys everything in the window that is not kept, and hides the current
+		screen unless it is keep, the kept screen shown next.
+		"""
+		current = self.frames.get(self.current)
+		if current is not None and self.current != keep:
+			# keys must not go to a widget of a hidden screen
+			if str(self.window.tk.call('focus')).startswith(f'{current}.'): self.window.focus_set()
+			current.pack_forget()
+			self.current = None
+		kept = (*self.frames.values(), *self.menubars.values())
+		for w in self.window.winfo_children():
+			if w not in kept: w.destroy()
+
+	def get(self, name, build):
+		"""Returns the frame of the kept screen name without showing it, building it with build(frame) the first time."""
+		frame = self.frames.get(name)
+		if frame is None:
+			frame = self.frames[name] = tk.Frame(self.window)
+			build(frame)
+		return frame
+
+	def show(self, name, build):
+		"""Shows the kept screen name after clear(name), building it with build(frame) the first time. Returns its frame."""
+		frame = self.get(name, build)
+		if self.current != name:
+			frame.pack(fill = 'both', expand = True)
+			self.current = name
+		return frame
+
+	def showing(self, name): return self.current == name
+
+	def drop(self, *names):
+		"""Destroys the kept screens names, so they are built again the next time they are shown."""
+		for name in names:
+			frame = self.frames.pop(name, None)
+			if frame is None: continue
+			if self.current == name: self.current = None
+			frame.destroy()
+
+	def menubar(self, mode, build):
+		"""Shows the menubar of mode, building it with build() the first time."""
+		menubar = self.menubars.get(mode)
+		if menubar is None: menubar = self.menubars[mode] = build()
+		self.window.config(menu = menubar)
+
+class QuizPlayer:
+	def __init__(self, gui):
+		self.gui = gui
+		self.question_player = QuestionPlayer(self)
+
+	def main(self):
+		if not self.gui.player_mode and self.gui.prompt_save_changes(): return
+		self.datafile = self.gui.datafile
+		self.question_player.reset()
+		self.menu()
+
+	def menu(self):
+		self.gui.refresh()
+		self.gui.window.title(self.gui.datafile['title'])
+
+		ttk.Label(text = 'Welcome to').pack()
+		ttk.Label(text = self.datafile['title'], font = self.gui.bold_font).pack()
+		if quizengine.setting(self.datafile, 'description', str): ttk.Label(text = self.datafile['description'], justify = 'center').pack()
+		
+		ttk.Label(text = f'\nPowered by {name} {version}', font = self.gui.italic_font).pack(side = 'bottom')
+		ttk.Button(text = 'Quit', command = self.end).pack(side = 'bottom')
+		ttk.Button(text = 'Start quiz', command = self.question_player.main).pack(side = 'bottom')
+
+	def end(self):
+		if self.gui.player_mode: sys.exit()
+		else: self.gui.refresh(True)
+
+class QuestionPlayer:
+	def __init__(self, quiz_player):
+		self.quiz_player = quiz_player
+		self.gui = quiz_player.gui
+		self.engine = None
+		self.question_screens = [None, None]
+		self.shown = 0
+
+	def main(self):
+		# the rules are all in the engine, this class only draws its states; the engine is kept for the next games
+		# of the quiz, with the questions it has compiled and the settings read once here
+		if self.engine is None:
+			self.datafile = self.gui.datafile
+			self.engine = quizengine.QuizEngine(self.datafile)
+			self.count = f' / {len(self.engine.questions)}' if quizengine.setting(self.datafile, 'showcount', bool) else ''
+		self.show(self.engine.start())
+
+	def reset(self):
+		"""Forgets the engine and the screens of the quiz played last, as it may have been edited since."""
+		self.engine = None
+		self.gui.screens.drop('question 0', 'question 1', 'correct')
+		self.question_screens = [None, None]
+
+	def show(self, state):
+		if state == quizengine.QUESTION: self.display_question()
+		elif state == quizengine.CORRECT: self.correct()
+		elif state == quizengine.FINISHED: self.finish()
+		else: self.fail()
+
+	def next_question(self): self.show(self.engine.next())
+
+	# the question and correct screens are kept for the whole game, answering only updates them
+	def build_head(self, frame):
+		count = ttk.Label(frame, font = self.gui.bold_font)
+		count.pack()
+		lives = ttk.Label(frame)
+		if self.engine.max_lives is not None: lives.pack()
+		return count, lives
+
+	def update_head(self, head):
+		count, lives = head
+		text = f'Question {self.engine.qnum + 1}{self.count}'
+		self.gui.window.title(f"{self.datafile['title']} - {text}")
+		count.config(text = text)
+		if self.engine.lives is not None: lives.config(text = f'{self.engine.lives} lives left')
+
+	# there are two question screens: while one shows the question, prerender() puts the next question in the
+	# other in idle time, so moving on to it only swaps them
+	def build_question(self, i, frame): self.question_screens[i] = QuestionScreen(self, frame)
+
+	def question_screen(self, i):
+		"""Returns question screen i (0 or 1), built the first time it is used."""
+		self.gui.screens.get(f'question {i}', lambda frame: self.build_question(i, frame))
+		return self.question_screens[i]
+
+	def display_question(self):
+		question = self.engine.question
+		# a new question is shown in the other screen, where prerender() has usually put it already
+		if self.question_screen(self.shown).question is not question:
+			self.shown ^= 1
+			if self.question_screen(self.shown).question is not question: self.question_screens[self.shown].fill(question)
+		shown = self.shown
+		self.gui.show_screen(f'question {shown}', lambda frame: self.build_question(shown, frame))
+
+		screen = self.question_screens[shown]
+		self.update_head(screen.head)
+		screen.wrongmsg_label.config(text = self.engine.wrongmsg)
+		self.gui.window.after_idle(self.prerender)
+
+	def prerender(self):
+		# the game may have ended, or the quiz been closed, since this was scheduled
+		if self.engine is None or self.engine.state not in (quizengine.QUESTION, quizengine.CORRECT): return
+		question = self.engine.peek()
+		if question is None: return
+		screen = self.question_screen(self.shown ^ 1)
+		if screen.question is not question: screen.fill(question)
+
+	def choose_choice(self, choice): self.show(self.engine.answer(choice))
+
+	def build_correct(self, frame):
+		self.correct_head = self.build_head(frame)
+
+		ttk.Button(frame, text = 'Next', command = self.next_question).pack(side = 'bottom')
+		ttk.Label(frame).pack(side = 'bottom')
+
+		ttk.Label(frame, text = '\nCorrect!', justify = 'center', font = self.gui.italic_font).pack()
+
+		self.explanation_box = TextBox(frame)
+		self.explanation_box.pack(fill = 'both', expand = True)
+
+	def correct(self):
+		self.gui.show_screen('correct', self.build_correct)
+		self.update_head(self.correct_head)
+		self.explanation_box.set_text(self.engine.question.explanation)
+		self.gui.window.after_idle(self.prerender)
+
+	def finish(self):
+		self.gui.refresh()
+		self.gui.window.title(self.gui.datafile['title'])
+
+		ttk.Button(text = 'Return to menu', command = self.quiz_player.menu).pack(side = 'bottom')
+		ttk.Label().pack(side = 'bottom')
+
+		ttk.Label(text = 'Quiz completed!', justify = 'center', font = self.gui.bold_font).pack()
+
+		if quizengine.setting(self.datafile, 'finish', str):
+			frame = VerticalScrolledFrame(self.gui.window)
+			frame.canvas.config(bg = 'white')
+			frame.interior.config(bg = 'white')
+			frame.pack(fill = 'both', expand = True)
+
+			question = ttk.Label(frame.interior, text = self.datafile['finish'], background = 'white', justify = 'center')
+			question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
+			question.pack()
+			ttk.Label(frame.interior, background = 'white').pack()
+
+	def fail(self):
+		self.gui.refresh()
+
+		ttk.Button(text = 'Return to menu', command = self.quiz_player.menu).pack(side = 'bottom')
+		ttk.Button(text = 'Try again!', command = self.main).pack(side = 'bottom')
+		ttk.Label().pack(side = 'bottom')
+
+		ttk.Label(text = 'Game Over', justify = 'center', font = self.gui.bold_font).pack()
+
+		if quizengine.setting(self.datafile, 'fail', str):
+			frame = VerticalScrolledFrame(self.gui.window)
+			frame.canvas.config(bg = 'white')
+			frame.interior.config(bg = 'white')
+			frame.pack(fill = 'both', expand = True)
+
+			question = ttk.Label(frame.interior, text = self.datafile['fail'], background = 'white', justify = 'center')
+			question.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
+			question.pack()
+			ttk.Label(frame.interior, background = 'white').pack()
+
+	def end(self):
+		if tk.messagebox.askyesno('Quit the quiz?', 'Are you sure you want to quit this quiz?', icon = 'warning'): self.quiz_player.menu()
+
+class QuestionScreen:
+	"""The widgets of a question screen of player, built in frame. fill() puts a question in them."""
+	def __init__(self, player, frame):
+		self.head = player.build_head(frame)
+
+		ttk.Button(frame, text = 'Quit', command = player.end).pack(side = 'bottom')
+		ttk.Label(frame).pack(side = 'bottom')
+
+		cd_frame = tk.Frame(frame)
+		c_button = TooltipButton(cd_frame, width = 41, command = lambda: player.choose_choice(2)); c_button.pack(side = 'left')
+		d_button = TooltipButton(cd_frame, width = 41, command = lambda: player.choose_choice(3)); d_button.pack(side = 'right')
+		cd_frame.pack(side = 'bottom', fill = 'x')
+		ttk.Label(frame, text = 'Hover over a button for full answer', font = player.gui.italic_font).pack(side = 'bottom')
+
+		ab_frame = tk.Frame(frame)
+		a_button = TooltipButton(ab_frame, width = 41, command = lambda: player.choose_choice(0)); a_button.pack(side = 'left')
+		b_button = TooltipButton(ab_frame, width = 41, command = lambda: player.choose_choice(1)); b_button.pack(side = 'right')
+		ab_frame.pack(side = 'bottom', fill = 'x')
+		self.choice_buttons = (a_button, b_button, c_button, d_button)
+		ttk.Label(frame).pack(side = 'bottom')
+		self.wrongmsg_label = ttk.Label(frame)
+		self.wrongmsg_label.pack(side = 'bottom')
+		ttk.Label(frame).pack(side = 'bottom')
+
+		self.question_box = TextBox(frame)
+		self.question_box.pack(fill = 'both', expand = True)
+
+		# the quizengine.Question shown
+		self.question = None
+
+	def fill(self, question):
+		for button, text in zip(self.choice_buttons, question.choices): button.set_text(text)
+		self.question_box.set_text(question.text)
+		self.question = question
+
+# https://stackoverflow.com/a/16198198 (modified)
+class VerticalScrolledFrame(tk.Frame):
+	def __init__(self, parent, *args, **kw):
+		tk.Frame.__init__(self, parent, *args, **kw)
+
+		vscrollbar = tk.Scrollbar(self, orient = 'vertical')
+		vscrollbar.pack(fill = 'y', side = 'right')
+		self.canvas = tk.Canvas(self, bd = 0, highlightthickness = 0, yscrollcommand = vscrollbar.set)
+		self.canvas.pack(side = 'left', fill = 'both', expand = True)
+		vscrollbar.config(command = self.canvas.yview)
+
+		self.canvas.xview_moveto(0)
+		self.canvas.yview_moveto(0)
+
+		self.interior = interior = tk.Frame(self.canvas)
+		interior_id = self.canvas.create_window(0, 0, window = interior, anchor = 'nw')
+
+		def _configure_interior(event):
+			size = (interior.winfo_reqwidth(), interior.winfo_reqheight())
+			self.canvas.config(scrollregion = '0 0 %s %s' % size)
+			if interior.winfo_reqwidth() != self.canvas.winfo_width():
+				self.canvas.config(width=interior.winfo_reqwidth())
+		interior.bind('<Configure>', _configure_interior)
+
+		def _configure_canvas(event):
+			if interior.winfo_reqwidth() != self.canvas.winfo_width():
+				self.canvas.itemconfigure(interior_id, width=self.canvas.winfo_width())
+		self.canvas.bind('<Configure>', _configure_canvas)
+
+class TextBox(VerticalScrolledFrame):
+	"""White scrolled box of wrapped text, whose text can be changed without building it again."""
+	def __init__(self, parent, *args, **kw):
+		VerticalScrolledFrame.__init__(self, parent, *args, **kw)
+		self.canvas.config(bg = 'white')
+		self.interior.config(bg = 'white')
+
+		self.label = ttk.Label(self.interior, background = 'white', justify = 'center')
+		self.label.bind('<Configure>', lambda e: e.widget.config(wraplength=e.widget.winfo_width()))
+		self.label.pack()
+		ttk.Label(self.interior, background = 'white').pack()
+
+	def set_text(self, text):
+		# wrap to the whole box, the last text may have been shorter; <Configure> does it once the box is drawn
+		width = self.interior.winfo_width()
+		self.label.config(text = text, wraplength = width if width > 1 else 0)
+		self.canvas.yview_moveto(0)
+
+# https://stackoverflow.com/a/36221216
+class Tooltip:
+	"""
+	create a tooltip for a given widget
+	"""
+	def __init__(self, widget, text='widget info'):
+		self.waittime = 500     #miliseconds
+		self.wraplength = 180   #pixels
+		self.widget = widget
+		self.text = text
+		self.widget.bind("<Enter>", self.enter)
+		self.widget.bind("<Leave>", self.leave)
+		self.widget.bind("<ButtonPress>", self.leave)
+		self.id = None
+		self.tw = None
+
+	def enter(self, event=None):
+		self.schedule()
+
+	def leave(self, event=None):
+		self.unschedule()
+		self.hidetip()
+
+	def schedule(self):
+		self.unschedule()
+		self.id = self.widget.after(self.waittime, self.showtip)
+
+	def unschedule(self):
+		id = self.id
+		self.id = None
+		if id:
+			self.widget.after_cancel(id)
+
+	def showtip(self, event=None):
+		x = y = 0
+		x, y, cx, cy = self.widget.bbox("insert")
+		x += self.widget.winfo_rootx() + 25
+		y += self.widget.winfo_rooty() + 20
+		# creates a toplevel window
+		self.tw = tk.Toplevel(self.widget)
+		# Leaves only the label and removes the app window
+		self.tw.wm_overrideredirect(True)
+		self.tw.wm_geometry("+%d+%d" % (x, y))
+		label = tk.Label(self.tw, text=self.text, justify='left',
+					   background="#ffffff", relief='solid', borderwidth=1,
+					   wraplength = self.wraplength)
+		label.pack(ipadx=1)
+
+	def hidetip(self):
+		tw = self.tw
+		self.tw= None
+		if tw:
+			tw.destroy()
+
+class TooltipButton(ttk.Button):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.tooltip = Tooltip(self, self['text'])
+
+	def set_text(self, text):
+		self.config(text = text)
+		self.tooltip.text = text
@@ -0,0 +1,356 @@
+"""
+QuizProg-GUI quiz container (.qpg).
+
+Layout (all integers little-endian):
+	header   magic b'QPG\\0', format version (u16), reserved (u16)
+	meta     the quiz without its questions as compact JSON; 'questions' is kept as null to preserve key order
+	records  one compact JSON object per question
+	index    padding to 8 bytes, then count + 1 record offsets (u64); record i spans index[i]:index[i + 1]
+	footer   meta offset, index offset, question count (u64 each), flags (u32), CRC-32 (u32) of everything before
+	         it, magic b'QPGE'
+
+Offsets are relative to the start of the container, so it can be embedded inside another file. Compiled quizzes
+append it to the player runtime, followed by a payload footer: the container size (u64), its SHA-256 and
+the magic b'QPGPAYLD'. Exported Python apps store the container and its payload footer as an uncompressed
+member of the ZIP archive.
+Version 1 footers have no CRC-32. Older .qpg files are plain JSON; is_qpg() tells the two apart.
+"""
+import os
+import sys
+import json
+import mmap
+import hashlib
+import zlib
+import struct
+import weakref
+import tempfile
+import collections.abc
+from array import array
+
+MAGIC = b'QPG\0'
+END_MAGIC = b'QPGE'
+VERSION = 2
+
+HEADER = struct.Struct('<4sHH')
+FOOTER = struct.Struct('<QQQII4s')
+FOOTER_V1 = struct.Struct('<QQQI4s')
+# the end of a version 2 footer: the CRC-32 and the magic
+FOOTER_END = struct.Struct('<I4s')
+PAYLOAD = struct.Struct('<Q32s8s')
+PAYLOAD_MAGIC = b'QPGPAYLD'
+
+# every question passed QuizValidator when the container was written; only trusted if the container is
+# still intact, see QPGFile.check_crc()
+FLAG_VALIDATED = 1
+
+class QPGError(Exception): pass
+
+def encode(obj): return json.dumps(obj, ensure_ascii = False, separators = (',', ':')).encode('utf-8')
+
+def is_qpg(f):
+	pos = f.tell()
+	try: return f.read(len(MAGIC)) == MAGIC
+	finally: f.seek(pos)
+
+def iter_encode(datafile, validator = None):
+	"""
+	Encodes the quiz as a QPG container piece by piece. If validator (a QuizValidator) is given, every question
+	is checked on the way and FLAG_VALIDATED is set when the validator reports no errors. Questions still
+	unchanged in a validated source container are not checked or re-encoded again.
+	"""
+	questions = datafile.get('questions', ())
+	offsets = array('Q')
+	# records still unchanged in a validated container are copied as they are
+	trusted = isinstance(questions, QuestionStore) and questions.qfile.flags & FLAG_VALIDATED
+	records = questions.iter_records() if trusted else ((None, question) for question in questions)
+
+	header = HEADER.pack(MAGIC, VERSION, 0)
+	crc = zlib.crc32(header)
+	yield header
+	pos = HEADER.size
+
+	meta = encode({key: None if key == 'questions' else value for key, value in datafile.items()})
+	meta_offset = pos
+	crc = zlib.crc32(meta, crc)
+	yield meta
+	pos += len(meta)
+
+	for i, (record, question) in enumerate(records):
+		if record is None:
+			if validator: validator.question(i, question)
+			record = encode(question)
+		offsets.append(pos)
+		crc = zlib.crc32(record, crc)
+		yield record
+		pos += len(record)
+	offsets.append(pos)
+
+	padding = b'\0' * (-pos % 8)
+	index_offset = pos + len(padding)
+	if sys.byteorder != 'little': offsets.byteswap()
+	index = padding + offsets.tobytes()
+	crc = zlib.crc32(index, crc)
+	yield index
+
+	flags = FLAG_VALIDATED if validator and not validator.quiz(datafile, False) else 0
+	footer = FOOTER.pack(meta_offset, index_offset, len(questions), flags, 0, END_MAGIC)[:-FOOTER_END.size]
+	yield footer + FOOTER_END.pack(zlib.crc32(footer, crc), END_MAGIC)
+
+def iter_payload(chunks):
+	"""Passes on the chunks of a container and adds the payload footer, for appending it to another file."""
+	size = 0
+	digest = hashlib.sha256()
+	for chunk in chunks:
+		size += len(chunk)
+		digest.update(chunk)
+		yield chunk
+	yield PAYLOAD.pack(size, digest.digest(), PAYLOAD_MAGIC)
+
+class QPGFile:
+	"""
+	Random access reader for a QPG container held in buf (bytes, an mmap, or anything else that can be sliced)
+	at offset base. Opening reads only the header and footer; question(i) reads one index entry and one record.
+	"""
+	def __init__(self, buf, base = 0, size = None):
+		self.buf = buf
+		self.base = base
+		if size is None: size = len(buf) - base
+		self.size = size
+		self.path = None
+		# SHA-256 of the container from its payload footer, see open_payload()
+		self.digest = None
+		self.verified = False
+
+		if size < HEADER.size + FOOTER_V1.size: raise QPGError('File too small to be a QPG container')
+		magic, self.version, reserved = HEADER.unpack(self.read(0, HEADER.size))
+		if magic != MAGIC: raise QPGError('Not a QPG container')
+		if self.version > VERSION: raise QPGError(f'QPG format version {self.version} is not supported')
+		if self.version < 2:
+			footer = FOOTER_V1
+			self.meta_offset, self.index_offset, self.count, self.flags, magic = footer.unpack(self.read(size - footer.size, footer.size))
+			self.crc = None
+		else:
+			footer = FOOTER
+			if size < HEADER.size + footer.size: raise QPGError('File too small to be a QPG container')
+			self.meta_offset, self.index_offset, self.count, self.flags, self.crc, magic = footer.unpack(self.read(size - footer.size, footer.size))
+		if magic != END_MAGIC or self.index_offset + (self.count + 1) * 8 > size - footer.size: raise QPGError('Truncated or corrupt QPG container')
+
+	@classmethod
+	def open(cls, path, base = 0, size = None):
+		"""Maps the file at path into memory, so questions are only read from disk when they are accessed."""
+		with open(path, 'rb') as f:
+			try: buf = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+			except ValueError: raise QPGError('File too small to be a QPG container') from None
+		qfile = cls(buf, base, size)
+		qfile.path = os.path.normcase(os.path.abspath(path))
+		mapped_files.add(qfile)
+		return qfile
+
+	@classmethod
+	def open_payload(cls, path, member = None, trust_validated = False):
+		"""
+		Opens the container appended to the file at path, like a compiled quiz, after checking its SHA-256. If member
+		is given, the container and its payload footer are the uncompressed member of the ZIP archive at path instead.
+		If trust_validated is set, the SHA-256 of a container saved as validated is not checked, so opening it reads
+		none of its questions; check_payload() can check it later.
+		"""
+		with open(path, 'rb') as f:
+			end = (f.seek(0, os.SEEK_END) if member is None else member_end(f, member)) - PAYLOAD.size
+			if end < 0: raise QPGError('No quiz found in this file')
+			f.seek(end)
+			size, digest, magic = PAYLOAD.unpack(f.read(PAYLOAD.size))
+			if magic != PAYLOAD_MAGIC or size > end: raise QPGError('No quiz found in this file')
+			buf = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+		qfile = cls(buf, end - size, size)
+		qfile.digest = digest
+		if not (trust_validated and qfile.flags & FLAG_VALIDATED) and not qfile.check_payload():
+			buf.close()
+			raise QPGError('The quiz in this file is corrupt')
+		qfile.path = os.path.normcase(os.path.abspath(path))
+		mapped_files.add(qfile)
+		return qfile
+
+	def check_payload(self):
+		"""Returns whether the container matches the SHA-256 of its payload footer. Safe to call from another thread."""
+		with memoryview(self.buf) as view: self.verified = hashlib.sha256(view[self.base:self.base + self.size]).digest() == self.digest
+		return self.verified
+
+	def check_crc(self):
+		"""
+		Returns whether the container matches the CRC-32 of its footer, always False for version 1 containers.
+		Reads the whole container, but much faster than decoding its questions.
+		"""
+		if self.crc is None: return False
+		with memoryview(self.buf) as view: return zlib.crc32(view[self.base:self.base + self.size - FOOTER_END.size]) == self.crc
+
+	def relocate(self):
+		"""
+		Moves the mapping to a private copy of the file, so the original can be replaced. Windows does not allow
+		replacing a file that is mapped, and snapshots of the quiz may still need the old questions.
+		"""
+		fd, tmp = tempfile.mkstemp(prefix = 'quizprog-', suffix = '.qpg')
+		with os.fdopen(fd, 'wb') as f: f.write(self.buf)
+		with open(tmp, 'rb') as f: buf = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+		# the old mapping is not closed but dropped, so it is unmapped when the last reader lets go of it: a journal
+		# checkpoint or a compile may still be encoding a snapshot from it in another thread
+		self.buf = buf
+		self.path = os.path.normcase(tmp)
+		weakref.finalize(self, release_copy, buf, tmp)
+
+	def read(self, offset, length):
+		start = self.base + offset
+		data = self.buf[start:start + length]
+		if len(data) != length: raise QPGError('Truncated QPG container')
+		return data
+
+	def __len__(self): return self.count
+
+	def record(self, i):
+		"""Returns the encoded record of question i."""
+		if not 0 <= i < self.count: raise IndexError('question index out of range')
+		start, end = struct.unpack('<QQ', self.read(self.index_offset + i * 8, 16))
+		return self.read(start, end - start)
+
+	def question(self, i): return json.loads(self.record(i))
+
+	def offsets(self):
+		offsets = array('Q', self.read(self.index_offset, (self.count + 1) * 8))
+		if sys.byteorder != 'little': offsets.byteswap()
+		return offsets
+
+	def meta(self):
+		# the meta record ends where the first question record (or the index, for no questions) begins
+		end, = struct.unpack('<Q', self.read(self.index_offset, 8))
+		return json.loads(self.read(self.meta_offset, end - self.meta_offset))
+
+	def iter_questions(self, question_hook = None, progress = None):
+		offsets = self.offsets()
+		for i in range(self.count):
+			question = json.loads(self.read(offsets[i], offsets[i + 1] - offsets[i]))
+			if question_hook: question_hook(i, question)
+			if progress and not i % 4096: progress(i, self.count)
+			yield question
+
+	def load(self, question_hook = None, progress = None):
+		"""Decodes the whole quiz, calling question_hook(i, question) for every question."""
+		datafile = self.meta()
+		questions = list(self.iter_questions(question_hook, progress))
+		if 'questions' in datafile: datafile['questions'] = questions
+		return datafile
+
+	def open_lazy(self, cache_bytes = 64 << 20):
+		"""Returns the quiz with its questions as a QuestionStore over this container."""
+		datafile = self.meta()
+		if 'questions' in datafile: datafile['questions'] = QuestionStore(self, cache_bytes)
+		return datafile
+
+def member_end(f, name):
+	"""Returns the offset in the ZIP archive f where the data of its uncompressed member name ends."""
+	import zipfile
+	try:
+		with zipfile.ZipFile(f) as z: info = z.getinfo(name)
+	except (zipfile.BadZipFile, KeyError): raise QPGError('No quiz found in this file') from None
+	if info.compress_type != zipfile.ZIP_STORED: raise QPGError('The quiz in this file is compressed')
+	# the data follows the local header, whose name and extra field can differ from the central directory
+	f.seek(info.header_offset)
+	header = f.read(30)
+	if len(header) != 30: raise QPGError('Truncated ZIP archive')
+	name_length, extra_length = struct.unpack('<HH', header[26:])
+	return info.header_offset + 30 + name_length + extra_length + info.file_size
+
+mapped_files = weakref.WeakSet()
+
+def release_copy(buf, path):
+	buf.close()
+	try: os.remove(path)
+	except OSError: pass
+
+def release(path):
+	"""Lets path be replaced while questions are mapped from it. Only needed on Windows."""
+	if os.name != 'nt': return
+	path = os.path.normcase(os.path.abspath(path))
+	for qfile in list(mapped_files):
+		if qfile.path == path: qfile.relocate()
+
+class QuestionStore(collections.abc.MutableSequence):
+	"""
+	List of questions backed by a QPG container, for quizzes larger than memory.
+	Questions are decoded from the container when accessed, and only an LRU working set of about cache_bytes
+	of decoded questions is kept. Questions that are set or inserted are kept in memory in an append-only
+	overlay; slots[i] is the container record of question i, or ~n for overlay entry n. slots stays a range until
+	the first edit, so opening a container does not build a table of all its questions.
+	Like plain question lists, the returned dicts must not be changed in place.
+	"""
+	# decoded dicts take a few times the size of their compact JSON
+	entry_overhead = 4
+
+	def __init__(self, qfile, cache_bytes = 64 << 20, slots = None, overlay = None):
+		self.qfile = qfile
+		self.slots = range(len(qfile)) if slots is None else slots
+		self.overlay = [] if overlay is None else overlay
+		self.cache_bytes = cache_bytes
+
+		self.cache = collections.OrderedDict()
+		self.cache_used = 0
+		self.readonly = False
+
+	def __len__(self): return len(self.slots)
+
+	def decode(self, record):
+		entry = self.cache.get(record)
+		if entry is None:
+			data = self.qfile.record(record)
+			entry = self.cache[record] = (json.loads(data), len(data) * self.entry_overhead)
+			self.cache_used += entry[1]
+			while self.cache_used > self.cache_bytes and len(self.cache) > 1: self.cache_used -= self.cache.popitem(False)[1][1]
+		else: self.cache.move_to_end(record)
+		return entry[0]
+
+	def get(self, slot): return self.overlay[~slot] if slot < 0 else self.decode(slot)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice): return [self.get(slot) for slot in self.slots[i]]
+		return self.get(self.slots[i])
+
+	def __iter__(self):
+		# bypass the cache, a full pass would only evict the working set
+		for slot in self.slots:
+			if slot < 0: yield self.overlay[~slot]
+			else:
+				entry = self.cache.get(slot)
+				yield entry[0] if entry else self.qfile.question(slot)
+
+	def writable_slots(self):
+		if self.readonly: raise TypeError('question snapshots are read-only')
+		if type(self.slots) is range: self.slots = array('q', self.slots)
+		return self.slots
+
+	def copy_slots(self): return self.slots if type(self.slots) is range else array('q', self.slots)
+
+	def __setitem__(self, i, question):
+		slots = self.writable_slots()
+		if isinstance(i, slice): raise TypeError('slice assignment is not supported')
+		self.overlay.append(question)
+		slots[i] = ~(len(self.overlay) - 1)
+
+	def __delitem__(self, i): del self.writable_slots()[i]
+
+	def insert(self, i, question):
+		slots = self.writable_slots()
+		self.overlay.append(question)
+		slots.insert(i, ~(len(self.overlay) - 1))
+
+	def copy(self):
+		"""Returns a writable copy. Only the slot array is copied; the container and the overlay are shared."""
+		return QuestionStore(self.qfile, self.cache_bytes, self.copy_slots(), self.overlay)
+
+	def snapshot(self):
+		store = QuestionStore(self.qfile, self.cache_bytes >> 4, self.copy_slots(), self.overlay)
+		store.readonly = True
+		return store
+
+	def iter_records(self):
+		"""Yields (record, question) pairs; questions still unchanged in the container are passed as (encoded record, None)."""
+		for slot in self.slots:
+			if slot < 0: yield None, self.overlay[~slot]
+			else: yield self.qfile.record(slot), None
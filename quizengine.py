@@ -0,0 +1,137 @@
+"""
+The rules of playing a quiz, without any GUI.
+
+QuizEngine is a game of a quiz as a small state machine; player.QuestionPlayer draws its states, and
+htmlexport's player follows the same rules in JavaScript. Nothing here imports Tk, so games can also be
+simulated in bulk.
+"""
+import random
+
+# states of a game
+QUESTION = 'question'  # waiting for an answer to question
+CORRECT = 'correct'    # question was answered correctly and has an explanation to show, next() moves on
+FINISHED = 'finished'  # every question was answered
+FAILED = 'failed'      # no lives left
+
+# answers are given by their index in CHOICES, and the correct ones of a question are a bit mask of those indexes
+CHOICES = ('a', 'b', 'c', 'd')
+CORRECT_BITS = {'a': 1, 'b': 2, 'c': 4, 'd': 8, 'all': 15}
+NO_WRONGMSGS = (None,) * len(CHOICES)
+
+def setting(datafile, key, valtype):
+	"""Returns the setting key of datafile if the player uses it (like JSONHandler.check_element()), else None."""
+	value = datafile.get(key)
+	# snapshots of the quiz (jsonhandler.snapshot()) hold its lists as tuples
+	if (type(value) is valtype or valtype is list and type(value) is tuple) and (valtype is bool or value): return value
+	return None
+
+class Question:
+	"""
+	A question of the quiz compiled for playing, so answering it is a bit test and a tuple index. Choices are
+	indexes into CHOICES, correct has the bits of the correct ones (none if the quiz has an unknown answer) and
+	wrongmsgs the message of each wrong choice, None where the quiz's wrong answer messages are used.
+	"""
+	__slots__ = ('text', 'choices', 'correct', 'wrongmsgs', 'explanation')
+
+	def __init__(self, question):
+		self.text = question['question']
+		self.choices = (question['a'], question['b'], question['c'], question['d'])
+		self.correct = CORRECT_BITS.get(question['correct'], 0)
+		wrongmsg = question.get('wrongmsg')
+		if type(wrongmsg) is dict:
+			get = wrongmsg.get
+			self.wrongmsgs = (get('a'), get('b'), get('c'), get('d'))
+		else: self.wrongmsgs = NO_WRONGMSGS
+		explanation = question.get('explanation')
+		self.explanation = explanation if type(explanation) is str and explanation else None
+
+class QuizEngine:
+	"""
+	A game of the quiz datafile. The settings are read once, when the engine is made; start() begins a game and
+	answer() and next() play it, each returning the new state. rng is the random number generator used for the
+	question order and the wrong answer messages, anything with a random() like random.Random.
+
+	Questions are compiled into Question objects the first time they are asked and kept for the next games, so
+	a game never goes through the whole quiz. The quiz must not change while the engine is used.
+	"""
+	def __init__(self, datafile, rng = random):
+		self.datafile = datafile
+		self.questions = datafile['questions']
+		self.random = rng.random
+		self.max_lives = setting(datafile, 'lives', int)
+		self.randomize = bool(setting(datafile, 'randomize', bool))
+		self.wrongmsgs = setting(datafile, 'wrongmsg', list)
+		self.compiled = {}
+		# the question after this one, once peek() has drawn it
+		self.upcoming = None
+
+		self.state = None
+		self.qnum = -1
+		self.lives = None
+		self.question = None
+		self.wrongmsg = ''
+
+	def start(self):
+		self.lives = self.max_lives
+		self.qnum = -1
+		self.count = len(self.questions)
+		# the order is shuffled as the game goes, so starting does not depend on the size of the quiz:
+		# a Fisher-Yates shuffle where swapped holds the questions moved out of their place so far
+		self.swapped = {}
+		self.upcoming = None
+		return self.next()
+
+	def next(self):
+		"""Moves on to the next question, or finishes the game after the last one."""
+		index = self.qnum = self.qnum + 1
+		self.wrongmsg = ''
+		if index >= self.count:
+			self.question = None
+			self.state = FINISHED
+			return FINISHED
+
+		question = self.upcoming
+		if question is None: question = self.draw(index)
+		self.upcoming = None
+		self.question = question
+		self.state = QUESTION
+		return QUESTION
+
+	def peek(self):
+		"""Returns the question next() moves on to, or None after the last one. The question is drawn now if the order is random."""
+		index = self.qnum + 1
+		if index >= self.count: return None
+		if self.upcoming is None: self.upcoming = self.draw(index)
+		return self.upcoming
+
+	def draw(self, index):
+		"""Returns the question asked as question index of the game."""
+		if self.randomize:
+			swapped = self.swapped
+			pick = index + int(self.random() * (self.count - index))
+			index, swapped[pick] = swapped.get(pick, pick), swapped.get(index, index)
+		question = self.compiled.get(index)
+		if question is None: question = self.compiled[index] = Question(self.questions[index])
+		return question
+
+	def answer(self, choice):
+		"""Answers the question with choice, the index of the answer in CHOICES."""
+		if self.state is not QUESTION: raise ValueError(f'cannot answer a question in state {self.state}')
+		question = self.question
+		if question.correct >> choice & 1:
+			if question.explanation is not None:
+				self.state = CORRECT
+				return CORRECT
+			return self.next()
+
+		wrongmsg = question.wrongmsgs[choice]
+		wrongmsgs = self.wrongmsgs
+		if wrongmsg is not None: self.wrongmsg = wrongmsg
+		elif wrongmsgs: self.wrongmsg = wrongmsgs[int(self.random() * len(wrongmsgs))]
+		else: self.wrongmsg = f'Choice {CHOICES[choice].upper()} is incorrect!{" You lost a life!" if self.lives is not None else ""}'
+		if self.lives is not None:
+			self.lives -= 1
+			if not self.lives:
+				self.state = FAILED
+				return FAILED
+		return QUESTION
@@ -0,0 +1,115 @@
+"""
+Full-text search over quiz questions.
+"""
+import re
+import bisect
+from array import array
+
+FIELDS = ('question', 'a', 'b', 'c', 'd', 'explanation')
+word_re = re.compile(r'\w+')
+
+def words(text): return word_re.findall(text.casefold())
+
+def question_words(question):
+	found = set()
+	for field in FIELDS:
+		value = question.get(field)
+		if type(value) is str: found.update(words(value))
+	wrongmsg = question.get('wrongmsg')
+	if type(wrongmsg) is dict:
+		for value in wrongmsg.values():
+			if type(value) is str: found.update(words(value))
+	return found
+
+class SearchIndex:
+	"""
+	Inverted index from words to questions, updated incrementally as questions are set, inserted and deleted.
+	Every question gets a stable id when indexed; ids[i] is the id of question i, so edits do not renumber
+	the index. The id -> position map is only rebuilt on the next search after an insert or delete.
+	"""
+	def __init__(self):
+		self.postings = {}
+		self.vocabulary = []
+		self.doc_words = {}
+		self.ids = array('q')
+		self.next_id = 0
+		self.positions = None
+
+	def build(self, questions, chunk = 2000):
+		"""Indexes questions from scratch, yielding the number of questions done after every chunk."""
+		self.__init__()
+		vocabulary = set()
+		for i, question in enumerate(questions):
+			self.ids.append(self.add(question, vocabulary))
+			if not (i + 1) % chunk: yield i + 1
+		self.vocabulary = sorted(vocabulary)
+		yield len(self.ids)
+
+	def add(self, question, vocabulary = None, qid = None):
+		if qid is None:
+			qid = self.next_id
+			self.next_id += 1
+		found = question_words(question)
+		self.doc_words[qid] = tuple(found)
+		for word in found:
+			posting = self.postings.get(word)
+			if posting is None:
+				posting = self.postings[word] = set()
+				if vocabulary is None: bisect.insort(self.vocabulary, word)
+				else: vocabulary.add(word)
+			posting.add(qid)
+		return qid
+
+	def remove(self, qid):
+		for word in self.doc_words.pop(qid):
+			posting = self.postings[word]
+			posting.discard(qid)
+			if not posting:
+				del self.postings[word]
+				del self.vocabulary[bisect.bisect_left(self.vocabulary, word)]
+
+	def set(self, i, question):
+		qid = self.ids[i]
+		self.remove(qid)
+		self.add(question, qid = qid)
+
+	def insert(self, i, question):
+		self.ids.insert(i, self.add(question))
+		self.positions = None
+
+	def delete(self, i):
+		self.remove(self.ids[i])
+		del self.ids[i]
+		self.positions = None
+
+	def prefix_ids(self, prefix, candidates = None):
+		if candidates is not None and len(candidates) < 1000:
+			return {qid for qid in candidates if any(word.startswith(prefix) for word in self.doc_words[qid])}
+		found = set()
+		for k in range(bisect.bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+			word = self.vocabulary[k]
+			if not word.startswith(prefix): break
+			found |= self.postings[word]
+		return found if candidates is None else found & candidates
+
+	def search(self, query):
+		"""
+		Returns the sorted positions of the questions containing every word of query, or None for an empty query.
+		The last word also matches as a prefix unless query ends with a space, for search as you type.
+		"""
+		terms = words(query)
+		if not terms: return None
+		prefix = None if query[-1:].isspace() else terms.pop()
+
+		result = None
+		for term in sorted(terms, key = lambda term: len(self.postings.get(term, ()))):
+			posting = self.postings.get(term, set())
+			# words found in every question do not narrow anything down
+			if len(posting) == len(self.ids): continue
+			result = set(posting) if result is None else result & posting
+			if not result: return []
+		if prefix is not None: result = self.prefix_ids(prefix, result)
+		elif result is None: return list(range(len(self.ids)))
+
+		if self.positions is None: self.positions = {qid: i for i, qid in enumerate(self.ids)}
+		return sorted(self.positions[qid] for qid in result)
@@ -0,0 +1,119 @@
+"""
+Monte Carlo playthroughs of a quiz, for tuning its lives and difficulty. Needs NumPy.
+
+Players are modelled by their chance of answering each question right on any try. By the rules of QuizEngine a
+wrong answer costs a life and the question is asked again, so a session fails on the question where its wrong
+answers add up to its lives. Instead of playing every question, each step takes all the sessions still playing
+straight to the next question they get wrong, so a simulation costs about sessions * lives samples whatever the
+size of the quiz.
+"""
+import os
+import collections
+
+import numpy as np
+
+import qpg
+import jsonhandler
+import quizengine
+
+# the outcome of simulate(): failed[i] sessions failed on the (i + 1)th question asked, reached is the number of
+# questions reached by all sessions together
+Simulation = collections.namedtuple('Simulation', ('sessions', 'lives', 'passed', 'reached', 'failed'))
+
+def simulate(success, lives, sessions, randomize = False, seed = None):
+	"""
+	Plays sessions playthroughs of a quiz whose question i is answered right with probability success[i] on every try,
+	with lives lives (None for unlimited). If randomize is set, every question asked is drawn from the whole quiz;
+	this is the quiz's random order exactly if all questions are equally hard, and close to it otherwise.
+	"""
+	success = np.asarray(success, dtype = np.float64)
+	if not ((success > 0) & (success <= 1)).all(): raise ValueError('success probabilities must be above 0 and at most 1')
+	if lives is not None and lives < 1: raise ValueError('lives must be at least 1')
+	if sessions < 1: raise ValueError('sessions must be at least 1')
+	count = len(success)
+	failed = np.zeros(count, dtype = np.int64)
+	if lives is None or not count: return Simulation(sessions, lives, sessions, sessions * count, failed)
+
+	rng = np.random.default_rng(seed)
+	if randomize:
+		# first tries go wrong at the same rate everywhere, on questions in proportion to how often they are missed
+		miss = 1 - success
+		rate = miss.mean()
+		pick = np.cumsum(miss) / miss.sum() if rate else None
+	else:
+		# the chance of getting questions j to k - 1 all right the first time is exp(hazard[j] - hazard[k])
+		hazard = np.concatenate(([0], np.cumsum(-np.log(success))))
+
+	# the question each session still playing is on, and its wrong answers so far
+	position = np.zeros(sessions, dtype = np.int64)
+	wrong = np.zeros(sessions, dtype = np.int64)
+	passed = 0
+	while len(position):
+		# move on to the next question answered wrong the first time, if any
+		if randomize:
+			if not rate: break
+			position += rng.geometric(rate, len(position)) - 1
+			question = np.minimum(np.searchsorted(pick, rng.random(len(position)), side = 'right'), count - 1)
+		else:
+			position = np.searchsorted(hazard, hazard[position] + rng.standard_exponential(len(position))) - 1
+			question = position
+		playing = position < count
+		passed += len(position) - int(playing.sum())
+		position, wrong, question = position[playing], wrong[playing], question[playing]
+
+		# one wrong answer and the ones after it on the same question
+		wrong += rng.geometric(success[question])
+		lost = wrong >= lives
+		failed += np.bincount(position[lost], minlength = count)
+		position, wrong = position[~lost] + 1, wrong[~lost]
+	passed += len(position)
+
+	reached = int((failed * np.arange(1, count + 1)).sum()) + passed * count
+	return Simulation(sessions, lives, passed, reached, failed)
+
+def parse_success(text, count):
+	"""Returns the success probabilities of count questions from text: 'P' for all of them, or 'FIRST:LAST' for a linear ramp."""
+	first, sep, last = text.partition(':')
+	if sep: return np.linspace(float(first), float(last), count)
+	return np.full(count, float(text))
+
+def print_simulation(sim, count):
+	lives = 'unlimited lives' if sim.lives is None else f'{sim.lives} li{"fe" if sim.lives == 1 else "ves"}'
+	print(f'  {lives}: {sim.passed / sim.sessions:.1%} pass, {sim.reached / sim.sessions:.1f} of {count} questions reached on average')
+	if sim.passed == sim.sessions: return
+	# where the failing sessions ended, by quartile and by question
+	ends = np.cumsum(sim.failed)
+	quartiles = [int(np.searchsorted(ends, ends[-1] * q)) + 1 for q in (0.25, 0.5, 0.75)]
+	print(f'    failing sessions end by question {quartiles[0]} (25%), {quartiles[1]} (50%), {quartiles[2]} (75%)')
+	top = np.argsort(sim.failed, kind = 'stable')[::-1][:5]
+	print('    most failed: ' + ', '.join(f'question {i + 1} ({sim.failed[i] / sim.sessions:.1%})' for i in top if sim.failed[i]))
+
+def simulate_file(path, sessions, success, lives = None, seed = None):
+	"""
+	Prints the simulation of sessions playthroughs of the quiz file at path, for each number of lives in lives (the
+	quiz's own lives if None), with success as for parse_success(). Returns 1 if the quiz cannot be simulated, else 0.
+	"""
+	try: datafile, report = jsonhandler.validate_file(path, cache_bytes = 1 << 20)
+	except (OSError, ValueError, qpg.QPGError) as exc:
+		print(f'{path}: cannot be loaded ({exc})')
+		return 1
+	if report:
+		print(f'{path}: {report.summary()}')
+		return 1
+
+	count = len(datafile['questions'])
+	try: probabilities = parse_success(success, count)
+	except ValueError:
+		print(f'Invalid success probability: {success}')
+		return 1
+	randomize = bool(quizengine.setting(datafile, 'randomize', bool))
+	if lives is None: lives = [quizengine.setting(datafile, 'lives', int)]
+
+	print(f'{os.path.basename(path)}: {count} questions{", random order" if randomize else ""}, {sessions} sessions')
+	for n in lives:
+		try: sim = simulate(probabilities, n, sessions, randomize, seed)
+		except ValueError as exc:
+			print(f'  {exc}')
+			return 1
+		print_simulation(sim, count)
+	return 0
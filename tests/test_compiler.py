@@ -0,0 +1,74 @@
+import os
+import zipfile
+
+import compiler
+
+def make_env(tmp_path):
+	archive = str(tmp_path / 'compiler_env.zip')
+	with zipfile.ZipFile(archive, 'w') as z:
+		z.writestr('python.exe', 'x' * 10)
+		z.writestr('Lib/site.py', 'y' * 5)
+	return archive, str(tmp_path / 'compiler-env')
+
+def test_extract_env_once(tmp_path):
+	archive, root = make_env(tmp_path)
+	folder = compiler.extract_env(archive, root)
+	with open(os.path.join(folder, 'python.exe')) as f: assert f.read() == 'x' * 10
+	# files the embeddable Python writes itself do not make it extract again
+	os.makedirs(os.path.join(folder, 'Lib', '__pycache__'))
+	pyc = os.path.join(folder, 'Lib', '__pycache__', 'site.cpython-311.pyc')
+	open(pyc, 'w').close()
+	assert compiler.extract_env(archive, root) == folder
+	assert os.path.exists(pyc)
+
+def test_extract_env_repairs(tmp_path):
+	archive, root = make_env(tmp_path)
+	folder = compiler.extract_env(archive, root)
+	with open(os.path.join(folder, 'python.exe'), 'w') as f: f.write('truncated')
+	os.remove(os.path.join(folder, 'Lib', 'site.py'))
+	assert compiler.extract_env(archive, root) == folder
+	assert os.path.getsize(os.path.join(folder, 'python.exe')) == 10
+	assert os.path.getsize(os.path.join(folder, 'Lib', 'site.py')) == 5
+
+def test_extract_env_new_archive(tmp_path):
+	archive, root = make_env(tmp_path)
+	old = compiler.extract_env(archive, root)
+	with zipfile.ZipFile(archive, 'a') as z: z.writestr('Lib/new.py', 'z')
+	new = compiler.extract_env(archive, root)
+	assert new != old
+	assert not os.path.exists(old)
+	assert os.path.exists(os.path.join(new, 'Lib', 'new.py'))
+
+def test_compile_files_same_name(tmp_path, capsys):
+	for name in ('Quiz.qpg', 'quiz.json', 'other.json'): (tmp_path / name).write_text('{}')
+	# fails before building any runtime
+	assert compiler.compile_files([str(tmp_path)], str(tmp_path / 'out'), root = str(tmp_path / 'build')) == 1
+	assert capsys.readouterr().out.split('\n')[1:3] == [f'  {tmp_path / "Quiz.qpg"}', f'  {tmp_path / "quiz.json"}']
+	assert not os.path.exists(str(tmp_path / 'build'))
+
+def test_compile_files_none(tmp_path, capsys):
+	assert compiler.compile_files([str(tmp_path)], str(tmp_path / 'out'), root = str(tmp_path / 'build')) == 1
+	assert capsys.readouterr().out == 'No quiz files to compile\n'
+	assert not os.path.exists(str(tmp_path / 'build'))
+
+def test_compile_files_invalid_jobs(tmp_path, capsys):
+	(tmp_path / 'quiz.json').write_text('{}')
+	for jobs in (0, -1):
+		assert compiler.compile_files([str(tmp_path)], str(tmp_path / 'out'), jobs, root = str(tmp_path / 'build')) == 1
+		assert capsys.readouterr().out == f'Invalid number of jobs: {jobs}\n'
+	assert not os.path.exists(str(tmp_path / 'build'))
+
+def test_compile_files_one_failure(tmp_path, monkeypatch, capsys):
+	import json
+	runtime = tmp_path / 'runtime'
+	runtime.write_bytes(b'runtime')
+	monkeypatch.setattr(compiler, 'player_runtime', lambda root, status: str(runtime))
+	quiz = {'title': 'Quiz', 'questions': [{'question': 'Q', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'}]}
+	(tmp_path / 'good.json').write_text(json.dumps(quiz))
+	# nested too deep for the JSON decoder, which compile_quiz does not expect
+	(tmp_path / 'deep.json').write_text('{"title": "Deep", "questions": [' + '[' * 100000 + ']' * 100000 + ']}')
+	assert compiler.compile_files([str(tmp_path / 'deep.json'), str(tmp_path / 'good.json')], str(tmp_path / 'out'), 2) == 1
+	out = capsys.readouterr().out.splitlines()
+	assert 'RecursionError' in out[0]
+	assert out[1].endswith(compiler.exe_path(str(tmp_path / 'out'), 'good'))
+	assert out[2].startswith('Compiled 1 of 2 quizzes')
@@ -0,0 +1,89 @@
+import history
+from history import Change, MISSING
+
+def set_title(hist, title): return hist.do('edit title', [Change('set', (), 'title', hist.datafile['title'], title)])
+
+def test_undo_redo():
+	quiz = {'title': 'a', 'questions': [{'question': 'Q1'}]}
+	hist = history.History(quiz)
+	set_title(hist, 'b')
+	hist.do('add question', [Change('insert', ('questions',), 1, None, {'question': 'Q2'})])
+	hist.do('add lives', [Change('set', (), 'lives', MISSING, 3)])
+	hist.do('delete question', [Change('delete', ('questions',), 0, {'question': 'Q1'}, None)])
+	assert quiz == {'title': 'b', 'questions': [{'question': 'Q2'}], 'lives': 3}
+
+	while hist.undo(): pass
+	assert quiz == {'title': 'a', 'questions': [{'question': 'Q1'}]}
+	while hist.redo(): pass
+	assert quiz == {'title': 'b', 'questions': [{'question': 'Q2'}], 'lives': 3}
+
+def test_no_op_edit():
+	hist = history.History({'title': 'a'})
+	assert set_title(hist, 'a') is None
+	assert not hist.undo_stack
+	assert not hist.modified
+
+def test_listeners():
+	hist = history.History({'title': 'a'})
+	changes = []
+	hist.listeners.append(changes.append)
+	set_title(hist, 'b')
+	hist.undo()
+	assert [(c.old, c.new) for c in changes] == [('a', 'b'), ('b', 'a')]
+
+def test_modified():
+	hist = history.History({'title': 'a'})
+	assert not hist.modified
+	set_title(hist, 'b')
+	assert hist.modified
+	hist.mark_saved()
+	assert not hist.modified
+	hist.undo()
+	assert hist.modified
+	hist.redo()
+	assert not hist.modified
+
+def test_new_edit_after_undoing_past_save():
+	hist = history.History({'title': 'a'})
+	set_title(hist, 'b')
+	hist.mark_saved()
+	hist.undo()
+	set_title(hist, 'c')
+	hist.undo()
+	# back to 'a', which is not what was saved
+	assert hist.modified
+
+def test_limit():
+	quiz = {'title': 'a'}
+	hist = history.History(quiz, limit = 3)
+	for title in '12345': set_title(hist, title)
+	assert len(hist.undo_stack) == 3
+	while hist.undo(): pass
+	assert quiz['title'] == '2'
+
+def test_limit_keeps_unsaved_edits_modified():
+	quiz = {'title': 'a'}
+	hist = history.History(quiz, limit = 3)
+	for title in '12345': set_title(hist, title)
+	while hist.undo(): pass
+	# the quiz still differs from the file, whose title is 'a'
+	assert quiz['title'] == '2'
+	assert hist.modified
+
+def test_limit_drops_saved_edit():
+	quiz = {'title': 'a'}
+	hist = history.History(quiz, limit = 3)
+	set_title(hist, '1')
+	hist.mark_saved()
+	for title in '2345': set_title(hist, title)
+	while hist.undo(): pass
+	assert quiz['title'] == '2'
+	assert hist.modified
+
+def test_limit_keeps_saved_edit():
+	hist = history.History({'title': 'a'}, limit = 3)
+	for title in '123': set_title(hist, title)
+	hist.mark_saved()
+	set_title(hist, '4')
+	hist.undo()
+	assert not hist.modified
@@ -0,0 +1,107 @@
+import os
+import json
+
+import journal
+import history
+import jsonhandler
+from history import Change
+
+def make_quiz(): return {'title': 'a', 'questions': [{'question': 'Q1', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'}]}
+
+def save(path, quiz):
+	chunks, encoding = jsonhandler.iter_dump(quiz, jsonhandler.file_format(path))
+	jsonhandler.atomic_write(path, chunks, encoding = encoding)
+
+def edit(hist, session, label, changes):
+	session.record('do', hist.do(label, changes))
+
+def recover(root):
+	"""Returns the quiz recovered from the only orphaned journal under root."""
+	orphans = list(journal.Journal.orphans(root))
+	assert len(orphans) == 1
+	recovery = orphans[0].read()
+	base = recovery.base
+	path = orphans[0].path(recovery.generation, 'qpg') if base.get('checkpoint') else base['savepath']
+	datafile, report = jsonhandler.validate_file(path)
+	assert not report
+	hist = history.History(datafile)
+	journal.replay(hist, recovery.records)
+	orphans[0].close()
+	return datafile
+
+def test_live_session_is_not_an_orphan(tmp_path):
+	root = str(tmp_path)
+	session = journal.Journal.create(root)
+	assert list(journal.Journal.orphans(root)) == []
+	assert os.path.isdir(session.folder)
+	session.close()
+	assert not os.path.exists(session.folder)
+
+def test_folder_without_lock_file(tmp_path):
+	root = str(tmp_path)
+	os.makedirs(os.path.join(root, 'not-a-session'))
+	assert list(journal.Journal.orphans(root)) == []
+	assert os.listdir(os.path.join(root, 'not-a-session')) == []
+
+def test_no_recovery_folder(tmp_path): assert list(journal.Journal.orphans(str(tmp_path / 'missing'))) == []
+
+def test_recover_from_file(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	quiz = make_quiz()
+	save(path, quiz)
+	session = journal.Journal.create(str(tmp_path / 'recovery'))
+	session.start(journal.file_base(path, 'json'))
+	hist = history.History(quiz)
+	edit(hist, session, 'title', [Change('set', (), 'title', 'a', 'b')])
+	edit(hist, session, 'lives', [Change('set', (), 'lives', history.MISSING, 3)])
+	session.record('undo')
+	hist.undo()
+	edit(hist, session, 'question', [Change('insert', ('questions',), 1, None, dict(quiz['questions'][0], question = 'Q2'))])
+	session.flush()
+	# a crash leaves the journal behind
+	session.close(False)
+
+	assert recover(str(tmp_path / 'recovery')) == quiz
+	assert os.listdir(str(tmp_path / 'recovery')) == ['sessions.lock']
+
+def test_changed_file_is_not_a_base(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	save(path, make_quiz())
+	session = journal.Journal.create(str(tmp_path / 'recovery'))
+	session.start(journal.file_base(path, 'json'))
+	session.close(False)
+	save(path, dict(make_quiz(), title = 'changed on disk'))
+	orphan, = journal.Journal.orphans(str(tmp_path / 'recovery'))
+	assert orphan.read() is None
+	orphan.close()
+
+def test_recover_from_checkpoint(tmp_path):
+	quiz = make_quiz()
+	hist = history.History(quiz)
+	session = journal.Journal.create(str(tmp_path))
+	session.checkpoint(jsonhandler.snapshot(quiz), savepath = '', format = 'qpg', modified = True)
+	edit(hist, session, 'title', [Change('set', (), 'title', 'a', 'b')])
+	session.checkpoint_thread.join()
+	# the next generation continues from a checkpoint of the edited quiz
+	session.checkpoint(jsonhandler.snapshot(quiz), savepath = '', format = 'qpg', modified = True)
+	edit(hist, session, 'title', [Change('set', (), 'title', 'b', 'c')])
+	session.flush()
+	session.checkpoint_thread.join()
+	session.close(False)
+
+	assert recover(str(tmp_path)) == quiz
+	assert quiz['title'] == 'c'
+
+def test_torn_line(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	quiz = make_quiz()
+	save(path, quiz)
+	session = journal.Journal.create(str(tmp_path / 'recovery'))
+	session.start(journal.file_base(path, 'json'))
+	hist = history.History(quiz)
+	edit(hist, session, 'title', [Change('set', (), 'title', 'a', 'b')])
+	session.flush()
+	session.file.write(json.dumps({'do': 'title', 'changes': []}).encode()[:-3])
+	session.close(False)
+
+	assert recover(str(tmp_path / 'recovery'))['title'] == 'b'
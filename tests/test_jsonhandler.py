@@ -0,0 +1,104 @@
+import io
+import os
+import json
+import hashlib
+
+import pytest
+
+import jsonhandler
+
+QUIZZES = [
+	{},
+	{'title': 'Empty', 'questions': []},
+	{'title': 'Ünïcode ✓ "quotes" \\ </script>', 'questions': [{'question': 'Line 1\nLine 2', 'a': '1', 'b': '2', 'c': '3', 'd': '4', 'correct': 'all', 'wrongmsg': {'a': 'No'}}], 'lives': 3, 'randomize': True},
+	{'questions': [{}, [], {'nested': {'deep': [1, 2.5, None, False]}}], 'wrongmsg': [], 'fail': ''},
+]
+
+@pytest.mark.parametrize('quiz', QUIZZES)
+def test_iter_json(quiz):
+	assert ''.join(jsonhandler.iter_json(quiz)) == json.dumps(quiz, ensure_ascii = False, indent = 4)
+	assert ''.join(jsonhandler.iter_json(quiz, 2)) == json.dumps(quiz, ensure_ascii = False, indent = 2)
+
+@pytest.mark.parametrize('quiz', QUIZZES)
+def test_quiz_reader(quiz):
+	data = json.dumps(quiz, ensure_ascii = False, indent = 4).encode('utf-8')
+	reader = jsonhandler.QuizReader(io.BytesIO(data))
+	# chunk boundaries inside every token, including multi-byte characters
+	reader.chunk_size = 3
+	assert reader.load() == quiz
+
+@pytest.mark.parametrize('data', [b'', b'[]', b'{"title": }', b'{"questions": [1, 2,]}', b'{} {}', b'{"title": "x"'])
+def test_quiz_reader_invalid(data):
+	with pytest.raises(json.JSONDecodeError): jsonhandler.QuizReader(io.BytesIO(data)).load()
+
+def test_validator_reports_every_error():
+	quiz = {'title': '', 'questions': [{'question': 'Q', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'}, {'question': 'Q', 'a': '', 'c': 'C', 'd': 'D', 'correct': 'a'}, 'not a question']}
+	report = jsonhandler.QuizValidator().quiz(quiz)
+	assert [(e.question, e.field) for e in report] == [(None, 'title'), (1, 'a'), (1, 'b'), (2, None)]
+	assert report.summary() == "String variable 'title' not found or empty! (3 more errors)"
+
+def test_validate_json_file(tmp_path):
+	path = tmp_path / 'quiz.json'
+	path.write_text(json.dumps(QUIZZES[2]), encoding = 'utf-8')
+	datafile, report = jsonhandler.validate_file(str(path))
+	assert datafile == QUIZZES[2]
+	assert not report
+
+def test_atomic_write(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	content = 'x' * 100000 + '✓'
+	digest = jsonhandler.atomic_write(path, [content[:70000], content[70000:]])
+	with open(path, encoding = 'utf-8') as f: assert f.read() == content
+	assert digest == hashlib.sha256(content.encode('utf-8')).hexdigest()
+	assert os.listdir(str(tmp_path)) == ['quiz.json']
+
+	assert jsonhandler.atomic_write(path, [b'bytes'], encoding = None) == hashlib.sha256(b'bytes').hexdigest()
+	with open(path, 'rb') as f: assert f.read() == b'bytes'
+
+def test_atomic_write_unchanged(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	digest = jsonhandler.atomic_write(path, ['same'])
+	os.utime(path, (0, 0))
+	assert jsonhandler.atomic_write(path, ['same'], digest) == digest
+	assert os.stat(path).st_mtime == 0
+	assert os.listdir(str(tmp_path)) == ['quiz.json']
+
+def test_atomic_write_keeps_mode(tmp_path):
+	if os.name == 'nt': pytest.skip('no POSIX permissions')
+	path = str(tmp_path / 'quiz.json')
+	jsonhandler.atomic_write(path, ['old'])
+	os.chmod(path, 0o640)
+	jsonhandler.atomic_write(path, ['new'])
+	assert os.stat(path).st_mode & 0o777 == 0o640
+
+def test_atomic_write_failure(tmp_path):
+	path = str(tmp_path / 'quiz.json')
+	jsonhandler.atomic_write(path, ['old'])
+	def chunks():
+		yield 'new'
+		raise RuntimeError('encoding failed')
+	with pytest.raises(RuntimeError): jsonhandler.atomic_write(path, chunks())
+	with open(path) as f: assert f.read() == 'old'
+	assert os.listdir(str(tmp_path)) == ['quiz.json']
+
+@pytest.mark.parametrize('fmt', ['json', 'qpg'])
+def test_save_and_load(tmp_path, fmt):
+	path = str(tmp_path / f'quiz.{fmt}')
+	quiz = QUIZZES[2]
+	chunks, encoding = jsonhandler.iter_dump(quiz, fmt)
+	jsonhandler.atomic_write(path, chunks, encoding = encoding)
+	datafile, report = jsonhandler.validate_file(path)
+	assert datafile == quiz
+	assert not report
+
+def test_snapshot():
+	quiz = {'title': 'T', 'questions': [{'question': 'Q'}], 'wrongmsg': ['W']}
+	snap = jsonhandler.snapshot(quiz)
+	quiz['questions'].append({'question': 'Q2'})
+	quiz['title'] = 'Changed'
+	assert snap['questions'] == ({'question': 'Q'},)
+	assert snap['title'] == 'T'
+	with pytest.raises(TypeError): snap['title'] = 'x'
+	thawed = jsonhandler.thaw(snap)
+	assert thawed == {'title': 'T', 'questions': [{'question': 'Q'}], 'wrongmsg': ['W']}
+	assert thawed['questions'][0] is snap['questions'][0]
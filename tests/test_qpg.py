@@ -0,0 +1,177 @@
+import io
+import json
+import struct
+
+import pytest
+
+import qpg
+import jsonhandler
+
+def make_quiz(count = 5):
+	return {
+		'title': 'Test quiz',
+		'lives': 3,
+		'questions': [{'question': f'Question {i + 1} ✓', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'abcd'[i % 4]} for i in range(count)],
+		'wrongmsg': ['Wrong!'],
+	}
+
+def encode(datafile, validator = None): return b''.join(qpg.iter_encode(datafile, validator))
+
+def test_round_trip():
+	quiz = make_quiz()
+	qfile = qpg.QPGFile(encode(quiz))
+	assert qfile.version == qpg.VERSION
+	assert len(qfile) == 5
+	loaded = qfile.load()
+	assert loaded == quiz
+	assert list(loaded) == list(quiz)
+	assert qfile.question(3) == quiz['questions'][3]
+	assert qfile.meta() == dict(quiz, questions = None)
+
+def test_no_questions():
+	quiz = {'title': 'Empty', 'questions': []}
+	assert qpg.QPGFile(encode(quiz)).load() == quiz
+
+def test_embedded_at_offset():
+	data = encode(make_quiz())
+	qfile = qpg.QPGFile(b'prefix' + data + b'suffix', 6, len(data))
+	assert qfile.load() == make_quiz()
+
+def test_question_index_out_of_range():
+	qfile = qpg.QPGFile(encode(make_quiz()))
+	with pytest.raises(IndexError): qfile.record(5)
+
+def test_is_qpg():
+	assert qpg.is_qpg(io.BytesIO(encode(make_quiz())))
+	f = io.BytesIO(json.dumps(make_quiz()).encode())
+	assert not qpg.is_qpg(f)
+	assert f.tell() == 0
+
+@pytest.mark.parametrize('data', [b'', b'QPG\0', b'{"title": "Not a container", "questions": []}' * 2])
+def test_not_a_container(data):
+	with pytest.raises(qpg.QPGError): qpg.QPGFile(data)
+
+def test_truncated():
+	data = encode(make_quiz())
+	with pytest.raises(qpg.QPGError): qpg.QPGFile(data[:-3])
+
+def test_newer_version():
+	data = bytearray(encode(make_quiz()))
+	data[4:6] = struct.pack('<H', qpg.VERSION + 1)
+	with pytest.raises(qpg.QPGError): qpg.QPGFile(bytes(data))
+
+def test_validated_flag():
+	validator = jsonhandler.QuizValidator()
+	assert qpg.QPGFile(encode(make_quiz(), validator)).flags & qpg.FLAG_VALIDATED
+	assert not qpg.QPGFile(encode(make_quiz())).flags & qpg.FLAG_VALIDATED
+
+	quiz = make_quiz()
+	del quiz['questions'][2]['b']
+	validator = jsonhandler.QuizValidator()
+	assert not qpg.QPGFile(encode(quiz, validator)).flags & qpg.FLAG_VALIDATED
+	assert [e.question for e in validator.report] == [2]
+
+def test_crc():
+	data = encode(make_quiz())
+	assert qpg.QPGFile(data).check_crc()
+	i = data.index(b'Question 3')
+	corrupt = data[:i] + b'X' + data[i + 1:]
+	assert not qpg.QPGFile(corrupt).check_crc()
+
+def test_version_1():
+	# the same container without the CRC-32 in its footer
+	data = encode(make_quiz())
+	meta_offset, index_offset, count, flags, crc, magic = qpg.FOOTER.unpack(data[-qpg.FOOTER.size:])
+	data = qpg.HEADER.pack(qpg.MAGIC, 1, 0) + data[qpg.HEADER.size:-qpg.FOOTER.size] + qpg.FOOTER_V1.pack(meta_offset, index_offset, count, flags, magic)
+	qfile = qpg.QPGFile(data)
+	assert qfile.load() == make_quiz()
+	assert not qfile.check_crc()
+
+def write_container(path, datafile):
+	jsonhandler.atomic_write(str(path), qpg.iter_encode(datafile, jsonhandler.QuizValidator()), encoding = None)
+
+def test_validate_file_lazy(tmp_path):
+	path = tmp_path / 'quiz.qpg'
+	write_container(path, make_quiz())
+	datafile, report = jsonhandler.validate_file(str(path), cache_bytes = 1 << 20)
+	assert not report
+	assert isinstance(datafile['questions'], qpg.QuestionStore)
+	assert list(datafile['questions']) == make_quiz()['questions']
+
+def test_validate_file_corrupt_record(tmp_path):
+	path = tmp_path / 'quiz.qpg'
+	write_container(path, make_quiz())
+	data = path.read_bytes()
+	i = data.index(b'Question 4')
+	path.write_bytes(data[:i - 3] + b'\0\1' + data[i - 1:])
+	datafile, report = jsonhandler.validate_file(str(path), cache_bytes = 1 << 20)
+	assert [(e.question, e.message) for e in report] == [(3, 'Question 4 is corrupt!')]
+
+def test_payload(tmp_path):
+	path = tmp_path / 'quiz.exe'
+	path.write_bytes(b'runtime' * 100 + b''.join(qpg.iter_payload(qpg.iter_encode(make_quiz()))))
+	qfile = qpg.QPGFile.open_payload(str(path))
+	assert qfile.verified
+	assert qfile.load() == make_quiz()
+	del qfile
+
+	data = path.read_bytes()
+	i = data.index(b'Question 2')
+	path.write_bytes(data[:i] + b'X' + data[i + 1:])
+	with pytest.raises(qpg.QPGError): qpg.QPGFile.open_payload(str(path))
+
+def test_no_payload(tmp_path):
+	path = tmp_path / 'runtime.exe'
+	path.write_bytes(b'runtime' * 100)
+	with pytest.raises(qpg.QPGError): qpg.QPGFile.open_payload(str(path))
+
+def test_zip_member(tmp_path):
+	import zipfile
+	path = tmp_path / 'quiz.pyz'
+	with zipfile.ZipFile(str(path), 'w') as z:
+		z.writestr('__main__.py', 'print()', zipfile.ZIP_DEFLATED)
+		z.writestr('quiz.qpg', b''.join(qpg.iter_payload(qpg.iter_encode(make_quiz()))), zipfile.ZIP_STORED)
+	assert qpg.QPGFile.open_payload(str(path), 'quiz.qpg').load() == make_quiz()
+
+def store(quiz = None): return qpg.QPGFile(encode(quiz or make_quiz())).open_lazy(1 << 20)['questions']
+
+def test_store_edits():
+	questions = store()
+	expected = make_quiz()['questions']
+	new = {'question': 'New', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'}
+	questions[1] = new
+	expected[1] = new
+	questions.insert(0, new)
+	expected.insert(0, new)
+	del questions[4]
+	del expected[4]
+	questions.append(new)
+	expected.append(new)
+	assert len(questions) == len(expected)
+	assert list(questions) == expected
+	assert questions[1:3] == expected[1:3]
+	assert [questions[i] for i in range(len(questions))] == expected
+
+def test_store_copy_and_snapshot():
+	questions = store()
+	snapshot = questions.snapshot()
+	copy = questions.copy()
+	copy[0] = {'question': 'Changed'}
+	assert questions[0] == make_quiz()['questions'][0]
+	assert snapshot[0] == make_quiz()['questions'][0]
+	with pytest.raises(TypeError): snapshot[0] = {}
+	with pytest.raises(TypeError): del snapshot[0]
+
+def test_store_cache_is_bounded():
+	questions = qpg.QPGFile(encode(make_quiz(1000))).open_lazy(4096)['questions']
+	for i in range(len(questions)): questions[i]
+	assert questions.cache_used <= 4096
+	assert questions[999] == make_quiz(1000)['questions'][999]
+
+def test_reencode_store():
+	# unchanged records are copied as they are, edited ones encoded again
+	quiz = make_quiz()
+	datafile = qpg.QPGFile(encode(quiz, jsonhandler.QuizValidator())).open_lazy(1 << 20)
+	datafile['questions'][2] = quiz['questions'][2] = dict(quiz['questions'][2], question = 'Edited')
+	assert encode(datafile) == encode(quiz)
+	assert qpg.QPGFile(encode(datafile)).load() == quiz
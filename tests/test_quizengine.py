@@ -0,0 +1,150 @@
+import random
+import itertools
+import collections
+
+import pytest
+
+import quizengine
+from quizengine import QUESTION, CORRECT, FINISHED, FAILED
+
+class OldPlayer:
+	"""The rules of QuestionPlayer before QuizEngine, without the GUI."""
+	def __init__(self, datafile):
+		self.datafile = datafile
+		self.questions = list(datafile['questions'])
+		lives = datafile.get('lives')
+		self.lives = lives if type(lives) is int and lives else None
+		self.qnum = -1
+		self.next_question()
+
+	def next_question(self):
+		self.qnum += 1
+		if self.qnum == len(self.questions): self.state = FINISHED
+		else:
+			self.question = self.questions[self.qnum]
+			self.wrongmsg = ''
+			self.state = QUESTION
+
+	def choose_choice(self, choice):
+		if self.question['correct'] == 'all' or self.question['correct'] == choice:
+			explanation = self.question.get('explanation')
+			if type(explanation) is str and explanation: self.state = CORRECT
+			else: self.next_question()
+			return
+		wrongmsg = self.question.get('wrongmsg')
+		wrongmsgs = self.datafile.get('wrongmsg')
+		if type(wrongmsg) is dict and wrongmsg and choice in wrongmsg: self.wrongmsg = wrongmsg[choice]
+		elif type(wrongmsgs) is list and wrongmsgs: self.wrongmsg = wrongmsgs[0]
+		else: self.wrongmsg = f'Choice {choice.upper()} is incorrect!{" You lost a life!" if self.lives is not None else ""}'
+		if self.lives is not None:
+			self.lives -= 1
+			if not self.lives: self.state = FAILED
+
+def random_quiz(rng):
+	questions = []
+	for i in range(rng.randint(1, 6)):
+		question = {'question': f'Q{i}', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': rng.choice(['a', 'b', 'c', 'd', 'all', 'x'])}
+		if rng.random() < 0.4: question['explanation'] = rng.choice(['', 'Because.', 5])
+		if rng.random() < 0.4: question['wrongmsg'] = {c: f'Not {c}' for c in 'abcd' if rng.random() < 0.5}
+		questions.append(question)
+	quiz = {'title': 'Quiz', 'questions': questions}
+	lives = rng.choice([None, 0, 1, 2, 3, -1, True, '3'])
+	if lives is not None: quiz['lives'] = lives
+	wrongmsgs = rng.choice([None, [], ['Wrong!'], 'Wrong!'])
+	if wrongmsgs is not None: quiz['wrongmsg'] = wrongmsgs
+	return quiz
+
+def test_same_rules_as_the_old_player():
+	rng = random.Random(1)
+	for game in range(2000):
+		quiz = random_quiz(rng)
+		old = OldPlayer(quiz)
+		engine = quizengine.QuizEngine(quiz)
+		assert engine.start() == old.state
+		for step in range(40):
+			if old.state == CORRECT:
+				old.next_question()
+				state = engine.next()
+			else:
+				choice = rng.randrange(4)
+				old.choose_choice(quizengine.CHOICES[choice])
+				state = engine.answer(choice)
+			assert state == engine.state == old.state
+			assert engine.lives == old.lives
+			if state in (QUESTION, FAILED):
+				assert engine.wrongmsg == old.wrongmsg
+				assert engine.qnum == old.qnum
+				assert engine.question.text == old.question['question']
+			if state in (FINISHED, FAILED): break
+
+def test_wrong_answer_messages_are_picked_at_random():
+	quiz = {'title': 'Quiz', 'questions': [{'question': 'Q', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'}], 'wrongmsg': ['1', '2', '3']}
+	engine = quizengine.QuizEngine(quiz, random.Random(0))
+	engine.start()
+	seen = collections.Counter()
+	for i in range(3000):
+		engine.answer(1)
+		seen[engine.wrongmsg] += 1
+	assert set(seen) == {'1', '2', '3'}
+	assert min(seen.values()) > 800
+
+def test_play_through():
+	quiz = {'title': 'Quiz', 'lives': 2, 'questions': [
+		{'question': 'Q1', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'b', 'explanation': 'B it is.'},
+		{'question': 'Q2', 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'all'},
+	]}
+	engine = quizengine.QuizEngine(quiz)
+	assert engine.start() == QUESTION
+	assert engine.answer(0) == QUESTION
+	assert (engine.lives, engine.wrongmsg) == (1, 'Choice A is incorrect! You lost a life!')
+	assert engine.answer(1) == CORRECT
+	assert engine.question.explanation == 'B it is.'
+	with pytest.raises(ValueError): engine.answer(1)
+	assert engine.next() == QUESTION
+	assert (engine.qnum, engine.wrongmsg) == (1, '')
+	assert engine.answer(3) == FINISHED
+	with pytest.raises(ValueError): engine.answer(0)
+
+	# a new game starts over with full lives
+	assert engine.start() == QUESTION
+	assert (engine.qnum, engine.lives) == (0, 2)
+	engine.answer(0)
+	assert engine.answer(0) == FAILED
+	assert engine.lives == 0
+
+def test_snapshots_and_compiled_questions():
+	import jsonhandler
+	quiz = jsonhandler.snapshot(random_quiz(random.Random(2)))
+	engine = quizengine.QuizEngine(quiz)
+	engine.start()
+	first = engine.question
+	engine.start()
+	assert engine.question is first
+
+def test_random_order_is_uniform():
+	quiz = {'title': 'Quiz', 'randomize': True, 'questions': [{'question': str(i), 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'all'} for i in range(3)]}
+	engine = quizengine.QuizEngine(quiz, random.Random(3))
+	orders = collections.Counter()
+	for game in range(6000):
+		engine.start()
+		order = []
+		while engine.state == QUESTION:
+			order.append(engine.question.text)
+			engine.answer(0)
+		orders[''.join(order)] += 1
+	assert set(orders) == {''.join(p) for p in itertools.permutations('012')}
+	assert min(orders.values()) > 850
+
+def test_peek():
+	quiz = {'title': 'Quiz', 'randomize': True, 'questions': [{'question': str(i), 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'all'} for i in range(20)]}
+	engine = quizengine.QuizEngine(quiz, random.Random(4))
+	engine.start()
+	seen = [engine.question.text]
+	while True:
+		upcoming = engine.peek()
+		assert engine.peek() is upcoming
+		if engine.answer(0) == FINISHED: break
+		assert engine.question is upcoming
+		seen.append(engine.question.text)
+	assert upcoming is None
+	assert sorted(seen, key = int) == [str(i) for i in range(20)]
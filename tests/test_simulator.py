@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+import simulator
+import quizengine
+
+def make_quiz(count, lives, randomize = False):
+	return {'title': 'Quiz', 'lives': lives, 'randomize': randomize, 'questions': [{'question': str(i), 'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'correct': 'a'} for i in range(count)]}
+
+def play(quiz, success, games, seed):
+	"""Pass rate and mean questions reached of games played with QuizEngine, answering question i right with chance success[i]."""
+	rng = random.Random(seed)
+	engine = quizengine.QuizEngine(quiz, rng)
+	passed = reached = 0
+	for game in range(games):
+		state = engine.start()
+		while state == quizengine.QUESTION:
+			state = engine.answer(0 if rng.random() < success[int(engine.question.text)] else 1)
+		passed += state == quizengine.FINISHED
+		reached += engine.qnum + 1 if state == quizengine.FAILED else len(success)
+	return passed / games, reached / games
+
+@pytest.mark.parametrize('randomize', [False, True])
+def test_against_the_engine(randomize):
+	# random order is only exact when every question is equally hard
+	success = np.full(15, 0.9) if randomize else np.linspace(0.98, 0.8, 15)
+	games = 20000
+	engine_pass, engine_reached = play(make_quiz(15, 3, randomize), success, games, 1)
+	sim = simulator.simulate(success, 3, 200000, randomize, seed = 1)
+	sim_pass = sim.passed / sim.sessions
+	# well within 5 standard errors of the engine's pass rate
+	assert abs(sim_pass - engine_pass) < 5 * math.sqrt(engine_pass * (1 - engine_pass) / games)
+	assert abs(sim.reached / sim.sessions - engine_reached) < 0.3
+	assert sim.failed.sum() == sim.sessions - sim.passed
+
+def test_exact():
+	# one question: it fails only if the first two tries are wrong
+	sim = simulator.simulate([0.5], 2, 400000, seed = 2)
+	assert abs(sim.passed / sim.sessions - 0.75) < 0.005
+	assert sim.failed.tolist() == [sim.sessions - sim.passed]
+
+def test_certain_and_unlimited():
+	sim = simulator.simulate(np.ones(10), 1, 1000, seed = 3)
+	assert (sim.passed, sim.reached) == (1000, 10000)
+	sim = simulator.simulate(np.full(10, 0.1), None, 1000)
+	assert (sim.passed, sim.reached) == (1000, 10000)
+
+def test_seed():
+	a = simulator.simulate(np.full(50, 0.9), 2, 10000, seed = 4)
+	b = simulator.simulate(np.full(50, 0.9), 2, 10000, seed = 4)
+	assert a.passed == b.passed and a.failed.tolist() == b.failed.tolist()
+
+@pytest.mark.parametrize('success, lives, sessions', [([0.5, 0], 3, 10), ([0.5, 1.5], 3, 10), ([0.5], 0, 10), ([0.5], 3, 0), ([0.5], None, -5)])
+def test_invalid(success, lives, sessions):
+	with pytest.raises(ValueError): simulator.simulate(success, lives, sessions)
+
+def test_simulate_file_invalid_sessions(tmp_path, capsys):
+	import json
+	path = tmp_path / 'quiz.json'
+	path.write_text(json.dumps(make_quiz(3, 3)))
+	assert simulator.simulate_file(str(path), 0, '0.9') == 1
+	assert capsys.readouterr().out.splitlines()[-1] == '  sessions must be at least 1'
+
+def test_parse_success():
+	assert simulator.parse_success('0.8', 3).tolist() == [0.8, 0.8, 0.8]
+	assert simulator.parse_success('1:0.5', 3).tolist() == [1, 0.75, 0.5]
+	with pytest.raises(ValueError): simulator.parse_success('x', 3)